@@ -0,0 +1,85 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Decode throughput of the available JSON codecs on a synthetic 10k-monitor listing.
+
+Usage: python benchmarks/bench_jsoncodec.py [monitors] [rounds]
+"""
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'module_utils'))
+
+import jsoncodec
+
+def monitor(i):
+  return {
+    'id': str(100000 + i),
+    'type': 'monitor',
+    'attributes': {
+      'url': 'https://host-{}.example.com/health'.format(i),
+      'pronounceable_name': 'Host {}'.format(i),
+      'monitor_type': 'status',
+      'monitor_group_id': str(i % 50) if i % 3 else None,
+      'last_checked_at': '2021-10-01T12:00:{:02d}.000Z'.format(i % 60),
+      'status': 'up' if i % 17 else 'down',
+      'policy_id': None,
+      'required_keyword': None,
+      'verify_ssl': True,
+      'check_frequency': 180,
+      'call': False,
+      'sms': False,
+      'email': True,
+      'push': True,
+      'team_wait': None,
+      'http_method': 'get',
+      'request_timeout': 15,
+      'recovery_period': 180,
+      'request_headers': [ { 'name': 'X-Probe', 'value': str(i) } ],
+      'request_body': '',
+      'follow_redirects': True,
+      'remember_cookies': True,
+      'created_at': '2021-01-01T00:00:00.000Z',
+      'updated_at': '2021-09-30T23:59:59.000Z',
+      'ssl_expiration': 14,
+      'domain_expiration': 30,
+      'regions': [ 'us', 'eu', 'as', 'au' ],
+      'expected_status_codes': [],
+      'port': None,
+      'confirmation_period': 0,
+      'paused_at': None,
+      'paused': False,
+      'maintenance_from': None,
+      'maintenance_to': None,
+    }
+  }
+
+def main():
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+  rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+  payload = json.dumps({
+    'data': [ monitor(i) for i in range(count) ],
+    'pagination': { 'first': None, 'last': None, 'prev': None, 'next': None }
+  }).encode('utf-8')
+
+  size = len(payload) / (1024.0 * 1024.0)
+
+  print('payload: {} monitors, {:.2f} MiB, {} rounds'.format(count, size, rounds))
+
+  for name in jsoncodec.available_codecs():
+    name, dumps, loads = jsoncodec.get_codec(name)
+
+    best = min(timeit.repeat(lambda: loads(payload), number=1, repeat=rounds))
+
+    print('{:<8} decode {:8.2f} ms {:8.1f} MiB/s'.format(name, best * 1000, size / best))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,164 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+AnsiballZ payload size and cold-start time of every module of the collection.
+
+The payload of a module is built the way the controller builds it for a task. The cold start is the
+wall time of running that payload with an unsupported option: the interpreter start-up, unpacking the
+payload, the imports of the module and the argument validation, without touching the network. For the
+modules in REQUEST_RUNS the wall time of a run that makes its requests is measured as well; the
+requests are replayed (without delays) from a cassette of empty listings. A replayed request doesn't
+import ansible.module_utils.urls (open_url is imported on the first request over the network), so a run
+against betteruptime.com costs that import, the TLS handshakes and the latencies on top.
+
+The collection has to be in an ansible_collections directory (or ANSIBLE_COLLECTIONS_PATH has to
+point to one) and ansible-core has to be installed.
+
+Usage: python benchmarks/bench_module_payload.py [rounds] [module ...]
+"""
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# The arguments of a run that makes requests, per module; they only need the listings in LISTINGS.
+REQUEST_RUNS = {
+  'monitors': { 'api_token': 'bench', 'url': 'https://bench.invalid', 'monitor_type': 'status', '_ansible_check_mode': True },
+  'monitors_get': { 'api_token': 'bench' },
+  'status_page_get': { 'api_token': 'bench' }
+}
+
+LISTINGS = [ '/api/v2/monitors', '/api/v2/status-pages' ]
+
+def collections_paths():
+  paths = [ path for path in os.environ.get('ANSIBLE_COLLECTIONS_PATH', '').split(os.pathsep) if path ]
+
+  # The collection itself is at ansible_collections/<namespace>/<name>.
+  parent = os.path.abspath(os.path.join(ROOT, '..', '..', '..'))
+
+  if os.path.basename(os.path.abspath(os.path.join(ROOT, '..', '..'))) == 'ansible_collections':
+    paths.append(parent)
+
+  return paths
+
+def build(name, path, args=None):
+  """
+  Return the AnsiballZ payload of a module.
+
+  :param str name: The name of the module.
+  :param str path: The path of the module.
+  :param dict args: The arguments of the task (Default: an unsupported option).
+  """
+
+  from ansible.executor import module_common
+  from ansible.parsing.dataloader import DataLoader
+  from ansible.template import Templar
+
+  built = module_common.modify_module(
+    module_name='betteruptime.betteruptime.' + name,
+    module_path=path,
+    module_args=args or { 'bench_unsupported_option': True },
+    templar=Templar(loader=DataLoader()),
+    task_vars={ 'ansible_python_interpreter': sys.executable },
+    module_compression='ZIP_DEFLATED'
+  )
+
+  # ansible-core < 2.19 returns a (data, style, shebang) tuple.
+  return built[0] if isinstance(built, tuple) else built.b_module_data
+
+def cassette():
+  """
+  Write a cassette with an empty page of every listing in LISTINGS and return its path.
+  """
+
+  fd, path = tempfile.mkstemp(suffix='.jsonl')
+  body = json.dumps(dict(data=[], pagination=dict(next=None)))
+
+  with os.fdopen(fd, 'w') as handle:
+    for listing in LISTINGS:
+      handle.write(json.dumps(dict(method='GET', path=listing, data=None, code=200, body=body, seconds=0)) + '\n')
+
+  return path
+
+def cold_start(payload, rounds, replay=None):
+  """
+  Return the median wall time of running a payload.
+
+  :param bytes payload: The AnsiballZ payload.
+  :param int rounds: How many times the payload is run.
+  :param str replay: The cassette to replay the requests from (Default: None).
+  """
+
+  env = dict((key, value) for key, value in os.environ.items() if not key.startswith('BU_'))
+
+  if replay:
+    env.update(BU_CASSETTE=replay, BU_CASSETTE_MODE='replay', BU_REPLAY_SPEED='0')
+
+  fd, path = tempfile.mkstemp(suffix='.py')
+
+  with os.fdopen(fd, 'wb') as handle:
+    handle.write(payload)
+
+  try:
+    times = []
+
+    for i in range(rounds):
+      start = time.time()
+      run = subprocess.run([ sys.executable, path ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env)
+      times.append(time.time() - start)
+
+      # A run with requests that fails (e.g. on a request that isn't in the cassette) measures nothing.
+      if replay and (run.returncode or json.loads(run.stdout).get('failed')):
+        raise RuntimeError('The run with requests failed: {}'.format(run.stdout.decode('utf-8', 'replace')[-500:]))
+  finally:
+    os.remove(path)
+
+  return sorted(times)[len(times) // 2]
+
+def main():
+  rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+  wanted = sys.argv[2:]
+
+  from ansible.utils.collection_loader._collection_finder import _AnsibleCollectionFinder
+
+  _AnsibleCollectionFinder(paths=collections_paths())._install()
+
+  modules = os.path.join(ROOT, 'plugins', 'modules')
+
+  replay = cassette()
+
+  print('{:<24} {:>10} {:>12} {:>12}'.format('module', 'payload', 'cold start', 'request run'))
+
+  try:
+    for filename in sorted(os.listdir(modules)):
+      name, ext = os.path.splitext(filename)
+
+      if ext != '.py' or (wanted and name not in wanted):
+        continue
+
+      with open(os.path.join(modules, filename)) as handle:
+        # The doc-only stubs of action plugins don't run on the target.
+        if 'def main(' not in handle.read():
+          continue
+
+      payload = build(name, os.path.join(modules, filename))
+      request_run = '-'
+
+      if name in REQUEST_RUNS:
+        request_run = '{:>9.1f} ms'.format(cold_start(build(name, os.path.join(modules, filename), REQUEST_RUNS[name]), rounds, replay) * 1000)
+
+      print('{:<24} {:>7.1f} KiB {:>9.1f} ms {:>12}'.format(name, len(payload) / 1024.0, cold_start(payload, rounds) * 1000, request_run))
+  finally:
+    os.remove(replay)
+
+if __name__ == '__main__':
+  main()
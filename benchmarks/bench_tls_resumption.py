@@ -0,0 +1,124 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Handshake latency of new connections, with a full TLS handshake and with a resumed session, against a
+local TLS stand-in of the API. A self-signed certificate is made with the openssl command.
+
+Locally this only measures the cryptography saved; against the API a resumed TLS 1.2 session also
+saves a round trip.
+
+Usage: python benchmarks/bench_tls_resumption.py [connections]
+"""
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'module_utils'))
+
+import transport
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+class Handler(BaseHTTPRequestHandler):
+
+  protocol_version = 'HTTP/1.1'
+
+  def log_message(self, *args):
+    pass
+
+  def do_GET(self):
+    body = b'{"data":[],"pagination":{"next":null}}'
+
+    self.send_response(200)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+class Server(ThreadingMixIn, HTTPServer):
+
+  daemon_threads = True
+
+def serve(directory):
+  cert = os.path.join(directory, 'cert.pem')
+  key = os.path.join(directory, 'key.pem')
+
+  subprocess.check_call(
+    [ 'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=localhost', '-keyout', key, '-out', cert ],
+    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+  )
+
+  context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+  context.load_cert_chain(cert, key)
+
+  server = Server(('localhost', 0), Handler)
+  server.socket = context.wrap_socket(server.socket, server_side=True)
+
+  thread = threading.Thread(target=server.serve_forever)
+  thread.daemon = True
+  thread.start()
+
+  return server
+
+def handshakes(url, count, sessions):
+  """
+  Time the handshakes of count new connections; returns the times and the number of resumed sessions.
+  """
+
+  pool = transport.ConnectionPool(url, validate_certs=False, sessions=sessions)
+
+  times = []
+  resumed = 0
+
+  for i in range(count):
+    http = pool.connect()
+
+    start = time.time()
+    http.connect()
+    times.append(time.time() - start)
+
+    resumed += http.sock.session_reused
+
+    # TLS 1.3 sends the session ticket after the handshake; a request receives it.
+    http.request('GET', '/api/v2/monitors')
+    http.getresponse().read()
+    http.cache_session()
+    http.close()
+
+  return (times, resumed)
+
+def main():
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+  directory = tempfile.mkdtemp()
+
+  try:
+    server = serve(directory)
+  finally:
+    shutil.rmtree(directory)
+
+  url = 'https://localhost:{}/'.format(server.server_address[1])
+
+  print('{} new connections per mode'.format(count))
+
+  for name, sessions in [ ('full', None), ('resumed', transport.SessionCache(300)) ]:
+    times, resumed = handshakes(url, count, sessions)
+    times.sort()
+
+    print('{:<8} median {:8.2f} ms p90 {:8.2f} ms resumed {}/{}'.format(name, times[len(times) // 2] * 1000, times[int(len(times) * 0.9)] * 1000, resumed, count))
+
+  server.shutdown()
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,425 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from ansible import constants as C
+from ansible import context
+from ansible.module_utils.basic import env_fallback
+from ansible.plugins.action import ActionBase
+from ansible.utils.path import makedirs_safe
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.accounts import Account
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.monitor_options import MONITOR_OPTIONS
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.reconcile import changes, fingerprint, identity, index_entries
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.resolver import REFERENCES
+
+# The options of the task which aren't options of the monitor.
+ARGUMENT_SPEC = dict(
+  api_token=dict(
+    type='str',
+    required=True,
+    no_log=True,
+    fallback=(env_fallback, ['BU_API_TOKEN'])
+  ),
+  state=dict(
+    type='str',
+    required=False,
+    choices=['present','absent'],
+    default='present'
+  ),
+  check_for=dict(
+    type='list',
+    required=False,
+    default='url'
+  ),
+  workers=dict(
+    type='int',
+    required=False,
+    default=8
+  ),
+  batch_window=dict(
+    type='float',
+    required=False,
+    default=0.5
+  ),
+  validate_certs=dict(
+    type='bool',
+    required=False,
+    default=True
+  ),
+  https_proxy=dict(
+    type='str',
+    required=False,
+    default=None,
+    fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+  )
+)
+
+# The options of the monitor; the names a batch doesn't resolve (policy_name, monitor_group_name) aren't taken.
+MONITOR_SPEC = dict((option, spec) for option, spec in MONITOR_OPTIONS.items() if option not in REFERENCES)
+
+ARGUMENT_SPEC.update(MONITOR_SPEC)
+
+def account_hash(api_token):
+  """
+  Return the hash an account is spooled under instead of its API token.
+
+  :param str api_token: The API token.
+  """
+
+  return hashlib.sha256(api_token.encode('utf-8')).hexdigest()[:32]
+
+class Spool():
+  """
+  The directory in which the hosts of a task hand in their monitor and pick up its result.
+
+  The directory lives in the local tmp dir of the run, which is shared by the forks of the controller
+  and removed when the run ends. The files are private to the user and hold no API tokens: an item is
+  spooled under a hash of its token and only a host with that token (in memory) flushes it.
+  """
+
+  def __init__(self, task_uuid):
+    """
+    :param str task_uuid: The uuid of the task, which is the same for all its hosts.
+    """
+
+    self.path = os.path.join(C.DEFAULT_LOCAL_TMP, 'monitors_batch-' + task_uuid)
+
+    makedirs_safe(self.path, 0o700)
+
+  def write(self, name, data):
+    fd, tmp = tempfile.mkstemp(dir=self.path, prefix='.')
+
+    # The spool is written with the json of the stdlib, which also takes the (tagged) strings of the task args.
+    with os.fdopen(fd, 'w') as handle:
+      json.dump(data, handle)
+
+    os.rename(tmp, os.path.join(self.path, name))
+
+  def put(self, token, item):
+    """
+    Hand in the item of a host.
+
+    :param str token: The token the result of the item is picked up with (prefixed with its account).
+    :param dict item: The item.
+    """
+
+    self.write(token + '.item', item)
+
+  def pending(self, account=None):
+    """
+    Return the tokens of the items which wait for a flush.
+
+    :param str account: Only the items of the account with this hash (Default: None, all of them).
+    """
+
+    return sorted(name[:-5] for name in os.listdir(self.path) if name.endswith('.item') and (account is None or name.startswith(account + '.')))
+
+  def take(self, tokens):
+    """
+    Take the items of the tokens out of the spool.
+
+    :param list tokens: The tokens.
+    """
+
+    items = []
+
+    for token in tokens:
+      path = os.path.join(self.path, token + '.item')
+
+      with open(path) as handle:
+        items.append(dict(json.load(handle), token=token))
+
+      os.remove(path)
+
+    return items
+
+  def answer(self, token, result):
+    """
+    Leave the result of an item for its host.
+
+    :param str token: The token of the item.
+    :param dict result: The result.
+    """
+
+    self.write(token + '.result', result)
+
+  def result(self, token):
+    """
+    Pick up the result of an item, or None when it isn't flushed yet.
+
+    :param str token: The token of the item.
+    """
+
+    path = os.path.join(self.path, token + '.result')
+
+    try:
+      with open(path) as handle:
+        result = json.load(handle)
+    except (IOError, OSError):
+      return None
+
+    os.remove(path)
+
+    return result
+
+  def discard(self, token):
+    """
+    Remove what is left of an item, e.g. when its host failed before it picked up the result.
+
+    :param str token: The token of the item.
+    """
+
+    for suffix in [ '.item', '.result' ]:
+      try:
+        os.remove(os.path.join(self.path, token + suffix))
+      except OSError:
+        pass
+
+  def lock(self):
+    """
+    Return the (locked) lock file of the flush; one host flushes at a time.
+    """
+
+    handle = open(os.path.join(self.path, 'lock'), 'w')
+
+    fcntl.flock(handle, fcntl.LOCK_EX)
+
+    return handle
+
+class ActionModule(ActionBase):
+  """
+  Create / update or remove the monitor of every host of a task in one batch on the controller.
+
+  Every host hands its monitor in to a spool; the first host to get the lock waits until the hosts of
+  the batch (which run at the same time) have handed in theirs, or until no more came in for
+  batch_window seconds. It then flushes all of them with one listing and concurrent writes, and leaves
+  the result of every monitor in the spool for its host. The hosts which came in after the flush
+  started are flushed by the next host to get the lock.
+  """
+
+  TRANSFERS_FILES = False
+  _VALID_ARGS = frozenset(ARGUMENT_SPEC)
+
+  def reconcile(self, items, api_token):
+    """
+    Reconcile the items of one account and check_for; returns the result by token.
+
+    :param list items: The items.
+    :param str api_token: The API token of the account.
+    """
+
+    first = items[0]
+    check_for = first['check_for']
+    workers = first['workers']
+
+    if first['https_proxy']:
+      os.environ['https_proxy'] = first['https_proxy']
+
+    api = Account('monitors_batch', api_token, first['validate_certs'], bool(first['https_proxy']), workers)
+
+    try:
+      ret, resp = api.BUGet('monitors')
+
+      if not ret:
+        return dict((item['token'], dict(failed=True, changed=False, msg=resp)) for item in items)
+
+      index = index_entries(resp, check_for)
+      by_key = {}
+
+      for item in items:
+        by_key.setdefault(item['key'], []).append(item)
+
+      results = {}
+      writes = []
+
+      # Hosts which declare the same monitor share its write; hosts which declare it differently fail.
+      for key, declared in sorted(by_key.items()):
+        if len(set(item['fingerprint'] for item in declared)) > 1:
+          for item in declared:
+            results[item['token']] = dict(failed=True, changed=False, msg='Monitor {} is declared differently by the hosts {}.'.format(key, ', '.join(sorted(item['host'] for item in declared))))
+          continue
+
+        item = declared[0]
+        entry = index.get(key)
+        write = dict(key=key, tokens=[ item['token'] for item in declared ], id=entry['id'] if entry else None, result=dict(entry['attributes'], id=entry['id']) if entry else {})
+
+        if item['state'] == 'present' and not entry:
+          write.update(action='created', method='POST', data=item['data'])
+        elif item['state'] == 'present' and changes(item['data'], entry['attributes']):
+          write.update(action='updated', method='PATCH', data=changes(item['data'], entry['attributes']))
+        elif item['state'] == 'absent' and entry:
+          write.update(action='deleted', method='DELETE', data=None)
+        else:
+          write['action'] = 'unchanged'
+
+        if write['action'] != 'unchanged':
+          writes.append(write)
+
+        for token in write['tokens']:
+          results[token] = write
+
+      if not first['check_mode']:
+        run_concurrent(lambda write: self.write(api, write), writes, workers)
+
+      batch = dict(monitors=len(items), writes=len(writes))
+
+      for token, write in list(results.items()):
+        if 'action' not in write:
+          continue
+
+        result = dict(changed=write['action'] != 'unchanged', action=write['action'], result=write['result'], batch=batch)
+
+        if write.get('return_code'):
+          result['return_code'] = write['return_code']
+
+        if 'errors' in write:
+          result.update(failed=True, changed=False, msg=write['errors'])
+
+        results[token] = result
+
+      return results
+
+    finally:
+      api.close()
+
+  def write(self, api, write):
+    """
+    Send the write of a monitor.
+
+    :param Account api: The account.
+    :param dict write: The write.
+    """
+
+    code, body = api.BURequest('monitors' + ('/' + str(write['id']) if write['id'] else ''), write['data'], write['method'])
+
+    write['return_code'] = code
+
+    if code >= 400 or 'errors' in body:
+      write['errors'] = body.get('errors', body)
+    elif write['method'] == 'DELETE':
+      write['result'] = {}
+    elif 'data' in body:
+      write['result'] = dict(body['data']['attributes'], id=body['data']['id'])
+
+    return write
+
+  def flush(self, spool, expected, window, api_token):
+    """
+    Wait for the items of the batch and reconcile the pending items of the account of api_token; the
+    items of other accounts are left for a host of theirs.
+
+    :param Spool spool: The spool.
+    :param int expected: The number of hosts which run the task at the same time.
+    :param float window: How long to wait for more items after the last one came in.
+    :param str api_token: The API token of the host that flushes.
+    """
+
+    count, since = 0, time.time()
+
+    while True:
+      pending = spool.pending()
+
+      if len(pending) >= expected:
+        break
+
+      if len(pending) != count:
+        count, since = len(pending), time.time()
+      elif time.time() - since >= window:
+        break
+
+      time.sleep(0.02)
+
+    items = spool.take(spool.pending(account_hash(api_token)))
+    groups = {}
+
+    for item in items:
+      groups.setdefault(fingerprint([ item['validate_certs'], item['https_proxy'], item['check_for'], item['check_mode'] ]), []).append(item)
+
+    for group in groups.values():
+      try:
+        results = self.reconcile(group, api_token)
+      except Exception as e:
+        results = dict((item['token'], dict(failed=True, changed=False, msg='Flushing the batch failed: {}'.format(e))) for item in group)
+
+      for item in group:
+        spool.answer(item['token'], results[item['token']])
+
+  def run(self, tmp=None, task_vars=None):
+
+    result = super(ActionModule, self).run(tmp, task_vars)
+    del tmp
+
+    task_vars = task_vars or {}
+
+    # Typos and wrong types fail like the options of a module do.
+    args = self.validate_argument_spec(argument_spec=ARGUMENT_SPEC)[1]
+
+    check_for = args['check_for']
+    data = dict((option, value) for option, value in args.items() if value is not None and option in MONITOR_SPEC)
+
+    missing = [ option for option in check_for if option not in data ]
+
+    if missing:
+      result.update(failed=True, msg='The check_for option(s) {} are missing.'.format(', '.join(missing)))
+      return result
+
+    api_token = args['api_token']
+
+    item = dict(
+      host=task_vars.get('inventory_hostname'),
+      key=identity(data, check_for),
+      fingerprint=fingerprint([ args['state'], data ]),
+      state=args['state'],
+      data=data,
+      check_for=check_for,
+      validate_certs=args['validate_certs'],
+      https_proxy=args['https_proxy'],
+      workers=args['workers'],
+      check_mode=bool(self._play_context.check_mode)
+    )
+
+    # Only the hosts which run at the same time can hand in their monitor for the same flush.
+    expected = min(len(task_vars.get('ansible_play_batch') or [ item['host'] ]), context.CLIARGS.get('forks') or C.DEFAULT_FORKS)
+    window = args['batch_window']
+
+    spool = Spool(self._task._uuid)
+    token = '{}.{}'.format(account_hash(api_token), uuid.uuid4().hex)
+
+    try:
+      spool.put(token, item)
+
+      while True:
+        answer = spool.result(token)
+
+        if answer is not None:
+          break
+
+        lock = spool.lock()
+
+        try:
+          answer = spool.result(token)
+
+          if answer is not None:
+            break
+
+          self.flush(spool, expected, window, api_token)
+        finally:
+          lock.close()
+    finally:
+      spool.discard(token)
+
+    result.update(answer)
+
+    return result
@@ -0,0 +1,224 @@
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: betteruptime
+
+short_description: "HttpApi plugin for the Better Uptime RestAPI."
+
+version_added: "1.1.0"
+
+description:
+  - "This plugin keeps one session with the Better Uptime RestAPI for the whole play, shared by all the tasks that use the C(ansible.netcommon.httpapi) connection."
+  - "The HTTPS connection is kept alive between requests and tasks, requests are rate limited and GET responses can be cached."
+  - "The modules of this collection send their requests through this plugin when the connection is used."
+
+options:
+  api_token:
+    description: "API Bearer token. When it is not set, the token of the module is used."
+    type: str
+    env:
+      - name: BU_API_TOKEN
+    vars:
+      - name: ansible_httpapi_betteruptime_api_token
+  rate_limit:
+    description: "The maximum number of requests per second (0 disables the rate limit)."
+    type: float
+    default: 0
+    env:
+      - name: BU_RATE_LIMIT
+    vars:
+      - name: ansible_httpapi_betteruptime_rate_limit
+  retries:
+    description: "How many times a request is retried when it is rate limited (429) or the service is unavailable (503)."
+    type: int
+    default: 5
+    env:
+      - name: BU_RETRIES
+    vars:
+      - name: ansible_httpapi_betteruptime_retries
+  cache_ttl:
+    description:
+      - "How long (in seconds) GET responses are cached for the next tasks (0 disables the cache)."
+      - "The cache is cleared on every write."
+    type: int
+    default: 0
+    env:
+      - name: BU_CACHE_TTL
+    vars:
+      - name: ansible_httpapi_betteruptime_cache_ttl
+  tls_session_ttl:
+    description:
+      - "How long (in seconds) the TLS session of the connection is resumed when the connection has to be reopened (0 disables resumption)."
+      - "The session is held in the memory of the connection process only, so reconnects during the play do an abbreviated handshake."
+    type: int
+    default: 300
+    env:
+      - name: BU_TLS_SESSION_TTL
+    vars:
+      - name: ansible_httpapi_betteruptime_tls_session_ttl
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Inventory variables of the betteruptime host.
+# ansible_host: betteruptime.com
+# ansible_connection: ansible.netcommon.httpapi
+# ansible_network_os: betteruptime.betteruptime.betteruptime
+# ansible_httpapi_use_ssl: true
+# ansible_httpapi_betteruptime_api_token: <api_token>
+# ansible_httpapi_betteruptime_rate_limit: 10
+'''
+
+import os
+import socket
+import threading
+import time
+
+from ansible.module_utils.common.text.converters import to_bytes, to_text
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.parse import urlparse
+from ansible.plugins.httpapi import HttpApiBase
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.transport import HTTPSConnection, SESSIONS, can_resend, tls_context
+
+class HttpApi(HttpApiBase):
+
+  def __init__(self, connection):
+    super(HttpApi, self).__init__(connection)
+
+    self._http = None
+    self._cache = {}
+    self._lock = threading.Lock()
+    self._next_slot = 0.0
+
+  def _connect(self):
+    """
+    Open the (kept alive) HTTPS connection to Better Uptime, through the https proxy when one is set.
+    """
+
+    host = self.connection.get_option('host')
+    port = self.connection.get_option('port') or 443
+    timeout = self.connection.get_option('persistent_command_timeout')
+
+    context = tls_context(bool(self.connection.get_option('validate_certs')))
+
+    SESSIONS.ttl = self.get_option('tls_session_ttl')
+
+    proxy = os.environ.get('https_proxy') or os.environ.get('HTTPS_PROXY')
+
+    if proxy and self.connection.get_option('use_proxy'):
+      proxy = urlparse(proxy)
+      http = HTTPSConnection(proxy.hostname, proxy.port or 443, timeout, context, SESSIONS)
+      http.set_tunnel(host, port)
+    else:
+      http = HTTPSConnection(host, port, timeout, context, SESSIONS)
+
+    return http
+
+  def _throttle(self):
+    """
+    Wait for the next free slot of the rate limit.
+    """
+
+    rate_limit = self.get_option('rate_limit')
+
+    if not rate_limit:
+      return
+
+    with self._lock:
+      now = time.time()
+      slot = max(now, self._next_slot)
+      self._next_slot = slot + 1.0 / rate_limit
+
+    if slot > now:
+      time.sleep(slot - now)
+
+  def _send(self, path, data, method, headers):
+    """
+    Send one request over the kept alive connection, reconnecting once when the server closed it.
+
+    Only a request on a reused connection is sent again, and only when the server can't have processed
+    it or it is idempotent (see can_resend), so a POST or PATCH is never applied twice.
+    """
+
+    for attempt in range(2):
+      reused = self._http is not None
+      sent = False
+
+      if self._http is None:
+        self._http = self._connect()
+
+      try:
+        self._http.request(method, path, body=data, headers=headers)
+        sent = True
+        response = self._http.getresponse()
+        body = response.read()
+        self._http.cache_session()
+        return (response.status, body, response.getheader('Retry-After'))
+      except (http_client.HTTPException, socket.error) as e:
+        self._http.close()
+        self._http = None
+
+        if attempt or not reused or not can_resend(method, e, sent):
+          raise
+
+  def send_request(self, data, path, method='GET', headers=None):
+    """
+    Send a request to the Better Uptime RestAPI and return the http status code and the response body.
+
+    :param str data: The (JSON encoded) data of the request.
+    :param str path: The path (and query) of the request.
+    :param str method: The method of the request (Default: GET).
+    :param dict headers: The headers of the request (Default: None).
+    """
+
+    headers = dict(headers or {})
+
+    if self.get_option('api_token'):
+      headers['Authorization'] = 'Bearer {}'.format( self.get_option('api_token') )
+
+    headers.setdefault('Content-Type', 'application/json')
+
+    cache_key = (path, headers.get('Authorization'))
+
+    if method == 'GET':
+      cached = self._cache.get(cache_key)
+
+      if cached and cached[0] > time.time():
+        return (cached[1], cached[2])
+    else:
+      self._cache.clear()
+
+    data = to_bytes(data) if data is not None else None
+
+    for attempt in range(self.get_option('retries') + 1):
+      self._throttle()
+
+      code, body, retry_after = self._send(path, data, method, headers)
+
+      if code not in (429, 503) or attempt == self.get_option('retries'):
+        break
+
+      try:
+        delay = float(retry_after)
+      except (TypeError, ValueError):
+        delay = 2 ** attempt
+
+      time.sleep(delay)
+
+    body = to_text(body)
+
+    if method == 'GET' and code == 200 and self.get_option('cache_ttl'):
+      self._cache[cache_key] = (time.time() + self.get_option('cache_ttl'), code, body)
+
+    return (code, body)
+
+  def logout(self):
+    if self._http is not None:
+      self._http.close()
+      self._http = None
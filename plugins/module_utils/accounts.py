@@ -0,0 +1,147 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi, HttpApiResponse
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.cassette import CASSETTE
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import report, run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import PROFILER
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.progress import PROGRESS
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.transport import ConnectionPool, RateLimiter
+
+try:
+  from urllib.parse import urlparse
+except ImportError:
+  from urlparse import urlparse
+
+class Account(BURestApi):
+  """
+  One Better Uptime team (api_token) with its own connection pool, rate limiter and number of workers.
+
+  Rate limited (429) and unavailable (503) responses are retried after their Retry-After, which only
+  holds up the requests of this account.
+  """
+
+  def __init__(self, name, api_token, validate_certs=True, use_proxy=False, workers=8, rate_limit=0, retries=5):
+    """
+    :param str name: The name of the account, which keys its results.
+    :param str api_token: The API Bearer token of the account.
+    :param bool validate_certs: Require HTTPS-webrequest certificate validation (Default: True).
+    :param bool use_proxy: Use the https_proxy of the environment (Default: False).
+    :param int workers: The maximum number of concurrent requests of this account (Default: 8).
+    :param float rate_limit: The maximum number of requests per second of this account (Default: 0, unlimited).
+    :param int retries: How many times a rate limited request is retried (Default: 5).
+    """
+
+    self.name = name
+    self.api_token = api_token
+    self.validate_certs = validate_certs
+    self.use_proxy = use_proxy
+    self.workers = workers
+    self.retries = retries
+    self.limiter = RateLimiter(rate_limit)
+    self.pool = ConnectionPool(self.api_url, validate_certs, use_proxy, workers)
+
+  def httpRequest(self, url, headers=None, data=None, method='GET'):
+    """
+    Execute a http webrequest over the connection pool of the account.
+
+    :param str url: The url of your http request.
+    :param dict headers: The headers of your http request (Default: None).
+    :param str/bytes/dict data: The data of your http request; dicts are JSON encoded (Default: None).
+    :param str method: The method of your http request (Default: GET).
+    """
+
+    if isinstance(data,dict):
+      data = json_dumps(data)
+    elif data != None and not isinstance(data,bytes):
+      data = data.encode('utf-8')
+
+    url = urlparse(url)
+    path = url.path + ('?' + url.query if url.query else '')
+
+    with PROFILER.phase('http_get' if method == 'GET' else 'http_write'):
+
+      for attempt in range(self.retries + 1):
+        self.limiter.wait()
+
+        PROGRESS.request()
+
+        start = time.time()
+
+        try:
+          if CASSETTE.replaying:
+            code, body, retry_after = CASSETTE.replay(method, path, data)
+          else:
+            code, body, retry_after = self.pool.request(method, path, data, headers)
+        except Exception:
+          report(None, time.time() - start)
+          raise
+
+        if CASSETTE.recording:
+          CASSETTE.record(method, path, data, code, body, retry_after, time.time() - start, self.api_token)
+
+        report(code, time.time() - start)
+
+        if code not in (429, 503) or attempt == self.retries:
+          break
+
+        try:
+          delay = float(retry_after)
+        except (TypeError, ValueError):
+          delay = 2 ** attempt
+
+        time.sleep(delay * CASSETTE.speed if CASSETTE.replaying else delay)
+
+    return HttpApiResponse(code, body)
+
+  def close(self):
+    self.pool.close()
+
+def load_accounts(accounts, validate_certs=True, use_proxy=False, workers=8):
+  """
+  Create the Account of every entry of the accounts option.
+
+  :param list accounts: The accounts; dicts with a name, api_token and optionally workers and rate_limit.
+  :param bool validate_certs: Require HTTPS-webrequest certificate validation (Default: True).
+  :param bool use_proxy: Use the https_proxy of the environment (Default: False).
+  :param int workers: The default number of workers per account (Default: 8).
+  """
+
+  return [
+    Account(
+      account['name'],
+      account['api_token'],
+      validate_certs,
+      use_proxy,
+      account.get('workers') or workers,
+      account.get('rate_limit') or 0
+    )
+    for account in accounts
+  ]
+
+def fan_out(func, accounts):
+  """
+  Call func for every account in a thread of its own and return the results keyed by account name.
+
+  An account whose func raises gets a result with the error, so it doesn't take down the other accounts.
+
+  :param callable func: The function to call with every account.
+  :param list accounts: The accounts.
+  """
+
+  def call(account):
+    try:
+      return func(account)
+    except Exception as e:
+      return dict(msg='{}: {}'.format(type(e).__name__, e))
+    finally:
+      account.close()
+
+  return dict(zip([ account.name for account in accounts ], run_concurrent(call, accounts, len(accounts), adaptive=False)))
@@ -0,0 +1,273 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import csv
+import json
+import math
+
+try:
+  import numpy as np
+  HAS_NUMPY = True
+except ImportError:
+  HAS_NUMPY = False
+
+def group_stats(groups, columns):
+  """
+  Aggregate columns of numbers per group; returns one row per group (in order of appearance).
+
+  Every row has the group, the count and the sum, mean, min and max of every column.
+  The aggregation is vectorized with NumPy when it is available.
+
+  :param list groups: The group of every value (one per value, all columns have the same length).
+  :param dict columns: The name and the list of values of every column.
+  """
+
+  index = {}
+  keys = [ index.setdefault(group, len(index)) for group in groups ]
+  size = len(index)
+
+  rows = [ dict(group=group) for group in index ]
+
+  if HAS_NUMPY:
+    keys = np.asarray(keys, dtype=np.intp)
+    counts = np.bincount(keys, minlength=size)
+
+    for row, count in zip(rows, counts.tolist()):
+      row['count'] = count
+
+    for name, values in columns.items():
+      values = np.asarray(values, dtype=np.float64)
+
+      sums = np.bincount(keys, weights=values, minlength=size)
+      mins = np.full(size, np.inf)
+      maxs = np.full(size, -np.inf)
+
+      np.minimum.at(mins, keys, values)
+      np.maximum.at(maxs, keys, values)
+
+      for row, total, count, low, high in zip(rows, sums.tolist(), counts.tolist(), mins.tolist(), maxs.tolist()):
+        row.update({ name + '_sum': total, name + '_mean': total / count, name + '_min': low, name + '_max': high })
+
+    return rows
+
+  for row in rows:
+    row['count'] = 0
+
+  for key in keys:
+    rows[key]['count'] += 1
+
+  for name, values in columns.items():
+    for row in rows:
+      row.update({ name + '_sum': 0.0, name + '_min': None, name + '_max': None })
+
+    for key, value in zip(keys, values):
+      row = rows[key]
+      row[name + '_sum'] += value
+      row[name + '_min'] = value if row[name + '_min'] is None else min(row[name + '_min'], value)
+      row[name + '_max'] = value if row[name + '_max'] is None else max(row[name + '_max'], value)
+
+    for row in rows:
+      row[name + '_mean'] = row[name + '_sum'] / row['count']
+
+  return rows
+
+def write_table(path, rows, format='csv'):
+  """
+  Write rows (dicts with the same keys) as one CSV or JSON table.
+
+  :param str path: The path of the table.
+  :param list rows: The rows of the table.
+  :param str format: csv or json (Default: csv).
+  """
+
+  fields = []
+
+  for row in rows:
+    fields.extend(field for field in row if field not in fields)
+
+  with open(path, 'w') as handle:
+    if format == 'json':
+      json.dump(dict(columns=fields, rows=[ [ row.get(field) for field in fields ] for row in rows ]), handle)
+    else:
+      writer = csv.DictWriter(handle, fieldnames=fields, lineterminator='\n')
+      writer.writeheader()
+      writer.writerows(rows)
+
+class Histogram():
+  """
+  A log-scale histogram of positive values, to compute percentiles of a stream with a bounded relative error.
+
+  Only the count per bin is kept, so the memory doesn't grow with the number of values.
+  """
+
+  def __init__(self, precision=0.01, minimum=1e-6):
+    """
+    :param float precision: The relative error of the percentiles (Default: 0.01).
+    :param float minimum: Values below this value count as this value (Default: 1e-6).
+    """
+
+    self.base = math.log(1 + 2 * precision)
+    self.minimum = minimum
+    self.bins = {}
+    self.count = 0
+    self.total = 0.0
+    self.low = None
+    self.high = None
+
+  def add(self, values):
+    """
+    Add a batch of values.
+
+    :param list values: The values to add.
+    """
+
+    if not len(values):
+      return
+
+    if HAS_NUMPY:
+      values = np.maximum(np.asarray(values, dtype=np.float64), self.minimum)
+      bins, counts = np.unique(np.floor(np.log(values / self.minimum) / self.base).astype(np.int64), return_counts=True)
+      total, low, high = float(values.sum()), float(values.min()), float(values.max())
+      pairs = zip(bins.tolist(), counts.tolist())
+    else:
+      values = [ max(value, self.minimum) for value in values ]
+      pairs = {}
+
+      for value in values:
+        key = int(math.floor(math.log(value / self.minimum) / self.base))
+        pairs[key] = pairs.get(key, 0) + 1
+
+      total, low, high = float(sum(values)), min(values), max(values)
+      pairs = pairs.items()
+
+    for key, count in pairs:
+      self.bins[key] = self.bins.get(key, 0) + count
+
+    self.count += len(values)
+    self.total += total
+    self.low = low if self.low is None else min(self.low, low)
+    self.high = high if self.high is None else max(self.high, high)
+
+  def merge(self, other):
+    """
+    Add the values of another histogram (with the same precision).
+
+    :param Histogram other: The histogram to merge.
+    """
+
+    for key, count in other.bins.items():
+      self.bins[key] = self.bins.get(key, 0) + count
+
+    self.count += other.count
+    self.total += other.total
+
+    for value in [ other.low, other.high ]:
+      if value is not None:
+        self.low = value if self.low is None else min(self.low, value)
+        self.high = value if self.high is None else max(self.high, value)
+
+  def percentile(self, percentile):
+    """
+    Return the (approximated) percentile of the values, or None when there are none.
+
+    :param float percentile: The percentile (0 - 100).
+    """
+
+    if not self.count:
+      return None
+
+    rank = max(1, int(math.ceil(percentile / 100.0 * self.count)))
+    seen = 0
+
+    for key in sorted(self.bins):
+      seen += self.bins[key]
+
+      if seen >= rank:
+        # The geometric middle of the bin; within the precision of every value in it.
+        value = self.minimum * math.exp((key + 0.5) * self.base)
+        return min(max(value, self.low), self.high)
+
+  def summary(self, percentiles):
+    """
+    Return the count, mean, min, max and the percentiles of the values.
+
+    :param list percentiles: The percentiles (0 - 100) to report.
+    """
+
+    summary = dict(
+      count=self.count,
+      mean=self.total / self.count if self.count else None,
+      min=self.low,
+      max=self.high
+    )
+
+    for percentile in percentiles:
+      summary['p{:g}'.format(percentile)] = self.percentile(percentile)
+
+    return summary
+
+class Downsampler():
+  """
+  Downsample a stream of (timestamp, value) points into fixed time buckets (count, mean, min and max per bucket).
+  """
+
+  def __init__(self, bucket):
+    """
+    :param int bucket: The size of the buckets in seconds.
+    """
+
+    self.bucket = bucket
+    self.buckets = {}
+
+  def add(self, timestamps, values):
+    """
+    Add a batch of points.
+
+    :param list timestamps: The (epoch) timestamps of the points.
+    :param list values: The values of the points.
+    """
+
+    if not len(values):
+      return
+
+    if HAS_NUMPY:
+      keys = (np.asarray(timestamps, dtype=np.int64) // self.bucket) * self.bucket
+      values = np.asarray(values, dtype=np.float64)
+      starts, index = np.unique(keys, return_inverse=True)
+
+      counts = np.bincount(index)
+      sums = np.bincount(index, weights=values)
+      mins = np.full(len(starts), np.inf)
+      maxs = np.full(len(starts), -np.inf)
+
+      np.minimum.at(mins, index, values)
+      np.maximum.at(maxs, index, values)
+
+      batches = zip(starts.tolist(), counts.tolist(), sums.tolist(), mins.tolist(), maxs.tolist())
+    else:
+      batches = []
+
+      for timestamp, value in zip(timestamps, values):
+        batches.append((int(timestamp) // self.bucket * self.bucket, 1, value, value, value))
+
+    for start, count, total, low, high in batches:
+      bucket = self.buckets.get(start)
+
+      if bucket is None:
+        self.buckets[start] = [ count, total, low, high ]
+      else:
+        bucket[0] += count
+        bucket[1] += total
+        bucket[2] = min(bucket[2], low)
+        bucket[3] = max(bucket[3], high)
+
+  def rows(self):
+    """
+    Return the buckets as [start, count, mean, min, max] rows, in time order.
+    """
+
+    return [ [ start, bucket[0], bucket[1] / bucket[0], bucket[2], bucket[3] ] for start, bucket in sorted(self.buckets.items()) ]
@@ -5,17 +5,34 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
-from ansible.module_utils.urls import open_url
+import time
 
-import json
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.cassette import CASSETTE
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import report
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps, json_loads
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import PROFILER
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.progress import PROGRESS
 
 try:
-  from urllib.parse import urlencode
+  from urllib.parse import urlparse
 except ImportError:
-  from urllib import urlencode
+  from urlparse import urlparse
+
+class HttpApiResponse():
+  """
+  The response of a request sent through the httpapi connection, with the same read() and code as the response of open_url.
+  """
+
+  def __init__(self, code, body):
+    self.code = code
+    self.body = body
+
+  def read(self):
+    return self.body
 
 class BURestApi():
 
+  api_url         = 'https://betteruptime.com/api/v2/'
   use_proxy       = False
   validate_certs  = True
 
@@ -25,46 +42,118 @@ class BURestApi():
 
     :param str url: The url of your http request.
     :param dict headers: The headers of your http request (Default: None).
-    :param str/dict data: The data of your http request (Default: None).
+    :param str/bytes/dict data: The data of your http request; dicts are JSON encoded (Default: None).
     :param str method: The method of your http request (Default: GET).
     """
 
-    if data != None and not isinstance(data,dict):
-      data = bytearray(data, 'utf8')
-    elif isinstance(data,dict):
-      data = json.dumps(data)
+    if isinstance(data,dict):
+      data = json_dumps(data)
+    elif data != None and not isinstance(data,bytes):
+      data = data.encode('utf-8')
+
+    with PROFILER.phase('http_get' if method == 'GET' else 'http_write'):
+
+      start = time.time()
+
+      if CASSETTE.replaying:
+        code, body, retry_after = CASSETTE.replay(method, url, data)
+        resp = HttpApiResponse(code, body)
+      elif getattr(self, '_socket_path', None):
+        resp = self.httpapiRequest(url, headers, data, method)
+      else:
+        # Imported on first use; ansible.module_utils.urls is the largest import of a module, and the
+        # requests over the httpapi connection, an Account or a cassette don't need it.
+        from ansible.module_utils.urls import open_url
+
+        try:
+          resp = open_url(
+            url,
+            method=method,
+            data=data,
+            headers=headers,
+            validate_certs=self.validate_certs,
+            use_proxy=self.use_proxy
+          )
+        except Exception as r:
+          resp = r
+
+      if CASSETTE.recording and hasattr(resp, 'read'):
+        resp = HttpApiResponse(getattr(resp, 'code', None), resp.read())
+        CASSETTE.record(method, url, data, resp.code, resp.body, None, time.time() - start, self.api_token)
+
+      # The outcome steers the concurrency of the fan-out this request is part of.
+      report(getattr(resp, 'code', None), time.time() - start)
+      PROGRESS.request()
+
+      return resp
+
+  def httpapiRequest(self, url, headers=None, data=None, method='GET'):
+    """
+    Execute a http webrequest through the persistent httpapi connection of the play.
 
-    try:
-      resp = open_url(
-        url,
-        method=method,
-        data=data,
-        headers=headers,
-        validate_certs=self.validate_certs,
-        use_proxy=self.use_proxy
-      )
-    except Exception as r:
-      resp = r
+    :param str url: The url of your http request.
+    :param dict headers: The headers of your http request (Default: None).
+    :param bytes data: The data of your http request (Default: None).
+    :param str method: The method of your http request (Default: GET).
+    """
+
+    if getattr(self, '_bu_connection', None) is None:
+      from ansible.module_utils.connection import Connection
+
+      self._bu_connection = Connection(self._socket_path)
 
-    return resp
+    url = urlparse(url)
 
+    code, body = self._bu_connection.send_request(
+      data.decode('utf-8') if data != None else None,
+      path=url.path + ('?' + url.query if url.query else ''),
+      method=method,
+      headers=headers
+    )
 
-  def BUGet(self, resource, id=None):
+    return HttpApiResponse(code, body.encode('utf-8'))
+
+  def BUGet(self, resource, id=None, monitor_group_id=None):
     """
     Get a list of all the added betteruptime of a specific resource or pull one specifically by providing the id.
 
+    All the pages of a listing are followed and merged into one list.
+
     :param str resource: The Betteruptime resource type.
     :param int id: The resource id (Default: None).
+    :param str monitor_group_id: Only list the items of this monitor group, e.g. monitor-groups/<id>/monitors (Default: None).
+    """
+
+    data = None
+
+    if monitor_group_id and not id:
+      resource = 'monitor-groups/{}/{}'.format(monitor_group_id, resource)
+
+    for ret, page in self.BUPages(resource + (('/' + str(id)) if id else '')):
+
+      if not ret:
+        return (False, page)
+
+      if isinstance(page, list):
+        data = data or []
+        data.extend(page)
+      else:
+        data = page
+
+    return (True, data)
+
+  def BUPages(self, resource):
     """
+    Iterate over the pages of a Betteruptime resource, one (ret, data) tuple per page.
 
-    url = 'https://betteruptime.com/api/v2/' + resource + (('/' + str(id)) if id else '')
+    Iteration stops after the first page with errors; its ret is False and its data are the errors.
+
+    :param str resource: The Betteruptime resource path, optionally with a query string.
+    """
 
-    response = {
-      'resp' : dict(),
-      'code' : int()
-    }
+    url = self.api_url + resource
 
-    while True:
+    while url:
 
       resp = self.httpRequest(
         url,
@@ -74,16 +163,39 @@ class BURestApi():
         }
       )
 
-      response['resp'].update(json.loads(resp.read()))
+      with PROFILER.phase('json_decode'):
+        body = json_loads(resp.read())
+
+      if 'errors' in body:
+        yield (False, body['errors'])
+        return
+
+      yield (True, body.get('data'))
+
+      url = (body.get('pagination') or {}).get('next')
+
+  def BURequest(self, resource, data=None, method='GET'):
+    """
+    Execute a request on a Betteruptime resource and decode the response.
+
+    Returns a tuple with the http status code and the decoded response body.
+
+    :param str resource: The Betteruptime resource path (e.g. monitors/1).
+    :param dict data: The data of your request (Default: None).
+    :param str method: The method of your request (Default: GET).
+    """
 
-      response['code'] = resp.code
+    resp = self.httpRequest(
+      self.api_url + resource,
+      {
+        'Authorization': 'Bearer {}'.format( self.api_token ),
+        'Content-Type': 'application/json'
+      },
+      data,
+      method
+    )
 
-      if 'data' not in response['resp'] or 'pagination' not in response['resp']['data'] or response['resp']['data']['pagination']['next'] == 'null':
-        break
-      elif 'data' in response['resp'] and 'pagination' in response['resp']['data'] and response['resp']['data']['pagination']['next'] != 'null':
-        url = response['resp']['data']['pagination']['next']
+    body = resp.read()
 
-    if 'errors' in response['resp']:
-      return (False, response['resp']['errors'])
-    else:
-      return (True, response['resp']['data'])
+    with PROFILER.phase('json_decode'):
+      return (resp.code, json_loads(body) if body else {})
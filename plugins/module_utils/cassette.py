@@ -0,0 +1,171 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import atexit
+import collections
+import gzip
+import hashlib
+import os
+import threading
+import time
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps, json_loads
+
+try:
+  from urllib.parse import urlparse
+except ImportError:
+  from urlparse import urlparse
+
+# The status code of a replayed request that isn't in the cassette.
+NOT_RECORDED = 599
+
+def request_path(url):
+  """
+  Return the path and query of a url; the part of a request a cassette matches on.
+
+  :param str url: The url.
+  """
+
+  url = urlparse(url)
+
+  return url.path + ('?' + url.query if url.query else '')
+
+def digest(data):
+  """
+  Return a short hash of a request body (None without a body).
+
+  :param bytes data: The body.
+  """
+
+  return hashlib.sha1(data).hexdigest()[:16] if data else None
+
+def replay_speed():
+  """
+  Return the factor of the recorded latencies from BU_REPLAY_SPEED; 1 when it isn't a number of 0 or more.
+  """
+
+  try:
+    speed = float(os.environ.get('BU_REPLAY_SPEED') or 1)
+  except ValueError:
+    return 1.0
+
+  return speed if 0 <= speed < float('inf') else 1.0
+
+class Cassette():
+  """
+  Opt-in recording and replay of the requests of a module, to reproduce a run offline.
+
+  BU_CASSETTE=<path> with BU_CASSETTE_MODE=record appends every request (method, path and a hash of
+  the body), its response (status code and body) and its latency to the cassette; one JSON line per
+  request, gzipped when the path ends with .gz. The headers aren't recorded and the API token is
+  redacted from the bodies, so a cassette holds no credentials.
+
+  BU_CASSETTE_MODE=replay serves the responses from the cassette instead of sending the requests;
+  the requests are matched on method, path and body, in the recorded order per match. Every response
+  is delayed by its recorded latency times BU_REPLAY_SPEED (Default: 1, 0 replays without delays). A
+  request that isn't in the cassette gets a 599 response with errors.
+  """
+
+  def __init__(self):
+    self.path = os.environ.get('BU_CASSETTE')
+    self.mode = (os.environ.get('BU_CASSETTE_MODE') or 'record').lower() if self.path else None
+    self.speed = replay_speed()
+    self.recording = self.mode == 'record'
+    self.replaying = self.mode == 'replay'
+    self.lock = threading.Lock()
+    self.entries = []
+    self.queues = None
+
+    if self.recording:
+      atexit.register(self.flush)
+
+  def open(self, mode):
+    return gzip.open(self.path, mode) if self.path.endswith('.gz') else open(self.path, mode)
+
+  def record(self, method, url, data, code, body, retry_after, seconds, secret=None):
+    """
+    Record one request and its response.
+
+    :param str method: The method of the request.
+    :param str url: The url of the request.
+    :param bytes data: The body of the request.
+    :param int code: The status code of the response (None when the request failed).
+    :param bytes body: The body of the response.
+    :param str retry_after: The Retry-After header of the response.
+    :param float seconds: The latency of the request.
+    :param str secret: The API token to redact from the bodies (Default: None).
+    """
+
+    if isinstance(body, bytes):
+      body = body.decode('utf-8', 'replace')
+
+    if secret and body:
+      body = body.replace(secret, '<redacted>')
+
+    entry = dict(
+      method=method,
+      path=request_path(url),
+      data=digest(data),
+      code=code,
+      body=body,
+      seconds=round(seconds, 4)
+    )
+
+    if retry_after is not None:
+      entry['retry_after'] = retry_after
+
+    with self.lock:
+      self.entries.append(entry)
+
+  def flush(self):
+    """
+    Append the recorded requests to the cassette; in one write, so concurrent processes don't interleave.
+    """
+
+    with self.lock:
+      entries, self.entries = self.entries, []
+
+    if entries:
+      with self.open('ab') as cassette:
+        cassette.write(b''.join(json_dumps(entry) + b'\n' for entry in entries))
+
+  def load(self):
+    self.queues = {}
+
+    with self.open('rb') as cassette:
+      for line in cassette:
+        if line.strip():
+          entry = json_loads(line)
+          self.queues.setdefault((entry['method'], entry['path'], entry['data']), collections.deque()).append(entry)
+
+  def replay(self, method, url, data):
+    """
+    Return the recorded (code, body, retry_after) of a request, after its recorded latency.
+
+    :param str method: The method of the request.
+    :param str url: The url of the request.
+    :param bytes data: The body of the request.
+    """
+
+    with self.lock:
+      if self.queues is None:
+        self.load()
+
+      queue = self.queues.get((method, request_path(url), digest(data)))
+      entry = queue.popleft() if queue else None
+
+    if entry is None:
+      return (NOT_RECORDED, json_dumps(dict(errors='{} {} is not in the cassette {}.'.format(method, request_path(url), self.path))), None)
+
+    if self.speed > 0:
+      time.sleep(entry['seconds'] * self.speed)
+
+    body = entry['body']
+
+    return (entry['code'], body.encode('utf-8') if body is not None else b'', entry.get('retry_after'))
+
+CASSETTE = Cassette()
@@ -0,0 +1,335 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Command line interface for bulk operations on Better Uptime, in one process with pooled connections and
+concurrent writes instead of an Ansible task per item.
+
+Usage: python -m ansible_collections.betteruptime.betteruptime.plugins.module_utils.cli <command> [options]
+
+Commands:
+  list               Print the existing monitors and/or status pages.
+  diff <file>        Print the changes which would make the account match a desired-state file.
+  apply <file>       Make the account match a desired-state file.
+  pause              Pause the selected monitors and save their prior state (--resume restores it).
+  export             Print the existing items as a desired-state file.
+
+A desired-state file (YAML or JSON) has a list of monitors and/or status_pages with the options of the
+monitors and status_page modules, and optionally their check_for:
+
+  check_for:
+    monitors: [ url ]
+  monitors:
+    - url: https://www.example.com
+      monitor_type: status
+    - url: https://old.example.com
+      state: absent
+  status_pages:
+    - subdomain: example
+      company_name: Example
+"""
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import sys
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.accounts import Account
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import CONTROLLERS, run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.reconcile import changes, identity, index_entries
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.pausestate import PauseState
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.selector import select_monitors
+
+try:
+  import yaml
+  HAS_YAML = True
+except ImportError:
+  HAS_YAML = False
+
+# The kinds of items of a desired-state file, with their resource and default check_for.
+KINDS = {
+  'monitors': dict(resource='monitors', check_for=[ 'url' ]),
+  'status_pages': dict(resource='status-pages', check_for=[ 'subdomain' ]),
+}
+
+# The attributes which are set by Better Uptime and left out of an export.
+READ_ONLY = [ 'created_at', 'updated_at', 'last_checked_at', 'status', 'paused_at', 'aggregate_state' ]
+
+def load(path):
+  """
+  Load a desired-state file; YAML when PyYAML is available, else JSON.
+
+  :param str path: The path of the file (- for stdin).
+  """
+
+  handle = sys.stdin if path == '-' else open(path)
+
+  try:
+    return yaml.safe_load(handle) if HAS_YAML else json.load(handle)
+  finally:
+    if handle is not sys.stdin:
+      handle.close()
+
+def dump(data, format):
+  """
+  Serialize data as YAML or JSON.
+
+  :param data: The data.
+  :param str format: yaml or json.
+  """
+
+  if format == 'yaml':
+    if not HAS_YAML:
+      raise SystemExit('PyYAML is required for the yaml format.')
+
+    return yaml.safe_dump(data, default_flow_style=False, sort_keys=False)
+
+  return json.dumps(data, indent=2, sort_keys=True)
+
+def plan(api, desired):
+  """
+  Match the items of a desired-state file with the existing items and return the writes to make.
+
+  The items are matched like the modules do: on the values of their check_for options. An existing
+  item is updated with the options which differ and removed when its state is absent.
+
+  :param Account api: The account.
+  :param dict desired: The desired-state file.
+  """
+
+  writes = []
+
+  for kind, spec in sorted(KINDS.items()):
+    items = desired.get(kind) or []
+
+    if not items:
+      continue
+
+    check_for = (desired.get('check_for') or {}).get(kind) or spec['check_for']
+    keys = set()
+
+    ret, resp = api.BUGet(spec['resource'])
+
+    if not ret:
+      raise SystemExit('Listing {} failed: {}'.format(kind, resp))
+
+    index = index_entries(resp, check_for)
+
+    for item in items:
+      data = dict((option, value) for option, value in item.items() if value is not None and option != 'state')
+      state = item.get('state') or 'present'
+
+      missing = [ option for option in check_for if option not in data ]
+
+      if missing:
+        raise SystemExit('{} {} is missing the check_for option(s) {}.'.format(kind, data, ', '.join(missing)))
+
+      key = identity(data, check_for)
+
+      if key in keys:
+        raise SystemExit('{} {} is defined more than once.'.format(kind, key))
+
+      keys.add(key)
+
+      entry = index.get(key)
+      write = dict(kind=kind, key=key, resource=spec['resource'], id=entry['id'] if entry else None)
+
+      if state == 'present' and not entry:
+        write.update(action='create', method='POST', data=data)
+      elif state == 'present' and changes(data, entry['attributes']):
+        write.update(action='update', method='PATCH', data=changes(data, entry['attributes']))
+      elif state == 'absent' and entry:
+        write.update(action='delete', method='DELETE', data=None)
+      else:
+        continue
+
+      writes.append(write)
+
+  return writes
+
+def send(api, write):
+  """
+  Send one write of a plan.
+
+  :param Account api: The account.
+  :param dict write: The write.
+  """
+
+  code, body = api.BURequest(write['resource'] + ('/' + str(write['id']) if write['id'] else ''), write['data'], write['method'])
+
+  write['return_code'] = code
+
+  if code >= 400 or 'errors' in body:
+    write['errors'] = body.get('errors', body)
+  elif 'data' in body:
+    write['id'] = body['data']['id']
+
+  return write
+
+def listing(api, kinds):
+  """
+  Return the existing items (with their id) by kind.
+
+  :param Account api: The account.
+  :param list kinds: The kinds of items to list.
+  """
+
+  items = {}
+
+  for kind in kinds:
+    ret, resp = api.BUGet(KINDS[kind]['resource'])
+
+    if not ret:
+      raise SystemExit('Listing {} failed: {}'.format(kind, resp))
+
+    items[kind] = [ dict(entry['attributes'], id=entry['id']) for entry in resp ]
+
+  return items
+
+def export(api, kinds):
+  """
+  Return the existing items as a desired-state file.
+
+  :param Account api: The account.
+  :param list kinds: The kinds of items to export.
+  """
+
+  desired = {}
+
+  for kind in kinds:
+    ret, resp = api.BUGet(KINDS[kind]['resource'])
+
+    if not ret:
+      raise SystemExit('Listing {} failed: {}'.format(kind, resp))
+
+    desired[kind] = [
+      dict((option, value) for option, value in entry['attributes'].items() if value is not None and option not in READ_ONLY)
+      for entry in resp
+    ]
+
+  return desired
+
+def pause(api, args):
+  """
+  Pause the selected monitors and save their prior state, or restore the saved state with --resume.
+
+  The state file is the same as the one of the monitors_pause module.
+
+  :param Account api: The account.
+  :param Namespace args: The arguments.
+  """
+
+  state = PauseState(args.state_file)
+
+  if args.resume:
+    writes = [ dict(kind='monitors', key=id, resource='monitors', id=id, action='resume', method='PATCH', data=dict(paused=False)) for id in state.resumes() ]
+  else:
+    if not args.ids and not args.group and not args.url_pattern:
+      raise SystemExit('One of --ids, --group or --url-pattern is required to pause monitors.')
+
+    ret, resp = api.BUGet('monitors')
+
+    if not ret:
+      raise SystemExit('Listing monitors failed: {}'.format(resp))
+
+    ids = state.pause(select_monitors(resp, args.ids, args.group, args.url_pattern))
+
+    # The prior state is saved before anything is paused, so it's never lost.
+    state.save()
+
+    writes = [ dict(kind='monitors', key=id, resource='monitors', id=id, action='pause', method='PATCH', data=dict(paused=True)) for id in ids ]
+
+  run_concurrent(lambda write: send(api, write), writes, api.workers)
+
+  if args.resume:
+    state.resumed([ write['id'] for write in writes if 'errors' in write ])
+
+  return writes
+
+def summarize(writes):
+  summary = {}
+
+  for write in writes:
+    summary.setdefault(write['kind'], {}).setdefault(write['action'], 0)
+    summary[write['kind']][write['action']] += 1
+
+  return summary
+
+def parser():
+  parser = argparse.ArgumentParser(prog='betteruptime', description='Bulk operations on Better Uptime.')
+
+  parser.add_argument('--api-token', default=os.environ.get('BU_API_TOKEN'), help='API Bearer token (default: $BU_API_TOKEN).')
+  parser.add_argument('--workers', type=int, default=int(os.environ.get('BU_WORKERS', 8)), help='The maximum number of concurrent requests.')
+  parser.add_argument('--rate-limit', type=float, default=0, help='The maximum number of requests per second (0: unlimited).')
+  parser.add_argument('--no-validate-certs', dest='validate_certs', action='store_false', help='Skip certificate validation.')
+  parser.add_argument('--use-proxy', action='store_true', help='Use the https_proxy of the environment.')
+
+  commands = parser.add_subparsers(dest='command')
+
+  command = commands.add_parser('list', help='Print the existing items.')
+  command.add_argument('--kind', choices=sorted(KINDS), action='append', help='The kinds of items (default: all).')
+
+  for name, help in [ ('diff', 'Print the changes a desired-state file would make.'), ('apply', 'Apply a desired-state file.') ]:
+    command = commands.add_parser(name, help=help)
+    command.add_argument('file', help='The desired-state file (YAML or JSON, - for stdin).')
+
+  command = commands.add_parser('pause', help='Pause (or --resume) the selected monitors.')
+  command.add_argument('--state-file', required=True, help='The file to save the prior state of the monitors in.')
+  command.add_argument('--resume', action='store_true', help='Restore the state saved in the state file.')
+  command.add_argument('--ids', nargs='+', help='Only pause these monitors.')
+  command.add_argument('--group', nargs='+', help='Only pause the monitors of these monitor groups.')
+  command.add_argument('--url-pattern', help='Only pause the monitors of which the url matches this regular expression.')
+
+  command = commands.add_parser('export', help='Print the existing items as a desired-state file.')
+  command.add_argument('--kind', choices=sorted(KINDS), action='append', help='The kinds of items (default: all).')
+  command.add_argument('--format', choices=[ 'yaml', 'json' ], default='yaml' if HAS_YAML else 'json')
+
+  return parser
+
+def main(argv=None):
+  args = parser().parse_args(argv)
+
+  if not args.command:
+    parser().print_help()
+    return 2
+
+  if not args.api_token:
+    sys.stderr.write('An API token is required (--api-token or BU_API_TOKEN).\n')
+    return 2
+
+  api = Account('cli', args.api_token, args.validate_certs, args.use_proxy, args.workers, args.rate_limit)
+
+  try:
+    if args.command == 'list':
+      print(dump(listing(api, args.kind or sorted(KINDS)), 'json'))
+      return 0
+
+    if args.command == 'export':
+      print(dump(export(api, args.kind or sorted(KINDS)), args.format))
+      return 0
+
+    if args.command == 'pause':
+      writes = pause(api, args)
+    else:
+      writes = plan(api, load(args.file) or {})
+
+      if args.command == 'apply':
+        run_concurrent(lambda write: send(api, write), writes, api.workers)
+
+    failed = [ write for write in writes if 'errors' in write ]
+
+    print(dump(dict(
+      summary=summarize(writes),
+      changes=writes,
+      concurrency=[ controller.stats() for controller in CONTROLLERS ]
+    ), 'json'))
+
+    return 1 if failed else 0
+  finally:
+    api.close()
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import threading
+import time
+
+try:
+  from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+  HAS_FUTURES = True
+except ImportError:
+  HAS_FUTURES = False
+
+# The controllers of the fan-outs of this process, for the statistics of the task.
+CONTROLLERS = []
+
+_local = threading.local()
+
+class AIMDController():
+  """
+  Additive increase / multiplicative decrease of the number of concurrent calls.
+
+  The limit starts at half of the maximum and grows by one after every limit healthy responses. It is
+  halved on a rate limited (429) or server error (5xx) response or when the latency spikes to more than
+  three times the moving average; the responses to the calls which were in flight at that moment can't
+  halve it again, so one burst of errors counts once.
+  """
+
+  def __init__(self, maximum, name=None):
+    """
+    :param int maximum: The maximum number of concurrent calls (the workers).
+    :param str name: The name of the fan-out, for the statistics (Default: None).
+    """
+
+    self.maximum = max(1, maximum)
+    self.limit = max(1, self.maximum // 2)
+    self.name = name
+    self.inflight = 0
+    self.healthy = 0
+    self.recovered_at = 0
+    self.latency = None
+    self.condition = threading.Condition()
+    self.start = time.time()
+    self.counts = dict(requests=0, throttled=0, errors=0, spikes=0, increases=0, decreases=0)
+    self.peak = self.limit
+    self.adjustments = []
+
+  def acquire(self):
+    with self.condition:
+      while self.inflight >= self.limit:
+        self.condition.wait()
+
+      self.inflight += 1
+
+  def release(self):
+    with self.condition:
+      self.inflight -= 1
+      self.condition.notify_all()
+
+  def adjust(self, limit, reason):
+    self.limit = limit
+    self.peak = max(self.peak, limit)
+
+    if len(self.adjustments) < 100:
+      self.adjustments.append([ round(time.time() - self.start, 3), limit, reason ])
+
+    self.condition.notify_all()
+
+  def observe(self, code, seconds):
+    """
+    Take the outcome of one request into account.
+
+    :param int code: The http status code of the response (None when the request failed).
+    :param float seconds: The latency of the request.
+    """
+
+    with self.condition:
+      self.counts['requests'] += 1
+
+      if code == 429:
+        reason = 'throttled'
+      elif code is None or code >= 500:
+        reason = 'errors'
+      elif self.latency is not None and seconds > 3 * self.latency and self.counts['requests'] > 10:
+        reason = 'spikes'
+      else:
+        reason = None
+
+      # The spikes count in the moving average as well, so a latency that rises and stays up becomes
+      # the new normal instead of a spike forever.
+      if reason in [ None, 'spikes' ]:
+        self.latency = seconds if self.latency is None else 0.9 * self.latency + 0.1 * seconds
+
+      if reason:
+        self.counts[reason] += 1
+        self.healthy = 0
+
+        if self.counts['requests'] > self.recovered_at and self.limit > 1:
+          # The call of this response is one of the calls in flight.
+          self.recovered_at = self.counts['requests'] + max(0, self.inflight - 1)
+          self.counts['decreases'] += 1
+          self.adjust(max(1, self.limit // 2), reason)
+
+        return
+
+      self.healthy += 1
+
+      if self.healthy >= self.limit and self.limit < self.maximum:
+        self.healthy = 0
+        self.counts['increases'] += 1
+        self.adjust(self.limit + 1, 'healthy')
+
+  def stats(self):
+    return dict(
+      name=self.name,
+      workers=self.maximum,
+      limit=self.limit,
+      peak=self.peak,
+      latency=round(self.latency, 4) if self.latency is not None else None,
+      adjustments=self.adjustments,
+      **self.counts
+    )
+
+def report(code, seconds):
+  """
+  Report the outcome of a request to the controller of the fan-out of the calling thread (if any).
+
+  :param int code: The http status code of the response (None when the request failed).
+  :param float seconds: The latency of the request.
+  """
+
+  controller = getattr(_local, 'controller', None)
+
+  if controller is not None:
+    controller.observe(code, seconds)
+
+def run_concurrent(func, items, workers=8, adaptive=True):
+  """
+  Call func for every item using a bounded pool of threads and return the results in the order of items.
+
+  With adaptive, an AIMDController keeps the number of concurrent calls between 1 and workers, based on
+  the responses the requests made by func report. Falls back to calling func sequentially when
+  concurrent.futures is not available.
+
+  :param callable func: The function to call with every item.
+  :param list items: The items to process.
+  :param int workers: The maximum number of concurrent calls (Default: 8).
+  :param bool adaptive: Adapt the number of concurrent calls to the responses (Default: True).
+  """
+
+  items = list(items)
+
+  if not HAS_FUTURES or workers <= 1 or len(items) <= 1:
+    return [ func(item) for item in items ]
+
+  if not adaptive:
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+      return list(pool.map(func, items))
+
+  controller = AIMDController(min(workers, len(items)), getattr(getattr(func, 'func', func), '__name__', None))
+  CONTROLLERS.append(controller)
+
+  def call(item):
+    controller.acquire()
+    _local.controller = controller
+
+    try:
+      return func(item)
+    finally:
+      _local.controller = None
+      controller.release()
+
+  with ThreadPoolExecutor(max_workers=controller.maximum) as pool:
+    return list(pool.map(call, items))
+
+def run_graph(func, nodes, workers=8):
+  """
+  Call func for every node as soon as it returned for all the parents of the node, using a bounded pool of threads.
+
+  Independent nodes run concurrently, so the wall time follows the longest chain of dependencies instead
+  of the number of nodes. func gets the node and marks a failure by setting its errors; the descendants
+  of a failed node are not called but get errors and the skipped action. The graph must be acyclic.
+  Falls back to calling func in dependency order when concurrent.futures is not available.
+
+  :param callable func: The function to call with every node.
+  :param dict nodes: The nodes by key, each with the keys of its parents in parents.
+  :param int workers: The maximum number of concurrent calls (Default: 8).
+  """
+
+  waiting = dict((key, set(node['parents'])) for key, node in nodes.items())
+  children = dict((key, []) for key in nodes)
+
+  for key, node in nodes.items():
+    for parent in node['parents']:
+      children[parent].append(key)
+
+  def ready():
+    keys = sorted(key for key, parents in waiting.items() if not parents)
+
+    for key in keys:
+      del waiting[key]
+
+    return keys
+
+  def done(key):
+    for child in children[key]:
+      if 'errors' in nodes[key] and 'errors' not in nodes[child]:
+        nodes[child].update(action='skipped', errors='The parent {} failed.'.format(key))
+
+      waiting[child].discard(key)
+
+  def call(key):
+    if 'errors' not in nodes[key]:
+      func(nodes[key])
+
+    return key
+
+  if not HAS_FUTURES or workers <= 1:
+    keys = ready()
+
+    while keys:
+      for key in keys:
+        done(call(key))
+
+      keys = ready()
+
+    return nodes
+
+  with ThreadPoolExecutor(max_workers=workers) as pool:
+    running = set(pool.submit(call, key) for key in ready())
+
+    while running:
+      finished, running = wait(running, return_when=FIRST_COMPLETED)
+
+      for future in finished:
+        done(future.result())
+
+      running.update(pool.submit(call, key) for key in ready())
+
+  return nodes
@@ -0,0 +1,114 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import threading
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps, json_loads
+
+class Journal():
+  """
+  A local write-ahead journal of bulk write operations.
+
+  Every write is recorded as intended before it is sent and as done (or failed) after it
+  returned, keyed by the identity of the item. A run that dies halfway leaves the journal
+  behind, so the next run knows which items are done, which ones are uncertain (intended
+  but never confirmed) and which ones were never touched. The journal is removed once a
+  run completes without errors.
+  """
+
+  def __init__(self, path):
+    """
+    Open (and replay) the journal.
+
+    :param str path: The path of the journal file.
+    """
+
+    self.path = path
+    self.entries = {}
+    self.lock = threading.Lock()
+
+    complete = True
+
+    if os.path.exists(path):
+      with open(path, 'rb+') as journal:
+        end = 0
+
+        for line in journal:
+          end += len(line)
+          complete = line.endswith(b'\n')
+
+          try:
+            record = json_loads(line)
+          except ValueError:
+            # A record that was cut off while it was written; its operation is uncertain. It's dropped,
+            # so the next record doesn't end up on the same line.
+            if not complete:
+              end -= len(line)
+              complete = True
+
+            continue
+
+          self.entries[record['key']] = record
+
+        journal.truncate(end)
+
+    self.handle = open(path, 'ab')
+
+    # A whole record that only misses its line end.
+    if not complete:
+      self.handle.write(b'\n')
+
+    os.chmod(path, 0o600)
+
+  def state(self, key, fingerprint):
+    """
+    Return the journalled record of an item, or None when the item has to be processed from scratch.
+
+    A record of an older desired state of the item (another fingerprint) doesn't count.
+
+    :param str key: The identity of the item.
+    :param str fingerprint: The fingerprint of the desired state of the item.
+    """
+
+    record = self.entries.get(key)
+
+    if record is None or record['fingerprint'] != fingerprint or record['state'] == 'failed':
+      return None
+
+    return record
+
+  def record(self, key, fingerprint, state, method=None, id=None):
+    """
+    Append a record to the journal and flush it to disk.
+
+    :param str key: The identity of the item.
+    :param str fingerprint: The fingerprint of the desired state of the item.
+    :param str state: intent, done or failed.
+    :param str method: The http method of the operation (Default: None).
+    :param str id: The id of the Betteruptime resource, when known (Default: None).
+    """
+
+    record = dict(key=key, fingerprint=fingerprint, state=state, method=method, id=id)
+
+    with self.lock:
+      self.entries[key] = record
+      self.handle.write(json_dumps(record) + b'\n')
+      self.handle.flush()
+      os.fsync(self.handle.fileno())
+
+  def close(self, remove=False):
+    """
+    Close the journal.
+
+    :param bool remove: Remove the journal, because the run completed (Default: False).
+    """
+
+    self.handle.close()
+
+    if remove:
+      os.remove(self.path)
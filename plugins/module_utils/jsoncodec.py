@@ -0,0 +1,63 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+
+try:
+  import orjson
+  HAS_ORJSON = True
+except ImportError:
+  HAS_ORJSON = False
+
+try:
+  import ujson
+  HAS_UJSON = True
+except ImportError:
+  HAS_UJSON = False
+
+CODECS = [ 'orjson', 'ujson', 'json' ]
+
+def available_codecs():
+  """
+  Return the names of the JSON codecs that can be used on this host, fastest first.
+  """
+
+  return [ name for name in CODECS if name == 'json' or (name == 'orjson' and HAS_ORJSON) or (name == 'ujson' and HAS_UJSON) ]
+
+def _stdlib_dumps(obj):
+  return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def _ujson_dumps(obj):
+  return ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def _ujson_loads(data):
+  if isinstance(data, bytearray):
+    data = bytes(data)
+  return ujson.loads(data)
+
+def get_codec(name=None):
+  """
+  Return a (name, dumps, loads) tuple for the requested codec.
+
+  Both functions work on bytes: dumps returns bytes and loads accepts bytes (or str).
+  When no (available) name is given, the fastest installed codec is picked.
+
+  :param str name: The codec to use; orjson, ujson or json (Default: None).
+  """
+
+  if name not in available_codecs():
+    name = available_codecs()[0]
+
+  if name == 'orjson':
+    return (name, orjson.dumps, orjson.loads)
+  elif name == 'ujson':
+    return (name, _ujson_dumps, _ujson_loads)
+  else:
+    return (name, _stdlib_dumps, json.loads)
+
+CODEC, json_dumps, json_loads = get_codec(os.environ.get('BU_JSON_CODEC'))
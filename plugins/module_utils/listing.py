@@ -0,0 +1,106 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_loads
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_run
+
+def argument_spec(**options):
+  """
+  Return the argument spec of a module that pulls a listing: api_token, validate_certs and https_proxy
+  and the options of the module (which may override them).
+
+  :param options: The options of the module.
+  """
+
+  spec = dict(
+    api_token=dict(
+      type='str',
+      required=True,
+      fallback=(env_fallback, ['BU_API_TOKEN'])
+    ),
+    validate_certs=dict(
+      type='bool',
+      required=False,
+      default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+    ),
+    https_proxy=dict(
+      type='str',
+      required=False,
+      default=None,
+      fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+    )
+  )
+
+  spec.update(options)
+
+  return spec
+
+class ListingModule(AnsibleModule, BURestApi):
+  """
+  A module that pulls the listing of one Better Uptime resource; the shared logic of the *_get modules.
+
+  A module sets its resource and can take over the pull (e.g. for its own options) by overriding pull().
+  """
+
+  resource = None
+
+  def pull(self, result):
+    """
+    Pull the listing of the resource into the result; returns whether it failed.
+
+    :param dict result: The result of the module.
+    """
+
+    resp = self.httpRequest(
+      self.api_url + self.resource,
+      {
+        'Authorization': 'Bearer {}'.format( self.api_token ),
+        'Content-Type': 'application/json'
+      }
+    )
+
+    result['result'] = json_loads(resp.read())
+
+    result['return_code'] = resp.code
+
+    if result['return_code'] == 201:
+      result['changed'] = True
+
+    if 'errors' in result['result']:
+      result['msg'] = 'Task failed.'
+      result['changed'] = False
+      return True
+
+    result['result'] = result['result']['data']
+
+    return False
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result={},
+    )
+
+    self.api_token=self.params['api_token']
+    self.validate_certs=self.params['validate_certs'] or True
+
+    run_failed = self.pull(result)
+
+    if self.check_mode:
+      self.exit_json(**result)
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
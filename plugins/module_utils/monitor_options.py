@@ -0,0 +1,141 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+# The argument spec of the options of a monitor; shared by the monitors module and the monitors_batch action.
+MONITOR_OPTIONS = dict(
+  url=dict(
+    type='str',
+    required=False
+  ),
+  expected_status_codes=dict(
+    type='dict',
+    required=False
+  ),
+  request_headers=dict(
+    type='dict',
+    required=False
+  ),
+  domain_expiration=dict(
+    type='int',
+    required=False
+  ),
+  ssl_expiration=dict(
+    type='int',
+    required=False
+  ),
+  policy_id=dict(
+    type='str',
+    required=False
+  ),
+  policy_name=dict(
+    type='str',
+    required=False
+  ),
+  follow_redirects=dict(
+    type='bool',
+    required=False
+  ),
+  monitor_type=dict(
+    type='str',
+    required=False,
+    choices=['status', 'expected_status_code', 'keyword', 'keyword_absence']
+  ),
+  required_keyword=dict(
+    type='str',
+    required=False
+  ),
+  call=dict(
+    type='bool',
+    required=False
+  ),
+  sms=dict(
+    type='bool',
+    required=False
+  ),
+  email=dict(
+    type='bool',
+    required=False
+  ),
+  push=dict(
+    type='bool',
+    required=False
+  ),
+  team_wait=dict(
+    type='int',
+    required=False
+  ),
+  paused=dict(
+    type='bool',
+    required=False
+  ),
+  port=dict(
+    type='str',
+    required=False
+  ),
+  regions=dict(
+    type='list',
+    required=False,
+    choices=['us', 'eu', 'as', 'au']
+  ),
+  monitor_group_id=dict(
+    type='str',
+    required=False
+  ),
+  monitor_group_name=dict(
+    type='str',
+    required=False
+  ),
+  pronounceable_name=dict(
+    type='str',
+    required=False
+  ),
+  recovery_period=dict(
+    type='int',
+    required=False
+  ),
+  verify_ssl=dict(
+    type='bool',
+    required=False
+  ),
+  check_frequency=dict(
+    type='int',
+    required=False
+  ),
+  confirmation_period=dict(
+    type='int',
+    required=False
+  ),
+  http_method=dict(
+    type='str',
+    required=False,
+    choices=['GET', 'HEAD', 'POST', 'PUT', 'PATCH']
+  ),
+  request_timeout=dict(
+    type='int',
+    required=False
+  ),
+  request_body=dict(
+    type='str',
+    required=False
+  ),
+  auth_username=dict(
+    type='str',
+    required=False
+  ),
+  auth_password=dict(
+    type='str',
+    required=False
+  ),
+  maintenance_from=dict(
+    type='str',
+    required=False
+  ),
+  maintenance_to=dict(
+    type='str',
+    required=False
+  )
+)
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from bisect import bisect_left
+
+def longest_increasing(values):
+  """
+  Return the indexes of the longest strictly increasing subsequence of values.
+
+  Entries which are None are never part of the subsequence.
+
+  :param list values: The values to scan.
+  """
+
+  tails = []
+  tails_idx = []
+  previous = [ None ] * len(values)
+
+  for i, value in enumerate(values):
+    if value is None:
+      continue
+
+    pos = bisect_left(tails, value)
+
+    if pos == len(tails):
+      tails.append(value)
+      tails_idx.append(i)
+    else:
+      tails[pos] = value
+      tails_idx[pos] = i
+
+    previous[i] = tails_idx[pos - 1] if pos > 0 else None
+
+  keep = []
+  i = tails_idx[-1] if tails_idx else None
+
+  while i is not None:
+    keep.append(i)
+    i = previous[i]
+
+  return keep[::-1]
+
+def minimal_moves(current, desired):
+  """
+  Compute the moves that put the items of a list in the desired order with as few moves as possible.
+
+  The items which are already in the right order relative to each other (the longest increasing
+  subsequence) stay where they are. Every other item, including the ones which don't exist yet, is
+  moved to the zero based index right after its desired predecessor. The moves have to be applied
+  in the returned order on a list that inserts at the given index and shifts the items below it.
+  Items in current that are not desired are left alone; they don't influence the final order.
+
+  Returns a list of (key, index) tuples.
+
+  :param list current: The keys in their current order.
+  :param list desired: The keys in their desired order.
+  """
+
+  index = dict((key, i) for i, key in enumerate(current))
+
+  keep = set(desired[i] for i in longest_increasing([ index.get(key) for key in desired ]))
+
+  items = list(current)
+  moves = []
+
+  for i, key in enumerate(desired):
+    if key in keep:
+      continue
+
+    if key in index:
+      items.remove(key)
+
+    target = items.index(desired[i - 1]) + 1 if i > 0 else 0
+
+    items.insert(target, key)
+    moves.append((key, target))
+
+  return moves
+
+def apply_moves(items, moves):
+  """
+  Apply a list of (key, index) moves on a list of keys, in place, and return it.
+
+  A key is removed from its current index (when it is in the list) and inserted at the new one.
+
+  :param list items: The keys in their current order.
+  :param list moves: The (key, index) tuples to apply.
+  """
+
+  for key, target in moves:
+    if key in items:
+      items.remove(key)
+
+    items.insert(target, key)
+
+  return items
@@ -0,0 +1,85 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import tempfile
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps, json_loads
+
+class PauseState():
+  """
+  The state file of paused monitors: the paused state every monitor had before it was paused, by
+  monitor id, so a resume restores exactly that state. The monitors_pause module and the pause
+  command of the command line share it.
+  """
+
+  def __init__(self, path):
+    """
+    :param str path: The path of the state file.
+    """
+
+    self.path = path
+    self.prior = self.load()
+
+  def load(self):
+    """
+    Return the saved prior state of the monitors (paused by monitor id), or an empty dict.
+    """
+
+    try:
+      with open(self.path, 'rb') as state_file:
+        return json_loads(state_file.read())
+    except (IOError, OSError):
+      return {}
+
+  def save(self):
+    """
+    Save the prior state of the monitors atomically (or remove the file when there is nothing left to restore).
+    """
+
+    if not self.prior:
+      if os.path.exists(self.path):
+        os.remove(self.path)
+      return
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), prefix='.monitors_pause.')
+
+    with os.fdopen(fd, 'wb') as state_file:
+      state_file.write(json_dumps(self.prior))
+
+    os.rename(tmp, self.path)
+
+  def pause(self, monitors):
+    """
+    Remember the paused state of the selected monitors and return the ids of the ones to pause.
+
+    A monitor that was paused by an earlier pause keeps the state it had before that pause.
+
+    :param list monitors: The selected monitors of a listing.
+    """
+
+    for monitor in monitors:
+      self.prior.setdefault(str(monitor['id']), bool(monitor['attributes'].get('paused')))
+
+    return [ str(monitor['id']) for monitor in monitors if not monitor['attributes'].get('paused') ]
+
+  def resumes(self):
+    """
+    Return the ids of the monitors to resume: the ones that weren't paused before they were paused.
+    """
+
+    return [ id for id, paused in sorted(self.prior.items()) if not paused ]
+
+  def resumed(self, failed):
+    """
+    Forget the resumed monitors, except the ones of which the resume failed, and save the state.
+
+    :param list failed: The ids of the monitors which couldn't be resumed.
+    """
+
+    self.prior = dict((id, False) for id in failed)
+    self.save()
@@ -0,0 +1,209 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import functools
+import os
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import CONTROLLERS
+
+try:
+  from StringIO import StringIO
+except ImportError:
+  from io import StringIO
+
+IMPORTED_AT = time.time()
+
+def process_start():
+  """
+  Return the (epoch) start time of this process, or None when it can't be determined (Linux only).
+  """
+
+  try:
+    with open('/proc/self/stat') as stat:
+      ticks = int(stat.read().rsplit(')', 1)[1].split()[19])
+
+    with open('/proc/uptime') as uptime:
+      boot = time.time() - float(uptime.read().split()[0])
+
+    return boot + ticks / float(os.sysconf('SC_CLK_TCK'))
+  except (IOError, OSError, ValueError, IndexError):
+    return None
+
+class Profiler():
+  """
+  Opt-in phase timers and cProfile around the execution of a module.
+
+  BU_TIMINGS=1 adds a phase-timing breakdown to the result of the module. BU_PROFILE=<path> does
+  the same and runs the module under cProfile; the stats are dumped to the path (a directory gets
+  one <module>-<pid>.pstats file per run) and the top functions are returned in the result.
+
+  Before Python 3.12 a cProfile profile only sees the thread that enabled it, so every thread that
+  starts during the run (the workers of the fan-outs) gets a profile of its own, and the report merges
+  them; from 3.12 on, cProfile profiles all the threads by itself.
+  """
+
+  def __init__(self):
+    self.profile_path = os.environ.get('BU_PROFILE')
+    self.enabled = bool(self.profile_path) or os.environ.get('BU_TIMINGS', '').lower() in [ '1', 'true', 'yes', 'on' ]
+    self.marks = {}
+    self.phases = {}
+    self.lock = threading.Lock()
+    self.profile = None
+    self.thread_profiles = []
+
+  def mark(self, name):
+    self.marks.setdefault(name, time.time())
+
+  @contextmanager
+  def phase(self, name):
+    """
+    Time a phase; the time of phases that run concurrently adds up.
+
+    :param str name: The name of the phase.
+    """
+
+    if not self.enabled:
+      yield
+      return
+
+    start = time.time()
+
+    try:
+      yield
+    finally:
+      with self.lock:
+        phase = self.phases.setdefault(name, dict(seconds=0.0, calls=0))
+        phase['seconds'] += time.time() - start
+        phase['calls'] += 1
+
+  def start_profile(self):
+    if self.profile_path and self.profile is None:
+      import cProfile
+
+      self.profile = cProfile.Profile()
+
+      if not hasattr(sys, 'monitoring'):
+        threading.setprofile(self._profile_thread)
+
+      self.profile.enable()
+
+  def _profile_thread(self, frame, event, arg):
+    # Called for the first event of a new thread, before the profile replaces this hook.
+    import cProfile
+
+    profile = cProfile.Profile()
+
+    with self.lock:
+      self.thread_profiles.append(profile)
+
+    profile.enable()
+
+  def report(self, name):
+    """
+    Stop the profile (dumping its stats) and return the timings.
+
+    :param str name: The name of the module.
+    """
+
+    self.mark('run_end')
+
+    marks = self.marks
+    started = process_start()
+
+    # The start-up runs from the start of the process (the AnsiballZ payload) until main(), so it
+    # includes all the imports of the module.
+    timings = dict(
+      startup=marks['main'] - started if started and 'main' in marks else None,
+      argument_validation=marks['run'] - marks['main'] if 'main' in marks and 'run' in marks else None,
+      run=marks['run_end'] - marks['run'] if 'run' in marks else None,
+      total=marks['run_end'] - (started or IMPORTED_AT),
+      phases=self.phases
+    )
+
+    if self.profile is not None:
+      self.profile.disable()
+      threading.setprofile(None)
+
+      import pstats
+
+      with self.lock:
+        stats = pstats.Stats(self.profile)
+
+        # A worker thread that is still alive keeps its profile enabled; its stats so far are taken.
+        if self.thread_profiles:
+          stats.add(*self.thread_profiles)
+
+        self.thread_profiles = []
+
+      path = self.profile_path
+
+      if os.path.isdir(path):
+        path = os.path.join(path, '{}-{}.pstats'.format(name, os.getpid()))
+
+      stats.dump_stats(path)
+
+      stream = StringIO()
+      stats.stream = stream
+      stats.sort_stats('cumulative').print_stats(25)
+
+      timings['profile'] = dict(path=path, top=stream.getvalue().splitlines())
+      self.profile = None
+
+    return timings
+
+PROFILER = Profiler()
+
+def profile_main(main):
+  """
+  Decorator for the main() of a module; marks the moment the imports are done.
+  """
+
+  @functools.wraps(main)
+  def wrapper():
+    PROFILER.mark('main')
+    return main()
+
+  return wrapper
+
+def profile_run(run):
+  """
+  Decorator for the run() of a module; times (and profiles) the run and adds the timings to the result.
+
+  The statistics of the concurrency controllers of the run are always added to the result.
+  """
+
+  @functools.wraps(run)
+  def wrapper(self):
+    if PROFILER.enabled:
+      PROFILER.mark('run')
+      PROFILER.start_profile()
+
+    for method in [ 'exit_json', 'fail_json' ]:
+      setattr(self, method, _with_timings(self, getattr(self, method)))
+
+    return run(self)
+
+  return wrapper
+
+def _with_timings(module, method):
+
+  @functools.wraps(method)
+  def wrapper(**kwargs):
+    if CONTROLLERS:
+      kwargs['concurrency'] = [ controller.stats() for controller in CONTROLLERS ]
+
+    if PROFILER.enabled:
+      kwargs['timings'] = PROFILER.report(getattr(module, '_name', 'module'))
+
+    return method(**kwargs)
+
+  return wrapper
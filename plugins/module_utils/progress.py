@@ -0,0 +1,247 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import atexit
+import collections
+import functools
+import glob
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps, json_loads
+
+# The seconds over which the request rate is measured.
+RATE_WINDOW = 10
+
+def parent_args():
+  """
+  Return the command line of the parent process (an empty list when it can't be determined).
+  """
+
+  try:
+    with open('/proc/{}/cmdline'.format(os.getppid()), 'rb') as cmdline:
+      return [ arg.decode('utf-8', 'replace') for arg in cmdline.read().split(b'\0') if arg ]
+  except (IOError, OSError):
+    pass
+
+  try:
+    return subprocess.check_output([ 'ps', '-o', 'args=', '-p', str(os.getppid()) ]).decode('utf-8', 'replace').split()
+  except (OSError, subprocess.CalledProcessError):
+    return []
+
+def async_job_file():
+  """
+  Return the path of the results file of the async job this process runs in, or None when it isn't one.
+
+  An async task runs the module under async_wrapper, which gets the job id prefix as its first argument
+  and writes the job to <async dir>/<job id prefix>.<pid>; async_status returns what is in that file
+  until the job finished.
+  """
+
+  async_dir = os.environ.get('ANSIBLE_ASYNC_DIR')
+
+  if not async_dir:
+    return None
+
+  args = parent_args()
+  wrapper = [ index for index, arg in enumerate(args[:-1]) if 'async_wrapper' in os.path.basename(arg) ]
+
+  if not wrapper:
+    return None
+
+  files = [ path for path in glob.glob(os.path.join(os.path.expanduser(async_dir), args[wrapper[0] + 1] + '.*')) if not path.endswith('.tmp') ]
+
+  return files[0] if len(files) == 1 else None
+
+class Progress():
+  """
+  Opt-out progress reporting of the long-running modules, for async tasks.
+
+  A module that runs as an async task (async with poll: 0) rewrites the results file of its job with
+  the progress every BU_PROGRESS_INTERVAL seconds (Default: 2), so async_status returns it under
+  progress while the job runs: the items total, done (failed ones included), failed and remaining, the
+  requests made, the request rate over the last seconds, the elapsed seconds and an estimate of the
+  seconds left. async_wrapper replaces the file with the result of the module when it finishes.
+
+  BU_PROGRESS=<path> writes the progress to that file instead (also without async), with finished set
+  once the module is done; BU_PROGRESS=0 turns the reporting off.
+  """
+
+  enabled = False
+
+  def __init__(self):
+    setting = os.environ.get('BU_PROGRESS') or ''
+
+    self.interval = float(os.environ.get('BU_PROGRESS_INTERVAL') or 2)
+    self.lock = threading.Lock()
+    self.start = time.time()
+    self.written_at = 0
+    self.counts = dict(total=0, done=0, failed=0, requests=0)
+    self.requests = collections.deque()
+    self.job = None
+    self.path = None
+
+    if setting.lower() in [ '0', 'false', 'no', 'off' ]:
+      return
+
+    if setting:
+      self.path = setting
+      atexit.register(self.close)
+    else:
+      self.job = self._job()
+
+    self.enabled = bool(self.path or self.job)
+
+  def _job(self):
+    path = async_job_file()
+
+    if path is None:
+      return None
+
+    try:
+      with open(path, 'rb') as handle:
+        job = json_loads(handle.read())
+    except (IOError, OSError, ValueError):
+      return None
+
+    # Only a job that is still running is written, with what async_wrapper wrote for it.
+    if not job.get('started') or job.get('finished'):
+      return None
+
+    return dict(path=path, data=job)
+
+  def add(self, count):
+    """
+    Add items to the total, e.g. when a module knows what it's going to do.
+
+    :param int count: The number of items.
+    """
+
+    if self.enabled:
+      with self.lock:
+        self.counts['total'] += count
+
+      self.tick()
+
+  def advance(self, count=1, failed=0):
+    """
+    Count items as done.
+
+    :param int count: The number of items which are done (Default: 1).
+    :param int failed: How many of them failed (Default: 0).
+    """
+
+    if self.enabled:
+      with self.lock:
+        self.counts['done'] += count
+        self.counts['failed'] += failed
+
+      self.tick()
+
+  def request(self):
+    """
+    Count a request; called for every request, retries included.
+    """
+
+    if self.enabled:
+      now = time.time()
+
+      with self.lock:
+        self.counts['requests'] += 1
+        self.requests.append(now)
+
+        while self.requests and self.requests[0] < now - RATE_WINDOW:
+          self.requests.popleft()
+
+      self.tick()
+
+  def track(self, func, failed=None):
+    """
+    Return func counting every call as a done item; an item failed when the result (or the item, when
+    func returns no dict) has errors, or when failed returns True for the result.
+
+    :param callable func: The function which processes one item.
+    :param callable failed: Whether the item failed, by the result of func (Default: None).
+    """
+
+    if not self.enabled:
+      return func
+
+    # Named after the function of a partial, for the statistics of the fan-out.
+    @functools.wraps(getattr(func, 'func', func))
+    def wrapper(item, *args, **kwargs):
+      ret = func(item, *args, **kwargs)
+      self.advance(1, int(failed(ret) if failed else 'errors' in (ret if isinstance(ret, dict) else item)))
+      return ret
+
+    return wrapper
+
+  def snapshot(self):
+    with self.lock:
+      counts = dict(self.counts)
+      now = time.time()
+      window = min(RATE_WINDOW, now - self.start) or 1
+      rate = len([ at for at in self.requests if at >= now - RATE_WINDOW ]) / float(window)
+
+    elapsed = now - self.start
+    remaining = max(0, counts['total'] - counts['done'])
+
+    return dict(
+      counts,
+      remaining=remaining,
+      request_rate=round(rate, 2),
+      elapsed=round(elapsed, 1),
+      eta=round(elapsed / counts['done'] * remaining, 1) if counts['done'] else None,
+      updated_at=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now))
+    )
+
+  def tick(self):
+    if time.time() - self.written_at >= self.interval:
+      self.write()
+
+  def write(self, finished=False):
+    """
+    Write the progress: into the results file of the async job, or to the BU_PROGRESS path.
+
+    :param bool finished: Whether the module is done (Default: False).
+    """
+
+    with self.lock:
+      # Another thread is writing, or wrote in the meantime.
+      if not finished and time.time() - self.written_at < self.interval:
+        return
+
+      self.written_at = time.time()
+
+    progress = self.snapshot()
+
+    if self.job:
+      path = self.job['path']
+      data = dict(self.job['data'], progress=progress)
+    else:
+      path = self.path
+      data = dict(progress, finished=finished)
+
+    # Written to a file in the same directory and renamed, so a reader never sees half of it.
+    try:
+      fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.progress-')
+
+      with os.fdopen(fd, 'wb') as handle:
+        handle.write(json_dumps(data))
+
+      os.rename(tmp, path)
+    except (IOError, OSError):
+      pass
+
+  def close(self):
+    if self.path:
+      self.write(finished=True)
+
+PROGRESS = Progress()
@@ -0,0 +1,53 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import json
+
+def identity(data, check_for):
+  """
+  Return the identity of an item; the values of the check_for options, as a str.
+
+  :param dict data: The item.
+  :param list check_for: The options which identify an item.
+  """
+
+  return json.dumps([ [ option, data.get(option) ] for option in check_for ], sort_keys=True)
+
+def fingerprint(data):
+  """
+  Return a stable hash of an item, to tell whether its desired state has changed.
+
+  :param dict data: The item.
+  """
+
+  return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def index_entries(entries, check_for):
+  """
+  Index a listing by the identity of its entries; the first entry wins when identities collide.
+
+  :param list entries: The entries of a listing (with their attributes).
+  :param list check_for: The options which identify an item.
+  """
+
+  index = {}
+
+  for entry in entries:
+    index.setdefault(identity(entry['attributes'], check_for), entry)
+
+  return index
+
+def changes(data, attributes):
+  """
+  Return the options of an item which differ from the attributes of the existing entry.
+
+  :param dict data: The desired item.
+  :param dict attributes: The attributes of the existing entry.
+  """
+
+  return dict((option, value) for option, value in data.items() if attributes.get(option) != value)
@@ -0,0 +1,203 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import errno
+import hashlib
+import os
+import stat
+import tempfile
+import time
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps, json_loads
+
+# The options which refer to an item by name, with the resource of the item, the attribute that holds
+# the name and the option that takes the id.
+REFERENCES = {
+  'policy_name': dict(resource='policies', attribute='name', option='policy_id'),
+  'monitor_group_name': dict(resource='monitor-groups', attribute='name', option='monitor_group_id'),
+  'status_page_subdomain': dict(resource='status-pages', attribute='subdomain', option='status_page_id'),
+}
+
+def default_cache():
+  """
+  Return the default directory of the resolver cache; in the Ansible tmp dir of the home of the user,
+  so other users can't create (or swap) it first as they could in the shared tmp dir.
+  """
+
+  return os.path.join(os.path.expanduser('~'), '.ansible', 'tmp', 'betteruptime-resolver')
+
+class ResolveError(Exception):
+  pass
+
+def private_dir(path):
+  """
+  Create a directory only the user can access, or check that the existing one is; the cached indexes
+  decide which policies and groups monitors are attached to, so nobody else may write them.
+
+  :param str path: The directory.
+  """
+
+  parent = os.path.dirname(os.path.abspath(path))
+
+  if not os.path.isdir(parent):
+    os.makedirs(parent, 0o700)
+
+  try:
+    os.mkdir(path, 0o700)
+  except OSError as e:
+    if e.errno != errno.EEXIST:
+      raise
+
+  info = os.lstat(path)
+
+  if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+    raise ResolveError('The resolver cache {} must be a directory of the user that only the user can access (mode 0700).'.format(path))
+
+class Resolver():
+  """
+  Resolves the names of policies, monitor groups and status pages to their ids.
+
+  Every resource is listed once into a name -> id index. The index is kept in memory and, with a cache
+  directory, in a file per account and resource that the next tasks of the run reuse for ttl seconds.
+  A name which isn't in a cached index lists the resource again, so items created earlier in the run
+  are found.
+  """
+
+  def __init__(self, api, path=None, ttl=300):
+    """
+    :param BURestApi api: The api to list the resources with.
+    :param str path: The directory of the cache; no cache on disk when None (Default: None).
+    :param int ttl: How many seconds a cached index is used (Default: 300).
+    """
+
+    self.api = api
+    self.path = os.path.join(path, hashlib.sha1(api.api_token.encode('utf-8')).hexdigest()[:16]) if path and ttl > 0 else None
+    self.ttl = ttl
+    self.indexes = {}
+    self.lookups = 0
+
+    if self.path:
+      try:
+        private_dir(os.path.dirname(self.path))
+        private_dir(self.path)
+      except (IOError, OSError) as e:
+        raise ResolveError('The resolver cache {} can\'t be created: {}'.format(path, e))
+
+  def _file(self, resource):
+    return os.path.join(self.path, resource + '.json')
+
+  def load(self, resource):
+    """
+    Return the cached index of a resource, or None when there is none or it's older than the ttl.
+
+    :param str resource: The Betteruptime resource type.
+    """
+
+    if not self.path:
+      return None
+
+    try:
+      if time.time() - os.path.getmtime(self._file(resource)) > self.ttl:
+        return None
+
+      with open(self._file(resource), 'rb') as handle:
+        return json_loads(handle.read())
+    except (IOError, OSError, ValueError):
+      return None
+
+  def fetch(self, resource, attribute):
+    """
+    List a resource into a name -> ids index and cache it.
+
+    :param str resource: The Betteruptime resource type.
+    :param str attribute: The attribute that holds the name.
+    """
+
+    ret, resp = self.api.BUGet(resource)
+
+    if not ret:
+      raise ResolveError('Listing {} failed: {}'.format(resource, resp))
+
+    self.lookups += 1
+
+    index = {}
+
+    for entry in resp or []:
+      index.setdefault(str(entry['attributes'].get(attribute)), []).append(entry['id'])
+
+    if self.path:
+      fd, tmp = tempfile.mkstemp(dir=self.path)
+
+      with os.fdopen(fd, 'wb') as handle:
+        handle.write(json_dumps(index))
+
+      os.rename(tmp, self._file(resource))
+
+    self.indexes[resource] = (index, True)
+
+    return index
+
+  def invalidate(self, resource):
+    """
+    Forget the index of a resource, e.g. after one of its items was created, renamed or removed.
+
+    :param str resource: The Betteruptime resource type.
+    """
+
+    self.indexes.pop(resource, None)
+
+    if self.path:
+      try:
+        os.remove(self._file(resource))
+      except OSError:
+        pass
+
+  def lookup(self, reference, name):
+    """
+    Return the id of the item with a name.
+
+    :param str reference: The name option (see REFERENCES).
+    :param str name: The name.
+    """
+
+    spec = REFERENCES[reference]
+    resource = spec['resource']
+
+    if resource not in self.indexes:
+      cached = self.load(resource)
+      self.indexes[resource] = (cached, False) if cached is not None else (self.fetch(resource, spec['attribute']), True)
+
+    index, fresh = self.indexes[resource]
+
+    # A name that isn't in a cached index may have been created since; list it again once.
+    if str(name) not in index and not fresh:
+      index = self.fetch(resource, spec['attribute'])
+
+    ids = index.get(str(name)) or []
+
+    if not ids:
+      raise ResolveError('No {} found with {} {}.'.format(resource, spec['attribute'], name))
+
+    if len(ids) > 1:
+      raise ResolveError('The {} {} {} is ambiguous (ids {}).'.format(resource, spec['attribute'], name, ', '.join(str(id) for id in ids)))
+
+    return ids[0]
+
+  def resolve(self, data):
+    """
+    Replace the name options of an item with the ids they refer to, in place.
+
+    :param dict data: The item.
+    """
+
+    for reference in sorted(REFERENCES):
+      if data.get(reference) is not None:
+        data[REFERENCES[reference]['option']] = self.lookup(reference, data.pop(reference))
+      else:
+        data.pop(reference, None)
+
+    return data
@@ -0,0 +1,29 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import re
+
+def select_monitors(monitors, ids=None, group_ids=None, url_pattern=None):
+  """
+  Return the monitors of a listing which match all the given filters.
+
+  :param list monitors: The monitors of a listing.
+  :param list ids: Only select the monitors with these ids (Default: None).
+  :param list group_ids: Only select the monitors of these monitor groups (Default: None).
+  :param str url_pattern: Only select the monitors of which the url matches this regular expression (Default: None).
+  """
+
+  ids = [ str(id) for id in ids or [] ]
+  group_ids = [ str(id) for id in group_ids or [] ]
+  url_pattern = re.compile(url_pattern) if url_pattern else None
+
+  return [
+    monitor for monitor in monitors
+    if (not ids or str(monitor['id']) in ids)
+    and (not group_ids or str(monitor['attributes'].get('monitor_group_id')) in group_ids)
+    and (not url_pattern or url_pattern.search(monitor['attributes'].get('url') or ''))
+  ]
@@ -0,0 +1,114 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import os
+import tempfile
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps, json_loads
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.reconcile import changes
+
+class StateStore():
+  """
+  A local store of the last applied desired state of items, one small file per item.
+
+  Every record holds the fingerprint of the desired state that was applied, the id of the
+  matched item and its remote updated_at. When the desired state is unchanged and a GET of
+  that one item shows it is untouched, the item is converged without listing anything.
+  """
+
+  def __init__(self, path, resource, api_token):
+    """
+    :param str path: The directory of the store.
+    :param str resource: The Betteruptime resource type of the items.
+    :param str api_token: The API token of the account of the items; every account has its own records.
+    """
+
+    self.path = os.path.join(path, hashlib.sha1(api_token.encode('utf-8')).hexdigest()[:16], resource)
+    self.resource = resource
+
+    if not os.path.isdir(self.path):
+      os.makedirs(self.path, 0o700)
+
+  def _file(self, key):
+    return os.path.join(self.path, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+  def get(self, key):
+    """
+    Return the record of an item, or None.
+
+    :param str key: The identity of the item.
+    """
+
+    try:
+      with open(self._file(key), 'rb') as record:
+        return json_loads(record.read())
+    except (IOError, OSError, ValueError):
+      return None
+
+  def put(self, key, record):
+    """
+    Store the record of an item (atomically, so concurrent tasks never read half a record).
+
+    :param str key: The identity of the item.
+    :param dict record: The record (fingerprint, id and updated_at or absent).
+    """
+
+    fd, tmp = tempfile.mkstemp(dir=self.path)
+
+    with os.fdopen(fd, 'wb') as handle:
+      handle.write(json_dumps(record))
+
+    os.rename(tmp, self._file(key))
+
+  def remove(self, key):
+    """
+    Forget an item.
+
+    :param str key: The identity of the item.
+    """
+
+    try:
+      os.remove(self._file(key))
+    except OSError:
+      pass
+
+  def lookup(self, api, key, fingerprint, data):
+    """
+    Check whether an item is still converged with one GET of the item.
+
+    The item is untouched when its updated_at didn't change or, for resources without an
+    updated_at, when its attributes still match the desired state.
+    Returns a (converged, entry) tuple; entry is None when the item is converged to absent.
+
+    :param BURestApi api: The api to pull the item with.
+    :param str key: The identity of the item.
+    :param str fingerprint: The fingerprint of the desired state of the item.
+    :param dict data: The desired state of the item.
+    """
+
+    record = self.get(key)
+
+    if not record or record.get('fingerprint') != fingerprint or not record.get('id'):
+      return (False, None)
+
+    code, body = api.BURequest(self.resource + '/' + str(record['id']))
+
+    if record.get('absent'):
+      return (code == 404, None)
+
+    if code != 200 or 'data' not in body:
+      return (False, None)
+
+    attributes = body['data']['attributes']
+
+    if record.get('updated_at'):
+      converged = attributes.get('updated_at') == record['updated_at']
+    else:
+      converged = not changes(data, attributes)
+
+    return (converged, body['data'] if converged else None)
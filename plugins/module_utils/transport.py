@@ -0,0 +1,275 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import errno
+import os
+import socket
+import ssl
+import threading
+import time
+
+try:
+  import http.client as http_client
+  from urllib.parse import urlparse
+except ImportError:
+  import httplib as http_client
+  from urlparse import urlparse
+
+# TLS session resumption needs the session support of the ssl module (Python 3.6+).
+HAS_TLS_SESSIONS = hasattr(ssl, 'SSLSession')
+
+# The methods which can be sent again when it's unknown whether the server got them.
+IDEMPOTENT_METHODS = frozenset([ 'GET', 'HEAD', 'PUT', 'DELETE' ])
+
+# The server closed the connection without sending a byte of the response (Python 3.5+).
+RemoteDisconnected = getattr(http_client, 'RemoteDisconnected', ())
+
+class RateLimiter():
+  """
+  Spread requests evenly over time; every caller waits for the next free slot.
+  """
+
+  def __init__(self, rate=0):
+    """
+    :param float rate: The maximum number of requests per second (0 disables the limit).
+    """
+
+    self.rate = rate
+    self.lock = threading.Lock()
+    self.next_slot = 0.0
+
+  def wait(self):
+    if not self.rate:
+      return
+
+    with self.lock:
+      now = time.time()
+      slot = max(now, self.next_slot)
+      self.next_slot = slot + 1.0 / self.rate
+
+    if slot > now:
+      time.sleep(slot - now)
+
+class SessionCache():
+  """
+  The TLS sessions of the last connection to every host, so new connections resume them (an
+  abbreviated handshake) instead of doing a full handshake.
+
+  The sessions are held in memory only; the ssl module can't serialize them and the session
+  secrets shouldn't be written to disk anyway. So only the persistent httpapi connection process
+  resumes them across the tasks of a play; in a module process they are shared by the connections
+  of that one task, and the next task does a full handshake again.
+  """
+
+  def __init__(self, ttl=300):
+    """
+    :param int ttl: How long (in seconds) a session is resumed (Default: 300, 0 disables resumption).
+    """
+
+    self.ttl = ttl
+    self.sessions = {}
+    self.lock = threading.Lock()
+
+  def get(self, host, port):
+    """
+    Return the cached session of a host, or None.
+    """
+
+    if not self.ttl:
+      return None
+
+    with self.lock:
+      cached = self.sessions.get((host, port))
+
+      if cached and cached[0] > time.time():
+        return cached[1]
+
+      self.sessions.pop((host, port), None)
+
+  def put(self, host, port, sock):
+    """
+    Cache the session of a connected socket; a resumed session keeps its original expiry.
+    """
+
+    session = getattr(sock, 'session', None)
+
+    if not self.ttl or session is None or getattr(sock, 'session_reused', False):
+      return
+
+    with self.lock:
+      self.sessions[(host, port)] = (time.time() + self.ttl, session)
+
+SESSIONS = SessionCache()
+
+CONTEXTS = {}
+CONTEXTS_LOCK = threading.Lock()
+
+def tls_context(validate_certs=True):
+  """
+  Return the SSLContext of the process for a certificate validation mode; sessions can only be
+  resumed by the context that created them.
+
+  :param bool validate_certs: Validate the certificate of the host (Default: True).
+  """
+
+  with CONTEXTS_LOCK:
+    if validate_certs not in CONTEXTS:
+      context = ssl.create_default_context()
+
+      if not validate_certs:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+      CONTEXTS[validate_certs] = context
+
+    return CONTEXTS[validate_certs]
+
+class HTTPSConnection(http_client.HTTPSConnection):
+  """
+  A HTTPSConnection which resumes the cached TLS session of its host.
+  """
+
+  def __init__(self, host, port=None, timeout=30, context=None, sessions=None):
+    http_client.HTTPSConnection.__init__(self, host, port, timeout=timeout, context=context)
+
+    self.sessions = sessions
+
+  def connect(self):
+    if not HAS_TLS_SESSIONS or self.sessions is None:
+      return http_client.HTTPSConnection.connect(self)
+
+    # Opens the socket (and the tunnel of a proxy) without TLS.
+    http_client.HTTPConnection.connect(self)
+
+    host = self._tunnel_host or self.host
+    port = self._tunnel_port or self.port
+
+    self.sock = self._context.wrap_socket(self.sock, server_hostname=host, session=self.sessions.get(host, port))
+
+  def cache_session(self):
+    """
+    Cache the TLS session after a response; TLS 1.3 only sends the session ticket after the handshake.
+    """
+
+    if HAS_TLS_SESSIONS and self.sessions is not None and self.sock is not None:
+      self.sessions.put(self._tunnel_host or self.host, self._tunnel_port or self.port, self.sock)
+
+def can_resend(method, error, sent):
+  """
+  Return whether a request that failed on a reused (kept alive) connection can be sent again on a new one.
+
+  The server can't have processed a request it didn't get all of, or closed the connection on without
+  answering (the keep-alive race); anything else may have been processed, so only an idempotent
+  request is sent again and a POST or PATCH is never applied twice.
+
+  :param str method: The method of the request.
+  :param Exception error: The error of the request.
+  :param bool sent: Whether the request was sent completely.
+  """
+
+  closed = (not sent and getattr(error, 'errno', None) in (errno.EPIPE, errno.ECONNRESET)) or isinstance(error, RemoteDisconnected)
+
+  return closed or method.upper() in IDEMPOTENT_METHODS
+
+class ConnectionPool():
+  """
+  A pool of kept alive HTTPS connections to one host, so concurrent requests don't pay a handshake each.
+  """
+
+  def __init__(self, url, validate_certs=True, use_proxy=False, size=8, timeout=30, sessions=SESSIONS):
+    """
+    :param str url: The base url of the host.
+    :param bool validate_certs: Validate the certificate of the host (Default: True).
+    :param bool use_proxy: Connect through the https_proxy of the environment when it is set (Default: False).
+    :param int size: The maximum number of idle connections kept (Default: 8).
+    :param int timeout: The socket timeout in seconds (Default: 30).
+    :param SessionCache sessions: The cache of TLS sessions to resume (Default: the cache of the process).
+    """
+
+    url = urlparse(url)
+
+    self.host = url.hostname
+    self.port = url.port or 443
+    self.use_proxy = use_proxy
+    self.size = size
+    self.timeout = timeout
+    self.sessions = sessions
+    self.idle = []
+    self.lock = threading.Lock()
+    self.context = tls_context(bool(validate_certs))
+
+  def connect(self):
+    """
+    Open a new connection, through the https proxy when one is set.
+    """
+
+    proxy = os.environ.get('https_proxy') or os.environ.get('HTTPS_PROXY')
+
+    if proxy and self.use_proxy:
+      proxy = urlparse(proxy)
+      http = HTTPSConnection(proxy.hostname, proxy.port or 443, self.timeout, self.context, self.sessions)
+      http.set_tunnel(self.host, self.port)
+    else:
+      http = HTTPSConnection(self.host, self.port, self.timeout, self.context, self.sessions)
+
+    return http
+
+  def request(self, method, path, body=None, headers=None):
+    """
+    Send a request over an idle (or new) connection and return the status, body and Retry-After header.
+
+    A request on an idle connection the server has closed in the meantime is sent again on a new one;
+    when the request may have reached the server (e.g. a timeout waiting for the response), only an
+    idempotent one is, so a POST or PATCH is never applied twice.
+
+    :param str method: The method of the request.
+    :param str path: The path (and query) of the request.
+    :param bytes body: The body of the request (Default: None).
+    :param dict headers: The headers of the request (Default: None).
+    """
+
+    with self.lock:
+      http = self.idle.pop() if self.idle else None
+
+    for attempt in range(2):
+      reused = http is not None
+      sent = False
+
+      if http is None:
+        http = self.connect()
+
+      try:
+        http.request(method, path, body=body, headers=headers or {})
+        sent = True
+        response = http.getresponse()
+        result = (response.status, response.read(), response.getheader('Retry-After'))
+        http.cache_session()
+      except (http_client.HTTPException, socket.error) as e:
+        http.close()
+        http = None
+
+        if attempt or not reused or not can_resend(method, e, sent):
+          raise
+
+        continue
+
+      with self.lock:
+        if len(self.idle) < self.size:
+          self.idle.append(http)
+          http = None
+
+      if http is not None:
+        http.close()
+
+      return result
+
+  def close(self):
+    with self.lock:
+      for http in self.idle:
+        http.close()
+
+      self.idle = []
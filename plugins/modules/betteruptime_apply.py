@@ -0,0 +1,498 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: betteruptime_apply
+
+short_description: "This module creates / updates monitor groups, monitors, status pages and their sections and resources on Better Uptime in one go."
+
+version_added: "1.1.0"
+
+description:
+  - "This module creates / updates a document of monitor groups, monitors, status pages, status page sections and status page resources which refer to each other."
+  - "An item gets a symbolic name with ref; an option of another item refers to it with a dict with only a ref (e.g. monitor_group_id: { ref: shop }), which is replaced by the id of the item once it's created / updated."
+  - "The items form a dependency graph; every item is applied as soon as the items it refers to are, and independent items are applied concurrently, so the run takes as long as the longest chain of references instead of the number of items."
+  - "The items of every type are matched with one listing (the sections and resources with one listing per status page, none for a status page that was just created)."
+  - "The items of which a referred item failed are skipped."
+  - "Two items of one type with the same check_for values (on one status page for the sections and resources) fail, as they would both be created."
+  - "As an async task (async with poll: 0), async_status shows how many items are done, failed and remaining while the document is applied."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  monitor_groups:
+    description: "The monitor groups, with the options of the monitor_groups module and optionally a ref."
+    required: False
+    type: list
+  monitors:
+    description: "The monitors, with the options of the monitors module and optionally a ref."
+    required: False
+    type: list
+  status_pages:
+    description: "The status pages, with the options of the status_page module and optionally a ref."
+    required: False
+    type: list
+  status_page_sections:
+    description: "The sections of the status pages, with their status_page_id (or a ref to the status page), name and optionally position and a ref."
+    required: False
+    type: list
+  status_page_resources:
+    description: "The resources of the status pages, with their status_page_id, resource_id and resource_type (e.g. Monitor), optionally status_page_section_id, public_name and a ref."
+    required: False
+    type: list
+  check_for:
+    description:
+      - "The options to match the existing items of a type with, by type."
+      - "default: name for monitor_groups and status_page_sections, url for monitors, subdomain for status_pages and resource_id and resource_type for status_page_resources."
+    required: False
+    type: dict
+  workers:
+    description: "The maximum number of concurrent requests."
+    required: False
+    type: int
+    default: 8
+    env:
+      - name: BU_WORKERS
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Create / update a status page with the monitors of a new monitor group.
+- name: Create / update a status page with the monitors of a new monitor group.
+  betteruptime.betteruptime.betteruptime_apply:
+    api_token: <api_token>
+    monitor_groups:
+      - ref: shop
+        name: "Shop"
+    monitors:
+      - ref: shop_www
+        url: "https://shop.example.com"
+        monitor_type: "status"
+        monitor_group_id: { ref: shop }
+      - ref: shop_api
+        url: "https://api.shop.example.com"
+        monitor_type: "status"
+        monitor_group_id: { ref: shop }
+    status_pages:
+      - ref: page
+        subdomain: "shop-status"
+        company_name: "Shop"
+        company_url: "https://shop.example.com"
+        timezone: "UTC"
+    status_page_sections:
+      - ref: services
+        status_page_id: { ref: page }
+        name: "Services"
+    status_page_resources:
+      - status_page_id: { ref: page }
+        status_page_section_id: { ref: services }
+        resource_id: { ref: shop_www }
+        resource_type: "Monitor"
+        public_name: "Shop"
+      - status_page_id: { ref: page }
+        status_page_section_id: { ref: services }
+        resource_id: { ref: shop_api }
+        resource_type: "Monitor"
+        public_name: "API"
+  register: resp
+'''
+
+RETURN = r'''
+'''
+
+import json
+import threading
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent, run_graph
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import PROFILER, profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.progress import PROGRESS
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.reconcile import changes, identity, index_entries
+
+# The types of items, in the order of the result, with their resource and default check_for.
+KINDS = [
+  ('monitor_groups', dict(resource='monitor-groups', check_for=[ 'name' ])),
+  ('monitors', dict(resource='monitors', check_for=[ 'url' ])),
+  ('status_pages', dict(resource='status-pages', check_for=[ 'subdomain' ])),
+  ('status_page_sections', dict(resource='status-pages/{}/sections', check_for=[ 'name' ])),
+  ('status_page_resources', dict(resource='status-pages/{}/resources', check_for=[ 'resource_id', 'resource_type' ])),
+]
+
+def is_reference(value):
+  return isinstance(value, dict) and list(value) == [ 'ref' ]
+
+def references(value):
+  """
+  Return the refs an option value refers to.
+
+  :param value: The value.
+  """
+
+  if is_reference(value):
+    return [ str(value['ref']) ]
+
+  if isinstance(value, dict):
+    return [ ref for item in value.values() for ref in references(item) ]
+
+  if isinstance(value, list):
+    return [ ref for item in value for ref in references(item) ]
+
+  return []
+
+def substitute(value, ids):
+  """
+  Return an option value with the references replaced by the ids of the items they refer to.
+
+  :param value: The value.
+  :param dict ids: The ids by ref.
+  """
+
+  if is_reference(value):
+    return ids.get(str(value['ref']))
+
+  if isinstance(value, dict):
+    return dict((option, substitute(item, ids)) for option, item in value.items())
+
+  if isinstance(value, list):
+    return [ substitute(item, ids) for item in value ]
+
+  return value
+
+def levels(nodes):
+  """
+  Return the number of levels of a dependency graph (the length of its longest chain), or the keys of the
+  nodes in or behind a cycle.
+
+  :param dict nodes: The nodes by key, each with the keys of its parents in parents.
+  """
+
+  waiting = dict((key, set(node['parents'])) for key, node in nodes.items())
+  count = 0
+
+  while waiting:
+    keys = [ key for key, parents in waiting.items() if not parents ]
+
+    if not keys:
+      return sorted(waiting)
+
+    for key in keys:
+      del waiting[key]
+
+    for parents in waiting.values():
+      parents.difference_update(keys)
+
+    count += 1
+
+  return count
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  def listing(self, resource, check_for):
+    """
+    Return the index of the listing of a resource; every resource is listed once.
+
+    :param str resource: The Betteruptime resource path.
+    :param list check_for: The options to index the entries by.
+    """
+
+    with self.lock:
+      lock = self.locks.setdefault(resource, threading.Lock())
+
+    with lock:
+      if resource not in self.listings:
+        ret, resp = self.BUGet(resource)
+
+        with PROFILER.phase('matching'):
+          self.listings[resource] = (ret, index_entries(resp or [], check_for) if ret else resp)
+
+    return self.listings[resource]
+
+  def claim(self, scope, node):
+    """
+    Claim the identity of an item within its resource; returns the name of the item which claimed it
+    before, so two items never both create the same entry.
+
+    :param scope: The Betteruptime resource path (or the resource and status page ref).
+    :param dict node: The node of the item.
+    """
+
+    with self.lock:
+      other = self.claims.setdefault((scope, node['key']), node['name'])
+
+    return other if other != node['name'] else None
+
+  def apply(self, node):
+    """
+    Create / update one item, with its references replaced by the ids of the items they refer to.
+
+    :param dict node: The node of the item.
+    """
+
+    kind, spec = node['kind'], node['spec']
+    data = substitute(dict((option, value) for option, value in node['item'].items() if option != 'ref' and value is not None), self.ids)
+    resource = spec['resource']
+
+    if '{}' in resource:
+      page_id = data.pop('status_page_id', None)
+      resource = resource.format(page_id)
+
+    node['key'] = identity(data, node['check_for'])
+
+    scope = resource
+
+    # A status page that would be created (check mode) has no id; its items are told apart by its ref.
+    if '{}' in spec['resource'] and page_id is None:
+      scope = (spec['resource'], json.dumps(node['item'].get('status_page_id'), default=str))
+
+    other = self.claim(scope, node)
+
+    if other:
+      node['errors'] = '{} {} is defined more than once ({} and {}).'.format(node['kind'], node['key'], other, node['name'])
+      return node
+
+    # The sections and resources of a status page that was just created (or would be) can't exist yet.
+    if '{}' in spec['resource'] and (page_id is None or str(page_id) in self.created):
+      ret, index = True, {}
+    else:
+      ret, index = self.listing(resource, node['check_for'])
+
+    if not ret:
+      node['errors'] = index
+      return node
+
+    entry = index.get(node['key'])
+
+    if entry:
+      node['id'] = entry['id']
+
+    if not entry:
+      node.update(action='created', method='POST', data=data)
+    elif changes(data, entry['attributes']):
+      node.update(action='updated', method='PATCH', data=changes(data, entry['attributes']))
+    else:
+      node['action'] = 'unchanged'
+
+    if node['action'] != 'unchanged' and not self.check_mode:
+      code, body = self.BURequest(resource + ('/' + str(node['id']) if node.get('id') else ''), node['data'], node['method'])
+
+      node['return_code'] = code
+
+      if code >= 400 or 'errors' in body:
+        node['errors'] = body.get('errors', body)
+      elif 'data' in body:
+        node['id'] = body['data']['id']
+
+    if node['action'] == 'created' and node.get('id'):
+      self.created.add(str(node['id']))
+
+    if node['ref']:
+      self.ids[node['ref']] = node.get('id')
+
+    return node
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result=[],
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+
+      check_for = self.params['check_for'] or {}
+      nodes = {}
+      order = []
+      refs = {}
+      identities = {}
+
+      for kind, spec in KINDS:
+        for index, item in enumerate(self.params[kind] or []):
+          ref = str(item['ref']) if item.get('ref') is not None else None
+          key = '{}:{}'.format(kind, ref if ref else index)
+
+          if ref in refs:
+            self.fail_json(msg='The ref {} is used more than once.'.format(ref), **result)
+
+          if ref:
+            refs[ref] = key
+
+          node = dict(name=key, kind=kind, spec=spec, ref=ref, item=item, check_for=check_for.get(kind) or spec['check_for'])
+
+          missing = [ option for option in node['check_for'] + ([ 'status_page_id' ] if '{}' in spec['resource'] else []) if item.get(option) is None ]
+
+          if missing:
+            self.fail_json(msg='{} {} is missing the option(s) {}.'.format(kind, item, ', '.join(missing)), **result)
+
+          # Two items with the same identity would both be created; the ones which refer to other items
+          # only have theirs once those have ids (see claim).
+          scope = [ item.get('status_page_id') ] if '{}' in spec['resource'] else []
+          identifiers = [ item.get(option) for option in node['check_for'] ] + scope
+
+          if not references(identifiers):
+            same = (spec['resource'], json.dumps(scope, default=str), identity(item, node['check_for']))
+
+            if same in identities:
+              self.fail_json(msg='{} {} is defined more than once ({} and {}).'.format(kind, same[2], identities[same], key), **result)
+
+            identities[same] = key
+
+          nodes[key] = node
+          order.append(key)
+
+      for key, node in nodes.items():
+        unknown = [ ref for ref in references(node['item']) if ref not in refs ]
+
+        if unknown:
+          self.fail_json(msg='{} refers to the unknown ref(s) {}.'.format(key, ', '.join(unknown)), **result)
+
+        node['parents'] = sorted(set(refs[ref] for ref in references(node['item'])))
+
+      depth = levels(nodes)
+
+      if isinstance(depth, list):
+        self.fail_json(msg='The refs of {} form a cycle.'.format(', '.join(depth)), **result)
+
+      self.lock = threading.Lock()
+      self.locks = {}
+      self.listings = {}
+      self.ids = {}
+      self.created = set()
+      self.claims = {}
+
+      # The top level listings are pulled concurrently up front; the ones of the status pages on demand.
+      listings = sorted(set((node['spec']['resource'], tuple(node['check_for'])) for node in nodes.values() if '{}' not in node['spec']['resource']))
+
+      run_concurrent(lambda listing: self.listing(*listing), listings, self.params['workers'])
+
+      PROGRESS.add(len(nodes))
+
+      run_graph(PROGRESS.track(self.apply), nodes, self.params['workers'])
+
+      summary = dict((action, 0) for action in [ 'created', 'updated', 'unchanged', 'skipped', 'failed' ])
+
+      for key in order:
+        node = nodes[key]
+        summary['failed' if 'errors' in node and node.get('action') != 'skipped' else node['action']] += 1
+
+      # The descendants of a failed item are skipped without a call.
+      PROGRESS.advance(summary['skipped'], summary['skipped'])
+
+      failed = [ key for key in order if 'errors' in nodes[key] ]
+
+      result['result'] = [ dict((option, nodes[key].get(option)) for option in [ 'kind', 'ref', 'key', 'id', 'action', 'return_code', 'errors' ] if nodes[key].get(option) is not None) for key in order ]
+      result['ids'] = self.ids
+      result['summary'] = summary
+      result['levels'] = depth
+      result['changed'] = any(nodes[key].get('action') in [ 'created', 'updated' ] and 'errors' not in nodes[key] for key in order)
+
+      if failed:
+        result['msg'] = 'Task failed.'
+        run_failed = True
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec=dict(
+      api_token=dict(
+        type='str',
+        required=True,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      monitor_groups=dict(
+        type='list',
+        elements='dict',
+        required=False
+      ),
+      monitors=dict(
+        type='list',
+        elements='dict',
+        required=False
+      ),
+      status_pages=dict(
+        type='list',
+        elements='dict',
+        required=False
+      ),
+      status_page_sections=dict(
+        type='list',
+        elements='dict',
+        required=False
+      ),
+      status_page_resources=dict(
+        type='list',
+        elements='dict',
+        required=False
+      ),
+      check_for=dict(
+        type='dict',
+        required=False
+      ),
+      workers=dict(
+        type='int',
+        required=False,
+        default=8,
+        fallback=(env_fallback, ['BU_WORKERS'])
+      ),
+      validate_certs=dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      https_proxy=dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    ),
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
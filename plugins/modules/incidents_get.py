@@ -0,0 +1,315 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: incidents_get
+
+short_description: "This module pulls the incidents of a period from Better Uptime."
+
+version_added: "1.1.0"
+
+description:
+  - "This module pulls the incidents of a period from Better Uptime."
+  - "The period is split into windows which are fetched concurrently, with pagination inside every window. Incidents that show up in more than one window are returned once."
+  - "When dest is set, the incidents are streamed to a JSON lines file instead of being returned, so long histories don't have to fit in memory."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  from:
+    description: "The first day of the period (YYYY-MM-DD)."
+    required: True
+    type: str
+  to:
+    description: "The last day of the period (YYYY-MM-DD, default: today)."
+    required: False
+    type: str
+  window:
+    description: "The number of days per window."
+    required: False
+    type: int
+    default: 7
+  per_page:
+    description: "The number of incidents per page."
+    required: False
+    type: int
+    default: 50
+  dest:
+    description:
+      - "Path of the JSON lines file to stream the incidents to (one incident per line)."
+      - "The lines are written in the order the windows return them."
+      - "The task reports changed when it writes dest; in check mode dest isn't written and the incidents are only counted."
+    required: False
+    type: path
+  workers:
+    description: "The maximum number of concurrent requests."
+    required: False
+    type: int
+    default: 8
+    env:
+      - name: BU_WORKERS
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Stream the incidents of last year to a file.
+- name: Stream the incidents of last year to a file.
+  betteruptime.betteruptime.incidents_get:
+    api_token: <api_token>
+    from: "2021-01-01"
+    to: "2021-12-31"
+    dest: "/tmp/incidents-2021.jsonl"
+  register: resp
+
+# Print the number of incidents.
+- name: Print the number of incidents.
+  debug:
+    var: resp.count
+'''
+
+RETURN = r'''
+'''
+
+import datetime
+import os
+import tempfile
+import threading
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_main, profile_run
+
+try:
+  from urllib.parse import urlencode
+except ImportError:
+  from urllib import urlencode
+
+def windows(start, end, days):
+  """
+  Split a period into consecutive windows of a number of days; returns (from, to) tuples of dates.
+
+  :param date start: The first day of the period.
+  :param date end: The last day of the period.
+  :param int days: The number of days per window.
+  """
+
+  while start <= end:
+    yield (start, min(start + datetime.timedelta(days=days - 1), end))
+    start += datetime.timedelta(days=days)
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  def emit(self, window, incidents):
+    """
+    Write (or collect) the incidents which haven't been seen in another window yet.
+
+    Only an incident that overlaps the first or last day of its window can be in another window too, so
+    only the ids of those are kept to skip them there.
+
+    :param tuple window: The first and last day of the window.
+    :param list incidents: The incidents of one page.
+    """
+
+    start, end = window[0].isoformat(), window[1].isoformat()
+
+    with self.lock:
+      for incident in incidents:
+        attributes = incident.get('attributes') or {}
+
+        if not (start < (attributes.get('started_at') or '')[:10] and (attributes.get('resolved_at') or '9999')[:10] < end):
+          if incident['id'] in self.seen:
+            continue
+
+          self.seen.add(incident['id'])
+
+        self.count += 1
+
+        if self.stream:
+          self.stream.write(json_dumps(incident) + b'\n')
+        elif not self.params['dest']:
+          self.incidents.append(incident)
+
+  def fetch(self, window):
+    """
+    Fetch all the pages of one window.
+
+    :param tuple window: The first and last day of the window.
+    """
+
+    summary = dict(
+      start=window[0].isoformat(),
+      end=window[1].isoformat(),
+      pages=0,
+      incidents=0
+    )
+
+    query = urlencode({ 'from': summary['start'], 'to': summary['end'], 'per_page': self.params['per_page'] })
+
+    for ret, page in self.BUPages('incidents?' + query):
+      if not ret:
+        summary['errors'] = page
+        break
+
+      summary['pages'] += 1
+      summary['incidents'] += len(page)
+
+      self.emit(window, page)
+
+    return summary
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result=[],
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+
+      try:
+        start = datetime.datetime.strptime(self.params['from'], '%Y-%m-%d').date()
+        end = datetime.datetime.strptime(self.params['to'], '%Y-%m-%d').date() if self.params['to'] else datetime.date.today()
+      except ValueError as e:
+        self.fail_json(msg='Invalid date: {}'.format(e), **result)
+
+      if self.params['window'] < 1:
+        self.fail_json(msg='window must be at least 1 day.', **result)
+
+      self.lock = threading.Lock()
+      self.seen = set()
+      self.count = 0
+      self.incidents = []
+      self.stream = None
+
+      dest = self.params['dest']
+
+      # In check mode the incidents are only counted; dest is left as it is.
+      if dest and not self.check_mode:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dest)), prefix='.incidents_get.')
+        self.stream = os.fdopen(fd, 'wb')
+
+      try:
+        summaries = run_concurrent(self.fetch, list(windows(start, end, self.params['window'])), self.params['workers'])
+      finally:
+        if self.stream:
+          self.stream.close()
+
+      result['windows'] = summaries
+      result['count'] = self.count
+
+      if any('errors' in summary for summary in summaries):
+        result['msg'] = 'Task failed.'
+        run_failed = True
+
+        if self.stream:
+          os.remove(tmp)
+      elif dest:
+        if self.stream:
+          self.atomic_move(tmp, dest)
+
+        result['dest'] = dest
+        result['changed'] = True
+      else:
+        result['result'] = self.incidents
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec={
+      'api_token': dict(
+        type='str',
+        required=True,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      'from': dict(
+        type='str',
+        required=True
+      ),
+      'to': dict(
+        type='str',
+        required=False
+      ),
+      'window': dict(
+        type='int',
+        required=False,
+        default=7
+      ),
+      'per_page': dict(
+        type='int',
+        required=False,
+        default=50
+      ),
+      'dest': dict(
+        type='path',
+        required=False
+      ),
+      'workers': dict(
+        type='int',
+        required=False,
+        default=8,
+        fallback=(env_fallback, ['BU_WORKERS'])
+      ),
+      'validate_certs': dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      'https_proxy': dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    },
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,269 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: monitor_groups
+
+short_description: "This module creates / updates or removes a monitor group on / from Better Uptime."
+
+version_added: "1.1.0"
+
+description:
+  - "This module creates / updates or removes a monitor group on / from Better Uptime."
+  - "The id of the monitor group can be used as monitor_group_id of the monitors and the other modules, which then only list the monitors of the group."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  id:
+    description: "The ID of the monitor group you want to update."
+    required: False
+    type: int
+    env:
+      - name: BU_ID
+  state:
+    description: "The state of the monitor group (choices: present (default) and absent)."
+    required: False
+    type: str
+    default: present
+    env:
+      - name: BU_STATE
+  check_for:
+    description:
+      - "Provide a str or list of options to compare existing items with."
+      - "Overwrite / update when all the options do match and if it doesn't; a new item will be created."
+      - "default: name"
+    required: False
+    type: list
+    default: name
+    env:
+      - name: RF_CHECK_FOR
+  name:
+    description: "The name of the monitor group."
+    required: False
+    type: str
+  sort_index:
+    description: "The position of the monitor group on the dashboard."
+    required: False
+    type: int
+  paused:
+    description: "Pause all the monitors of the group."
+    required: False
+    type: bool
+  resolver_cache:
+    description: "Directory of the name -> id cache of the monitors module (monitor_group_name); its index of the monitor groups is dropped when a monitor group changes."
+    required: False
+    type: path
+    env:
+      - name: BU_RESOLVER_CACHE
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Create / update a monitor group.
+- name: Create / update a monitor group.
+  betteruptime.betteruptime.monitor_groups:
+    api_token: <api_token>
+    name: "Shop"
+    sort_index: 1
+  register: group
+
+# Create / update a monitor in the group.
+- name: Create / update a monitor in the group.
+  betteruptime.betteruptime.monitors:
+    api_token: <api_token>
+    url: "https://shop.example.com"
+    monitor_group_id: "{{ group.result.id }}"
+'''
+
+RETURN = r'''
+'''
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import PROFILER, profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.reconcile import changes, identity, index_entries
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.resolver import ResolveError, Resolver, default_cache
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result={},
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+      check_for=self.params['check_for']
+      state=True if self.params['state'] == 'present' else False
+
+      data = {}
+
+      for option in [ 'name', 'sort_index', 'paused' ]:
+        if self.params[option] is not None:
+          data[option] = self.params[option]
+
+      if self.params['id']:
+        ret, resp = self.BUGet('monitor-groups', self.params['id'])
+
+        if not ret:
+          self.fail_json(msg=resp, **result)
+
+        entry = resp
+      else:
+        missing = [ option for option in check_for if option not in data ]
+
+        if missing:
+          self.fail_json(msg='The check_for option(s) {} are missing.'.format(', '.join(missing)), **result)
+
+        ret, resp = self.BUGet('monitor-groups')
+
+        if not ret:
+          self.fail_json(msg=resp, **result)
+
+        with PROFILER.phase('matching'):
+          entry = index_entries(resp, check_for).get(identity(data, check_for))
+
+      if entry:
+        result['result'] = dict(entry['attributes'], id=entry['id'])
+
+      if entry and not state:
+        method, resource, body = 'DELETE', 'monitor-groups/' + str(entry['id']), None
+      elif entry and state and changes(data, entry['attributes']):
+        method, resource, body = 'PATCH', 'monitor-groups/' + str(entry['id']), changes(data, entry['attributes'])
+      elif not entry and state:
+        method, resource, body = 'POST', 'monitor-groups', data
+      else:
+        method = None
+
+      if method:
+        result['changed'] = True
+
+        if not self.check_mode:
+          code, resp = self.BURequest(resource, body, method)
+
+          result['return_code'] = code
+
+          if code >= 400 or 'errors' in resp:
+            result['msg'] = resp.get('errors', resp)
+            result['changed'] = False
+            run_failed = True
+          elif method == 'DELETE':
+            result['result'] = {}
+          else:
+            result['result'] = dict(resp['data']['attributes'], id=resp['data']['id'])
+
+          if not run_failed:
+            try:
+              Resolver(self, self.params['resolver_cache'] or default_cache()).invalidate('monitor-groups')
+            except ResolveError:
+              # A cache that isn't private is never used, so there's nothing to drop.
+              pass
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec=dict(
+      api_token=dict(
+        type='str',
+        required=True,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      id=dict(
+        type='int',
+        required=False,
+        fallback=(env_fallback, ['BU_ID'])
+      ),
+      state=dict(
+        type='str',
+        required=False,
+        choices=['present','absent'],
+        default='present',
+        fallback=(env_fallback, ['BU_STATE'])
+      ),
+      check_for=dict(
+        type='list',
+        required=False,
+        default='name',
+        fallback=(env_fallback, ['BU_CHECK_FOR'])
+      ),
+      name=dict(
+        type='str',
+        required=False
+      ),
+      sort_index=dict(
+        type='int',
+        required=False
+      ),
+      paused=dict(
+        type='bool',
+        required=False
+      ),
+      resolver_cache=dict(
+        type='path',
+        required=False,
+        fallback=(env_fallback, ['BU_RESOLVER_CACHE'])
+      ),
+      validate_certs=dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      https_proxy=dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    ),
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,266 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: monitor_response_times
+
+short_description: "This module summarizes the response times of many monitors on Better Uptime."
+
+version_added: "1.1.0"
+
+description:
+  - "This module pulls the response times of many monitors concurrently and summarizes them per monitor and region."
+  - "The series are processed page by page; the percentiles come from a log-scale histogram and the series is downsampled into fixed time buckets, so the raw points are never held."
+  - "The aggregation is vectorized with NumPy when it is available."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  monitor_ids:
+    description: "Only summarize these monitors."
+    required: False
+    type: list
+  monitor_group_id:
+    description: "Only summarize the monitors of these monitor groups."
+    required: False
+    type: list
+  url_pattern:
+    description: "Only summarize the monitors of which the url matches this regular expression."
+    required: False
+    type: str
+  percentiles:
+    description: "The percentiles to report."
+    required: False
+    type: list
+    default: [ 50, 95, 99 ]
+  precision:
+    description: "The relative error of the percentiles."
+    required: False
+    type: float
+    default: 0.01
+  bucket:
+    description: "The size of the downsampling buckets in seconds (0 disables downsampling)."
+    required: False
+    type: int
+    default: 3600
+  workers:
+    description: "The maximum number of concurrent requests."
+    required: False
+    type: int
+    default: 8
+    env:
+      - name: BU_WORKERS
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Summarize the response times of a monitor group.
+- name: Summarize the response times of a monitor group.
+  betteruptime.betteruptime.monitor_response_times:
+    api_token: <api_token>
+    monitor_group_id:
+      - 1234
+    bucket: 900
+  register: resp
+
+# Print the summaries.
+- name: Print the summaries.
+  debug:
+    var: resp.result
+'''
+
+RETURN = r'''
+'''
+
+import calendar
+import time
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.aggregate import Downsampler, Histogram
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.selector import select_monitors
+
+def epoch(timestamp):
+  """
+  Convert a (UTC) ISO 8601 timestamp to seconds since the epoch.
+
+  :param str timestamp: The timestamp.
+  """
+
+  return calendar.timegm(time.strptime(timestamp[:19], '%Y-%m-%dT%H:%M:%S'))
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  def summarize(self, monitor):
+    """
+    Stream the response times of one monitor and summarize them per region.
+
+    :param dict monitor: The monitor.
+    """
+
+    histograms = {}
+    samplers = {}
+
+    for ret, page in self.BUPages('monitors/{}/response-times'.format(monitor['id'])):
+      if not ret:
+        return dict(id=monitor['id'], url=monitor['attributes'].get('url'), errors=page)
+
+      for region in page['attributes']['regions']:
+        points = region['response_times']
+        values = [ point['response_time'] for point in points ]
+
+        histograms.setdefault(region['region'], Histogram(self.params['precision'])).add(values)
+
+        if self.params['bucket']:
+          samplers.setdefault(region['region'], Downsampler(self.params['bucket'])).add([ epoch(point['at']) for point in points ], values)
+
+    regions = {}
+    total = Histogram(self.params['precision'])
+
+    for region, histogram in histograms.items():
+      regions[region] = histogram.summary(self.params['percentiles'])
+
+      if region in samplers:
+        regions[region]['buckets'] = samplers[region].rows()
+
+      total.merge(histogram)
+
+    return dict(
+      id=monitor['id'],
+      url=monitor['attributes'].get('url'),
+      summary=total.summary(self.params['percentiles']),
+      regions=regions
+    )
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result=[],
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+
+      if self.params['monitor_ids'] and not self.params['monitor_group_id'] and not self.params['url_pattern']:
+        monitors = [ dict(id=id, attributes={}) for id in self.params['monitor_ids'] ]
+      else:
+        ret, resp = self.BUGet('monitors')
+
+        if not ret:
+          self.fail_json(msg=resp, **result)
+
+        monitors = select_monitors(resp, self.params['monitor_ids'], self.params['monitor_group_id'], self.params['url_pattern'])
+
+      result['result'] = run_concurrent(self.summarize, monitors, self.params['workers'])
+
+      if any('errors' in summary for summary in result['result']):
+        result['msg'] = 'Task failed.'
+        run_failed = True
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec=dict(
+      api_token=dict(
+        type='str',
+        required=True,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      monitor_ids=dict(
+        type='list',
+        required=False
+      ),
+      monitor_group_id=dict(
+        type='list',
+        required=False
+      ),
+      url_pattern=dict(
+        type='str',
+        required=False
+      ),
+      percentiles=dict(
+        type='list',
+        elements='float',
+        required=False,
+        default=[50, 95, 99]
+      ),
+      precision=dict(
+        type='float',
+        required=False,
+        default=0.01
+      ),
+      bucket=dict(
+        type='int',
+        required=False,
+        default=3600
+      ),
+      workers=dict(
+        type='int',
+        required=False,
+        default=8,
+        fallback=(env_fallback, ['BU_WORKERS'])
+      ),
+      validate_certs=dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      https_proxy=dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    ),
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
@@ -63,6 +63,10 @@ options:
     description: "Set the escalation policy for the monitor"
     required: False
     type: str
+  policy_name:
+    description: "Set the escalation policy for the monitor by its name (resolved to the policy_id, see resolver_cache)."
+    required: False
+    type: str
   follow_redirects:
     description: "Should we automatically follow redirects when sending the HTTP request?"
     required: False
@@ -115,7 +119,13 @@ options:
     required: False
     type: list
   monitor_group_id:
-    description: "Set this attribute if you want to add this monitor to a monitor group."
+    description:
+      - "Set this attribute if you want to add this monitor to a monitor group."
+      - "The existing monitor is then looked up in the monitors of the group first; the whole listing is only pulled when the group has no match."
+    required: False
+    type: str
+  monitor_group_name:
+    description: "Set the monitor group by its name (resolved to the monitor_group_id, see resolver_cache)."
     required: False
     type: str
   pronounceable_name:
@@ -173,6 +183,30 @@ options:
       - "In UTC timezone. Example: '03:00:00'"
     required: False
     type: str
+  state_store:
+    description:
+      - "Directory of a local store of the last applied desired state of every monitor (matched on check_for)."
+      - "When the desired state is unchanged and a GET of the stored monitor shows it is untouched (same updated_at), the module returns without listing all the monitors."
+      - "The records are kept per account (under a hash of the api_token), so accounts never share them."
+    required: False
+    type: path
+    env:
+      - name: BU_STATE_STORE
+  resolver_cache:
+    description:
+      - "Directory of the cache of the name -> id indexes of policy_name and monitor_group_name (default: ~/.ansible/tmp/betteruptime-resolver; it must be private to the user)."
+      - "Every referenced resource is listed once and the index is reused by the next tasks for resolver_ttl seconds; a name which isn't in the cached index is looked up again."
+    required: False
+    type: path
+    env:
+      - name: BU_RESOLVER_CACHE
+  resolver_ttl:
+    description: "How many seconds a cached name -> id index is used (0 disables the cache)."
+    required: False
+    type: int
+    default: 300
+    env:
+      - name: BU_RESOLVER_TTL
   validate_certs:
     description: "Require HTTPS-webrequest certificate validation."
     required: False
@@ -213,18 +247,17 @@ RETURN = r'''
 '''
 
 from ansible.module_utils.basic import AnsibleModule, env_fallback
-from ansible.module_utils.urls import open_url
 from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
-
-import json
-
-try:
-  from urllib.parse import urlencode
-except ImportError:
-  from urllib import urlencode
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_loads
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.monitor_options import MONITOR_OPTIONS
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import PROFILER, profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.reconcile import fingerprint, identity
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.resolver import REFERENCES, ResolveError, Resolver, default_cache
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.statestore import StateStore
 
 class CustomAnsibleModule(AnsibleModule, BURestApi):
 
+  @profile_run
   def run(self):
     """
     Execute the module logic.
@@ -247,35 +280,65 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
       data = {}
 
       for option in self.params:
-        if self.params[option] and option not in data and option not in [ 'api_token', 'validate_certs', 'check_for', 'state' ]:
+        if self.params[option] and option not in data and option not in [ 'api_token', 'validate_certs', 'check_for', 'state', 'state_store', 'resolver_cache', 'resolver_ttl' ]:
           data[option] = self.params[option]
 
-      ret, resp = self.BUGet(
-                    'monitors',
-                    self.params['id'] if self.params['id'] else None
-                  )
+      if any(reference in data for reference in REFERENCES):
+        try:
+          Resolver(self, self.params['resolver_cache'] or default_cache(), self.params['resolver_ttl']).resolve(data)
+        except ResolveError as e:
+          self.fail_json(msg=str(e), **result)
 
-      if not ret:
-        result['msg'] = resp
-        run_failed = True
+      store = StateStore(self.params['state_store'], 'monitors', self.api_token) if self.params['state_store'] and not self.params['id'] else None
+
+      if store:
+        key = identity(data, check_for)
+        desired = fingerprint([ self.params['state'], data ])
 
-        return False
+        converged, entry = store.lookup(self, key, desired, data)
 
-      matches_found = {}
+        if converged:
+          result['result'] = entry['attributes'] if entry else {}
+          self.exit_json(**result)
 
       update = {}
 
-      for entry in resp:
-        for option in check_for:
-          if data[option] == entry['attributes'][option]:
-            matches_found.update({ option: entry['attributes'][option] })
-
-        if len(matches_found) == len(check_for):
-          id = entry['id']
-          result['result'] = entry['attributes']
-          for option in data.keys():
-            if data[option] != entry['attributes'][option]:
-              update[option] = data[option]
+      # With a monitor_group_id only the monitors of that group are listed; the whole listing is
+      # only pulled when the group has no match, e.g. when the monitor moves to the group.
+      group_id = data.get('monitor_group_id') if not self.params['id'] else None
+
+      for listing_group_id in ([ group_id, None ] if group_id else [ None ]):
+
+        matches_found = {}
+
+        ret, resp = self.BUGet(
+                      'monitors',
+                      self.params['id'] if self.params['id'] else None,
+                      listing_group_id
+                    )
+
+        if not ret:
+          # The whole listing is the fallback of a group listing that failed (e.g. a group that doesn't exist).
+          if listing_group_id:
+            continue
+
+          self.fail_json(msg=resp, **result)
+
+        with PROFILER.phase('matching'):
+          for entry in resp:
+            for option in check_for:
+              if data[option] == entry['attributes'][option]:
+                matches_found.update({ option: entry['attributes'][option] })
+
+            if len(matches_found) == len(check_for):
+              id = entry['id']
+              result['result'] = entry['attributes']
+              for option in data.keys():
+                if data[option] != entry['attributes'][option]:
+                  update[option] = data[option]
+              break
+
+        if 'id' in locals():
           break
 
       if 'id' in locals() and len(update) == 0 and not state:
@@ -311,7 +374,7 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
           'PATCH'
         )
 
-        result['result'] = json.loads(resp.read())
+        result['result'] = json_loads(resp.read())
 
         result['return_code'] = resp.code
 
@@ -330,7 +393,7 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
           'POST'
         )
 
-        result['result'] = json.loads(resp.read())
+        result['result'] = json_loads(resp.read())
 
         result['return_code'] = resp.code
 
@@ -342,6 +405,14 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
         run_failed = True
         result['changed'] = False
 
+      if store and not run_failed and not self.check_mode:
+        if not state and result['changed']:
+          store.put(key, dict(fingerprint=desired, id=id, absent=True))
+        elif state and 'data' in result['result']:
+          store.put(key, dict(fingerprint=desired, id=result['result']['data']['id'], updated_at=result['result']['data']['attributes'].get('updated_at')))
+        elif state and 'id' in locals():
+          store.put(key, dict(fingerprint=desired, id=id, updated_at=result['result'].get('updated_at')))
+
     except:
       raise
 
@@ -353,174 +424,76 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
     else:
       self.exit_json(**result)
 
+@profile_main
 def main():
 
-  CustomAnsibleModule(
-    argument_spec=dict(
-      api_token=dict(
-        type='str',
-        required=True,
-        fallback=(env_fallback, ['BU_API_TOKEN'])
-      ),
-      state=dict(
-        type='str',
-        required=False,
-        choices=['present','absent'],
-        default='present',
-        fallback=(env_fallback, ['BU_STATE'])
-      ),
-      id=dict(
-        type='int',
-        required=False,
-        fallback=(env_fallback, ['BU_ID'])
-      ),
-      check_for=dict(
-        type='list',
-        required=False,
-        default='url',
-        fallback=(env_fallback, ['BU_check_for'])
-      ),
-      url=dict(
-        type='str',
-        required=False
-      ),
-      expected_status_codes=dict(
-        type='dict',
-        required=False
-      ),
-      request_headers=dict(
-        type='dict',
-        required=False
-      ),
-      domain_expiration=dict(
-        type='int',
-        required=False
-      ),
-      ssl_expiration=dict(
-        type='int',
-        required=False
-      ),
-      policy_id=dict(
-        type='str',
-        required=False
-      ),
-      follow_redirects=dict(
-        type='bool',
-        required=False
-      ),
-      monitor_type=dict(
-        type='str',
-        required=False,
-        choices=['status', 'expected_status_code', 'keyword', 'keyword_absence']
-      ),
-      required_keyword=dict(
-        type='str',
-        required=False
-      ),
-      call=dict(
-        type='bool',
-        required=False
-      ),
-      sms=dict(
-        type='bool',
-        required=False
-      ),
-      email=dict(
-        type='bool',
-        required=False
-      ),
-      push=dict(
-        type='bool',
-        required=False
-      ),
-      team_wait=dict(
-        type='int',
-        required=False
-      ),
-      paused=dict(
-        type='bool',
-        required=False
-      ),
-      port=dict(
-        type='str',
-        required=False
-      ),
-      regions=dict(
-        type='list',
-        required=False,
-        choices=['us', 'eu', 'as', 'au']
-      ),
-      monitor_group_id=dict(
-        type='str',
-        required=False
-      ),
-      pronounceable_name=dict(
-        type='str',
-        required=False
-      ),
-      recovery_period=dict(
-        type='int',
-        required=False
-      ),
-      verify_ssl=dict(
-        type='bool',
-        required=False
-      ),
-      check_frequency=dict(
-        type='int',
-        required=False
-      ),
-      confirmation_period=dict(
-        type='int',
-        required=False
-      ),
-      http_method=dict(
-        type='str',
-        required=False,
-        choices=['GET', 'HEAD', 'POST', 'PUT', 'PATCH']
-      ),
-      request_timeout=dict(
-        type='int',
-        required=False
-      ),
-      request_body=dict(
-        type='str',
-        required=False
-      ),
-      auth_username=dict(
-        type='str',
-        required=False
-      ),
-      auth_password=dict(
-        type='str',
-        required=False
-      ),
-      maintenance_from=dict(
-        type='str',
-        required=False
-      ),
-      maintenance_to=dict(
-        type='str',
-        required=False
-      ),
-      validate_certs=dict(
-        type='bool',
-        required=False,
-        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
-      ),
-      https_proxy=dict(
-        type='str',
-        required=False,
-        default=None,
-        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
-      )
+  argument_spec = dict(
+    api_token=dict(
+      type='str',
+      required=True,
+      fallback=(env_fallback, ['BU_API_TOKEN'])
+    ),
+    state=dict(
+      type='str',
+      required=False,
+      choices=['present','absent'],
+      default='present',
+      fallback=(env_fallback, ['BU_STATE'])
+    ),
+    id=dict(
+      type='int',
+      required=False,
+      fallback=(env_fallback, ['BU_ID'])
     ),
+    check_for=dict(
+      type='list',
+      required=False,
+      default='url',
+      fallback=(env_fallback, ['BU_check_for'])
+    ),
+    state_store=dict(
+      type='path',
+      required=False,
+      fallback=(env_fallback, ['BU_STATE_STORE'])
+    ),
+    resolver_cache=dict(
+      type='path',
+      required=False,
+      fallback=(env_fallback, ['BU_RESOLVER_CACHE'])
+    ),
+    resolver_ttl=dict(
+      type='int',
+      required=False,
+      default=300,
+      fallback=(env_fallback, ['BU_RESOLVER_TTL'])
+    ),
+    validate_certs=dict(
+      type='bool',
+      required=False,
+      default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+    ),
+    https_proxy=dict(
+      type='str',
+      required=False,
+      default=None,
+      fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+    )
+  )
+
+  argument_spec.update(MONITOR_OPTIONS)
+
+  CustomAnsibleModule(
+    argument_spec=argument_spec,
     required_together=[
       ('url', 'monitor_type'),
     ],
     required_one_of=[
       ('id', 'url'),
     ],
+    mutually_exclusive=[
+      ('policy_id', 'policy_name'),
+      ('monitor_group_id', 'monitor_group_name'),
+    ],
     supports_check_mode=True
   ).run()
 
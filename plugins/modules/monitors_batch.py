@@ -0,0 +1,86 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: monitors_batch
+
+short_description: "This action creates / updates or removes the monitor of every host of a task on / from Better Uptime in one batch."
+
+version_added: "1.1.0"
+
+description:
+  - "This action takes the same monitor options as the monitors module, but runs on the controller instead of on the hosts."
+  - "Every host of the task hands its monitor in; the monitors of the hosts which run at the same time (the batch, up to the number of forks) are flushed together with one listing and concurrent writes."
+  - "The result of every monitor is mapped back to the result of its host."
+  - "Hosts which declare the same monitor (the same check_for values) share its write; they fail when they declare it differently."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  state:
+    description: "The state of the monitor (choices: present (default) and absent)."
+    required: False
+    type: str
+    default: present
+  check_for:
+    description:
+      - "Provide a str or list of options to compare existing items with."
+      - "default: url"
+    required: False
+    type: list
+    default: url
+  url:
+    description: "URL of your website or the host you want to ping; all the other options of the monitors module are accepted as well, except policy_name and monitor_group_name (use the ids)."
+    required: False
+    type: str
+  workers:
+    description: "The maximum number of concurrent writes of a flush."
+    required: False
+    type: int
+    default: 8
+  batch_window:
+    description: "How many seconds the flush waits for more hosts after the last one came in, when not all the hosts of the batch came in yet."
+    required: False
+    type: float
+    default: 0.5
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: True
+  https_proxy:
+    description: "Use a proxy for https requests during this action."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Create / update the monitor of every host, in one batch.
+- name: Create / update the monitor of every host.
+  betteruptime.betteruptime.monitors_batch:
+    api_token: <api_token>
+    monitor_type: "status"
+    url: "https://{{ inventory_hostname }}"
+    pronounceable_name: "{{ inventory_hostname }}"
+  register: resp
+'''
+
+RETURN = r'''
+'''
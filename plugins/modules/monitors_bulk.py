@@ -0,0 +1,623 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: monitors_bulk
+
+short_description: "This module creates / updates or removes many monitors on / from Better Uptime at once."
+
+version_added: "1.1.0"
+
+description:
+  - "This module creates / updates or removes many monitors on / from Better Uptime at once."
+  - "The monitors are listed once, matched on the check_for options and the writes are sent concurrently."
+  - "When a journal is set, every write is recorded before and after it is sent. A run that dies halfway can be rerun; the finished items are skipped and only the items that were in flight are verified."
+  - "When prune is set, the monitors are exclusive; every existing monitor in the prune scope which isn't one of the monitors is removed."
+  - "Run as an async task (async with poll: 0), the module reports its progress (monitors done, failed and remaining, and the request rate) to async_status while it runs."
+
+options:
+  api_token:
+    description: "API Bearer token (required without accounts)."
+    required: False
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  accounts:
+    description:
+      - "Apply the monitors to several accounts (Better Uptime teams) in parallel instead of to the account of api_token."
+      - "Every account has its own connection pool, rate limit, workers and journal (the journal path suffixed with .<name>), so a slow or rate limited account doesn't hold up the others."
+      - "The result is keyed by account name."
+    required: False
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description: "The name of the account, which keys its result."
+        required: True
+        type: str
+      api_token:
+        description: "API Bearer token of the account."
+        required: True
+        type: str
+        no_log: True
+      workers:
+        description: "The maximum number of concurrent requests of the account (default: workers)."
+        required: False
+        type: int
+      rate_limit:
+        description: "The maximum number of requests per second of the account (0 disables the rate limit)."
+        required: False
+        type: float
+        default: 0
+  monitors:
+    description:
+      - "The monitors, as a list of dicts with the same options as the monitors module."
+      - "Every monitor can have its own state; the state option is the default."
+      - "policy_name and monitor_group_name are resolved to their ids on every account (see resolver_cache)."
+    required: True
+    type: list
+  state:
+    description: "The default state of the monitors (choices: present (default) and absent)."
+    required: False
+    type: str
+    default: present
+    env:
+      - name: BU_STATE
+  check_for:
+    description:
+      - "Provide a str or list of options to compare existing items with."
+      - "Overwrite / update when all the options do match and if it doesn't; a new item will be created."
+      - "default: url"
+    required: False
+    type: list
+    default: url
+    env:
+      - name: RF_CHECK_FOR
+  prune:
+    description:
+      - "Remove the existing monitors in the prune scope which don't match any of the monitors."
+      - "Without prune_monitor_group_id and prune_name_prefix the scope is the whole account."
+    required: False
+    type: bool
+    default: False
+  prune_monitor_group_id:
+    description: "Limit the prune scope to the monitors of this monitor group."
+    required: False
+    type: str
+  prune_name_prefix:
+    description: "Limit the prune scope to the monitors of which the pronounceable_name starts with this prefix."
+    required: False
+    type: str
+  max_deletions:
+    description:
+      - "The maximum number of monitors prune may remove; the task fails without removing anything when more would be removed."
+      - "A negative number disables the limit."
+    required: False
+    type: int
+    default: 10
+  journal:
+    description:
+      - "Path of the local journal to record the writes in, so an interrupted run can be resumed."
+      - "The journal is removed when a run completes without errors."
+      - "A monitor that was in flight is only written again when it doesn't exist (404); when it can't be pulled the item fails as unverified and stays in the journal."
+    required: False
+    type: path
+    env:
+      - name: BU_JOURNAL
+  resolver_cache:
+    description: "Directory of the cache of the name -> id indexes of policy_name and monitor_group_name (default: ~/.ansible/tmp/betteruptime-resolver; it must be private to the user)."
+    required: False
+    type: path
+    env:
+      - name: BU_RESOLVER_CACHE
+  resolver_ttl:
+    description: "How many seconds a cached name -> id index is used (0 disables the cache)."
+    required: False
+    type: int
+    default: 300
+    env:
+      - name: BU_RESOLVER_TTL
+  workers:
+    description: "The maximum number of concurrent requests."
+    required: False
+    type: int
+    default: 8
+    env:
+      - name: BU_WORKERS
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Create / update many monitors.
+- name: Create / update many monitors.
+  betteruptime.betteruptime.monitors_bulk:
+    api_token: <api_token>
+    journal: "/var/tmp/betteruptime-monitors.journal"
+    monitors:
+      - url: "https://www.example.com"
+        monitor_type: "status"
+      - url: "https://shop.example.com"
+        monitor_type: "keyword"
+        required_keyword: "Checkout"
+      - url: "https://old.example.com"
+        state: absent
+  register: resp
+
+# Print the changes.
+- name: Print the changes.
+  debug:
+    var: resp
+
+# Make these the only monitors of a monitor group.
+- name: Make these the only monitors of a monitor group.
+  betteruptime.betteruptime.monitors_bulk:
+    api_token: <api_token>
+    prune: True
+    prune_monitor_group_id: 1234
+    max_deletions: 5
+    monitors:
+      - url: "https://www.example.com"
+        monitor_group_id: 1234
+      - url: "https://api.example.com"
+        monitor_group_id: 1234
+  register: resp
+
+# Apply the same monitors to two teams.
+- name: Apply the same monitors to two teams.
+  betteruptime.betteruptime.monitors_bulk:
+    accounts:
+      - name: production
+        api_token: <api_token>
+      - name: staging
+        api_token: <api_token>
+        rate_limit: 2
+    monitors:
+      - url: "https://www.example.com"
+  register: resp
+'''
+
+RETURN = r'''
+'''
+
+import functools
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.accounts import fan_out, load_accounts
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.journal import Journal
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import PROFILER, profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.progress import PROGRESS
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.reconcile import changes, fingerprint, identity, index_entries
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.resolver import REFERENCES, ResolveError, Resolver, default_cache
+
+try:
+  from urllib.parse import urlencode
+except ImportError:
+  from urllib import urlencode
+
+# The monitor attributes the listing can be filtered on.
+LISTING_FILTERS = [ 'url', 'pronounceable_name' ]
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  def lookup(self, api, item):
+    """
+    Look up the existing monitor of an item with a filtered listing.
+
+    :param BURestApi api: The account to look the item up on.
+    :param dict item: The item to look up.
+    """
+
+    ret, resp = api.BUGet('monitors?' + urlencode(dict((option, item['data'][option]) for option in self.check_for)))
+
+    if ret:
+      item['entry'] = index_entries(resp, self.check_for).get(item['key'])
+    else:
+      item['errors'] = resp
+
+    return item
+
+  def in_scope(self, entry):
+    """
+    Return whether an existing monitor is in the prune scope.
+
+    :param dict entry: The existing monitor.
+    """
+
+    group_id = self.params['prune_monitor_group_id']
+    prefix = self.params['prune_name_prefix']
+
+    return (
+      (not group_id or str(entry['attributes'].get('monitor_group_id')) == str(group_id))
+      and (not prefix or (entry['attributes'].get('pronounceable_name') or '').startswith(prefix))
+    )
+
+  def verify(self, api, item):
+    """
+    Pull the current state of an item that was in flight when the journal was left behind.
+
+    :param BURestApi api: The account to pull the item from.
+    :param dict item: The item to verify.
+    """
+
+    code, body = api.BURequest('monitors/' + str(item['id']))
+
+    # Only a monitor that doesn't exist is written again; when its state is unknown (e.g. a 429, a 5xx
+    # or a network error) the item stays uncertain in the journal and fails.
+    if code == 404:
+      item['entry'] = None
+      del item['id']
+    elif code == 200 and 'data' in body:
+      item['entry'] = body['data']
+    else:
+      item['errors'] = body.get('errors', body)
+      item['return_code'] = code
+
+    return item
+
+  def write(self, api, item):
+    """
+    Send the write of an item and record it in the journal of the account.
+
+    :param BURestApi api: The account to write the item to.
+    :param dict item: The item to write.
+    """
+
+    if api.journal:
+      api.journal.record(item['key'], item['fingerprint'], 'intent', item['method'], item.get('id'))
+
+    code, body = api.BURequest('monitors' + ('/' + str(item['id']) if item.get('id') else ''), item['data'] if item['method'] != 'DELETE' else None, item['method'])
+
+    item['return_code'] = code
+
+    if code >= 400 or 'errors' in body:
+      item['errors'] = body.get('errors', body)
+    elif 'data' in body:
+      item['id'] = body['data']['id']
+
+    if api.journal:
+      api.journal.record(item['key'], item['fingerprint'], 'failed' if 'errors' in item else 'done', item['method'], item.get('id'))
+
+    return item
+
+  def close_journal(self, api, remove):
+    """
+    Close the journal of an account (if any).
+
+    :param BURestApi api: The account.
+    :param bool remove: Remove the journal, because the run completed without errors.
+    """
+
+    if api.journal:
+      api.journal.close(remove=remove)
+      api.journal = None
+
+  def apply(self, api, items, journal=None):
+    """
+    Reconcile the items on one account and return its result; a result with a msg failed.
+
+    :param BURestApi api: The account to reconcile the items on.
+    :param list items: The items (with their key, fingerprint, state and data).
+    :param str journal: The path of the journal of the account (Default: None).
+    """
+
+    items = [ dict(item) for item in items ]
+    keys = set(item['key'] for item in items)
+    workers = api.workers
+
+    PROGRESS.add(len(items))
+
+    # The names are resolved per account; every referenced resource is listed (at most) once.
+    if any(reference in item['data'] for item in items for reference in REFERENCES):
+      try:
+        resolver = Resolver(api, self.params['resolver_cache'] or default_cache(), self.params['resolver_ttl'])
+
+        for item in items:
+          item['data'] = resolver.resolve(dict(item['data']))
+      except ResolveError as e:
+        return dict(msg=str(e))
+
+    api.journal = Journal(journal) if journal and not self.check_mode else None
+
+    fresh = []
+    uncertain = []
+
+    for item in items:
+      record = api.journal.state(item['key'], item['fingerprint']) if api.journal else None
+
+      if record is None:
+        fresh.append(item)
+      elif record['state'] == 'done':
+        item.update(action='resumed', id=record['id'])
+      else:
+        item['id'] = record['id']
+        uncertain.append(item)
+
+    # Items that are in flight with a known id are verified one by one; the others are
+    # matched against one listing, or a filtered listing per item when that is cheaper.
+    verify = [ item for item in uncertain if item.get('id') ]
+    match = fresh + [ item for item in uncertain if not item.get('id') ]
+
+    run_concurrent(functools.partial(self.verify, api), verify, workers)
+
+    pruned = []
+
+    # Pruning needs the whole listing; the monitors in scope that aren't desired are removed.
+    if self.params['prune'] or (match and (fresh or not all(option in LISTING_FILTERS for option in self.check_for))):
+      ret, resp = api.BUGet('monitors')
+
+      if not ret:
+        self.close_journal(api, False)
+        return dict(msg=resp)
+
+      with PROFILER.phase('matching'):
+        index = index_entries(resp, self.check_for)
+
+        for item in match:
+          item['entry'] = index.get(item['key'])
+
+        if self.params['prune']:
+          for entry in resp:
+            key = identity(entry['attributes'], self.check_for)
+
+            if key not in keys and self.in_scope(entry):
+              pruned.append(dict(key=key, fingerprint=fingerprint([ 'absent', entry['id'] ]), state='absent', data={}, id=entry['id'], action='pruned', method='DELETE'))
+
+      PROGRESS.add(len(pruned))
+
+      if 0 <= self.params['max_deletions'] < len(pruned):
+        self.close_journal(api, False)
+        return dict(msg='Prune would remove {} monitors, which is more than max_deletions ({}).'.format(len(pruned), self.params['max_deletions']), pruned=[ item['key'] for item in pruned ])
+    else:
+      run_concurrent(functools.partial(self.lookup, api), match, workers)
+
+    writes = []
+
+    for item in fresh + uncertain:
+      entry = item.pop('entry', None)
+
+      # An item of which the existing monitor couldn't be looked up is left alone.
+      if 'errors' in item:
+        item['action'] = 'unverified'
+        continue
+
+      if entry:
+        item['id'] = entry['id']
+
+      if item['state'] == 'present' and not entry:
+        item.update(action='created', method='POST')
+      elif item['state'] == 'present' and changes(item['data'], entry['attributes']):
+        item.update(action='updated', method='PATCH', data=changes(item['data'], entry['attributes']))
+      elif item['state'] == 'absent' and entry:
+        item.update(action='deleted', method='DELETE')
+      else:
+        item['action'] = 'unchanged'
+        continue
+
+      writes.append(item)
+
+    writes.extend(pruned)
+
+    # The items without a write are done; the writes are counted as they return.
+    PROGRESS.advance(len(items) + len(pruned) - len(writes))
+
+    if not self.check_mode:
+      run_concurrent(PROGRESS.track(functools.partial(self.write, api)), writes, workers)
+    else:
+      PROGRESS.advance(len(writes))
+
+    failed = [ item for item in items + pruned if 'errors' in item ]
+
+    self.close_journal(api, not failed)
+
+    summary = dict((action, 0) for action in [ 'created', 'updated', 'deleted', 'unchanged', 'resumed', 'pruned', 'unverified' ])
+
+    for item in items + pruned:
+      summary[item['action']] += 1
+
+    account = dict(
+      changed=len(writes) > 0,
+      summary=summary,
+      monitors=[ dict((option, item.get(option)) for option in [ 'key', 'action', 'id', 'return_code', 'errors' ] if item.get(option) is not None) for item in items + pruned ]
+    )
+
+    if failed:
+      account['msg'] = 'Task failed.'
+
+    return account
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result={},
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+      self.check_for=self.params['check_for']
+      self.workers=self.params['workers']
+
+      items = []
+      keys = set()
+
+      for monitor in self.params['monitors']:
+        data = dict((option, value) for option, value in monitor.items() if value is not None and option != 'state')
+        state = monitor.get('state') or self.params['state']
+
+        missing = [ option for option in self.check_for if option not in data ]
+
+        if missing:
+          self.fail_json(msg='Monitor {} is missing the check_for option(s) {}.'.format(data, ', '.join(missing)), **result)
+
+        key = identity(data, self.check_for)
+
+        if key in keys:
+          self.fail_json(msg='Monitor {} is defined more than once.'.format(key), **result)
+
+        keys.add(key)
+
+        items.append(dict(key=key, fingerprint=fingerprint([ state, data ]), state=state, data=data))
+
+      journal = self.params['journal']
+
+      if self.params['accounts']:
+        # Every account runs in a thread of its own, with its own connection pool, rate limit and journal.
+        accounts = load_accounts(self.params['accounts'], self.validate_certs, self.use_proxy, self.workers)
+
+        result['result'] = fan_out(lambda account: self.apply(account, items, journal and '{}.{}'.format(journal, account.name)), accounts)
+        result['changed'] = any(account.get('changed') for account in result['result'].values())
+
+        if any('msg' in account for account in result['result'].values()):
+          result['msg'] = 'Task failed.'
+          run_failed = True
+      else:
+        account = self.apply(self, items, journal)
+
+        if 'monitors' not in account:
+          self.fail_json(**dict(result, **account))
+
+        result['changed'] = account.pop('changed')
+        result['result'] = dict(summary=account['summary'], monitors=account['monitors'])
+
+        if 'msg' in account:
+          result['msg'] = account['msg']
+          run_failed = True
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec=dict(
+      api_token=dict(
+        type='str',
+        required=False,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      accounts=dict(
+        type='list',
+        elements='dict',
+        required=False,
+        options=dict(
+          name=dict(type='str', required=True),
+          api_token=dict(type='str', required=True, no_log=True),
+          workers=dict(type='int', required=False),
+          rate_limit=dict(type='float', required=False, default=0)
+        )
+      ),
+      monitors=dict(
+        type='list',
+        elements='dict',
+        required=True
+      ),
+      state=dict(
+        type='str',
+        required=False,
+        choices=['present','absent'],
+        default='present',
+        fallback=(env_fallback, ['BU_STATE'])
+      ),
+      check_for=dict(
+        type='list',
+        required=False,
+        default='url',
+        fallback=(env_fallback, ['BU_CHECK_FOR'])
+      ),
+      prune=dict(
+        type='bool',
+        required=False,
+        default=False
+      ),
+      prune_monitor_group_id=dict(
+        type='str',
+        required=False
+      ),
+      prune_name_prefix=dict(
+        type='str',
+        required=False
+      ),
+      max_deletions=dict(
+        type='int',
+        required=False,
+        default=10
+      ),
+      journal=dict(
+        type='path',
+        required=False,
+        fallback=(env_fallback, ['BU_JOURNAL'])
+      ),
+      resolver_cache=dict(
+        type='path',
+        required=False,
+        fallback=(env_fallback, ['BU_RESOLVER_CACHE'])
+      ),
+      resolver_ttl=dict(
+        type='int',
+        required=False,
+        default=300,
+        fallback=(env_fallback, ['BU_RESOLVER_TTL'])
+      ),
+      workers=dict(
+        type='int',
+        required=False,
+        default=8,
+        fallback=(env_fallback, ['BU_WORKERS'])
+      ),
+      validate_certs=dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      https_proxy=dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    ),
+    required_one_of=[['api_token', 'accounts']],
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
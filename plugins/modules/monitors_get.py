@@ -17,12 +17,38 @@ description: "This module pulls all the available status pages from Better Uptim
 
 options:
   api_token:
-    description: "API Bearer token."
-    required: True
+    description: "API Bearer token (required without accounts)."
+    required: False
     type: str
     no_log: True
     env:
       - name: BU_API_TOKEN
+  accounts:
+    description:
+      - "Pull the monitors of several accounts (Better Uptime teams) in parallel instead of the account of api_token."
+      - "Every account has its own connection pool and rate limit; the result is keyed by account name."
+    required: False
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description: "The name of the account, which keys its result."
+        required: True
+        type: str
+      api_token:
+        description: "API Bearer token of the account."
+        required: True
+        type: str
+        no_log: True
+      workers:
+        description: "The maximum number of concurrent requests of the account."
+        required: False
+        type: int
+      rate_limit:
+        description: "The maximum number of requests per second of the account (0 disables the rate limit)."
+        required: False
+        type: float
+        default: 0
   validate_certs:
     description: "Require HTTPS-webrequest certificate validation."
     required: False
@@ -54,95 +80,85 @@ EXAMPLES = r'''
 - name: Print all the available monitors.
   debug:
     var: resp
+
+# Get the monitors of two teams.
+- name: Get the monitors of two teams.
+  betteruptime.betteruptime.monitors_get:
+    accounts:
+      - name: production
+        api_token: <api_token>
+      - name: staging
+        api_token: <api_token>
+  register: resp
 '''
 
 RETURN = r'''
 '''
 
-from ansible.module_utils.basic import AnsibleModule, env_fallback
-from ansible.module_utils.urls import open_url
-from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
-
-import json
+from ansible.module_utils.basic import env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.listing import ListingModule, argument_spec
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_main
 
-try:
-  from urllib.parse import urlencode
-except ImportError:
-  from urllib import urlencode
+class CustomAnsibleModule(ListingModule):
 
-class CustomAnsibleModule(AnsibleModule, BURestApi):
+  resource = 'monitors'
 
-  def run(self):
+  def get_account(self, account):
     """
-    Execute the module logic.
-    """
-
-    result = dict(
-        changed=False,
-        result={},
-    )
+    Pull all the monitors of one account.
 
-    run_failed = False
+    :param Account account: The account.
+    """
 
-    try:
+    ret, resp = account.BUGet('monitors')
 
-      self.api_token=self.params['api_token']
-      self.validate_certs=self.params['validate_certs'] or True
+    return resp if ret else dict(msg='Task failed.', errors=resp)
 
-      resp = self.httpRequest(
-        'https://betteruptime.com/api/v2/monitors',
-        {
-          'Authorization': 'Bearer {}'.format( self.api_token ),
-          'Content-Type': 'application/json'
-        }
-      )
+  def pull(self, result):
+    """
+    Pull the monitors of the account of api_token, or of every account of accounts.
 
-      result['result'] = json.loads(resp.read())
+    :param dict result: The result of the module.
+    """
 
-      result['return_code'] = resp.code
+    if not self.params['accounts']:
+      return ListingModule.pull(self, result)
 
-      if result['return_code'] == 201:
-        result['changed'] = True
+    # Only a run with accounts needs their connection pools.
+    from ansible_collections.betteruptime.betteruptime.plugins.module_utils.accounts import fan_out, load_accounts
 
-      if 'errors' in result['result']:
-        result['msg'] = 'Task failed.'
-        run_failed = True
-        result['changed'] = False
-      else:
-        result['result'] = result['result']['data']
+    accounts = load_accounts(self.params['accounts'], self.validate_certs, self.use_proxy)
 
-    except:
-      raise
+    result['result'] = fan_out(self.get_account, accounts)
 
-    if self.check_mode:
-      self.exit_json(**result)
+    if any(isinstance(account, dict) and 'msg' in account for account in result['result'].values()):
+      self.fail_json(msg='Task failed.', **result)
 
-    if run_failed:
-      self.fail_json(**result)
-    else:
-      self.exit_json(**result)
+    self.exit_json(**result)
 
+@profile_main
 def main():
 
   CustomAnsibleModule(
-    argument_spec=dict(
+    argument_spec=argument_spec(
       api_token=dict(
         type='str',
-        required=True,
-        fallback=(env_fallback, ['BU_API_TOKEN'])
-      ),
-      validate_certs=dict(
-        type='bool',
         required=False,
-        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+        fallback=(env_fallback, ['BU_API_TOKEN'])
       ),
-      https_proxy=dict(
-        type='str',
+      accounts=dict(
+        type='list',
+        elements='dict',
         required=False,
-        default=None,
-        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+        options=dict(
+          name=dict(type='str', required=True),
+          api_token=dict(type='str', required=True, no_log=True),
+          workers=dict(type='int', required=False),
+          rate_limit=dict(type='float', required=False, default=0)
+        )
       )
     ),
+    required_one_of=[['api_token', 'accounts']],
     supports_check_mode=True
   ).run()
 
@@ -0,0 +1,247 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: monitors_pause
+
+short_description: "This module pauses many monitors on Better Uptime and resumes them afterwards."
+
+version_added: "1.1.0"
+
+description:
+  - "This module pauses the selected monitors on Better Uptime concurrently, e.g. for the maintenance window of a deployment."
+  - "On pause, the paused state every monitor had before is saved to state_file; on resume exactly that state is restored, so the monitors which were already paused stay paused."
+  - "Pausing again before resuming keeps the state saved by the first pause."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  state:
+    description: "paused (default) pauses the selected monitors, resumed restores the monitors saved in state_file."
+    required: False
+    type: str
+    default: paused
+  state_file:
+    description:
+      - "Path of the file to save the prior state of the monitors in."
+      - "The file is removed when all the monitors are resumed."
+    required: True
+    type: path
+  monitor_ids:
+    description: "Only pause these monitors."
+    required: False
+    type: list
+  monitor_group_id:
+    description: "Only pause the monitors of these monitor groups."
+    required: False
+    type: list
+  url_pattern:
+    description: "Only pause the monitors of which the url matches this regular expression."
+    required: False
+    type: str
+  workers:
+    description: "The maximum number of concurrent requests."
+    required: False
+    type: int
+    default: 8
+    env:
+      - name: BU_WORKERS
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Pause the monitors of the shop before the deployment.
+- name: Pause the monitors of the shop before the deployment.
+  betteruptime.betteruptime.monitors_pause:
+    api_token: <api_token>
+    url_pattern: "^https://shop\\.example\\.com"
+    state_file: "/var/tmp/shop-monitors.paused"
+
+# Resume them afterwards.
+- name: Resume them afterwards.
+  betteruptime.betteruptime.monitors_pause:
+    api_token: <api_token>
+    state: resumed
+    state_file: "/var/tmp/shop-monitors.paused"
+'''
+
+RETURN = r'''
+'''
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.pausestate import PauseState
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.progress import PROGRESS
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.selector import select_monitors
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  def patch(self, item):
+    """
+    Set the paused option of one monitor.
+
+    :param dict item: The monitor id and the paused state to set.
+    """
+
+    code, body = self.BURequest('monitors/' + str(item['id']), dict(paused=item['paused']), 'PATCH')
+
+    item['return_code'] = code
+
+    if code >= 400 or 'errors' in body:
+      item['errors'] = body.get('errors', body)
+
+    return item
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result={},
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+
+      state = PauseState(self.params['state_file'])
+
+      if self.params['state'] == 'paused':
+        if not self.params['monitor_ids'] and not self.params['monitor_group_id'] and not self.params['url_pattern']:
+          self.fail_json(msg='One of monitor_ids, monitor_group_id or url_pattern is required to pause monitors.', **result)
+
+        ret, resp = self.BUGet('monitors')
+
+        if not ret:
+          self.fail_json(msg=resp, **result)
+
+        monitors = select_monitors(resp, self.params['monitor_ids'], self.params['monitor_group_id'], self.params['url_pattern'])
+
+        items = [ dict(id=id, paused=True) for id in state.pause(monitors) ]
+
+        # The prior state is saved before anything is paused, so it's never lost.
+        if not self.check_mode:
+          state.save()
+      else:
+        items = [ dict(id=id, paused=False) for id in state.resumes() ]
+
+      PROGRESS.add(len(items))
+
+      if not self.check_mode:
+        run_concurrent(PROGRESS.track(self.patch), items, self.params['workers'])
+
+      failed = [ item for item in items if 'errors' in item ]
+
+      if self.params['state'] == 'resumed' and not self.check_mode:
+        state.resumed([ item['id'] for item in failed ])
+
+      result['changed'] = len(items) > len(failed)
+      result['result'] = dict(
+        state=self.params['state'],
+        saved=len(state.prior),
+        changed=len(items) - len(failed),
+        monitors=items
+      )
+
+      if failed:
+        result['msg'] = 'Task failed.'
+        run_failed = True
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec=dict(
+      api_token=dict(
+        type='str',
+        required=True,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      state=dict(
+        type='str',
+        required=False,
+        choices=['paused','resumed'],
+        default='paused'
+      ),
+      state_file=dict(
+        type='path',
+        required=True
+      ),
+      monitor_ids=dict(
+        type='list',
+        required=False
+      ),
+      monitor_group_id=dict(
+        type='list',
+        required=False
+      ),
+      url_pattern=dict(
+        type='str',
+        required=False
+      ),
+      workers=dict(
+        type='int',
+        required=False,
+        default=8,
+        fallback=(env_fallback, ['BU_WORKERS'])
+      ),
+      validate_certs=dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      https_proxy=dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    ),
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,331 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: monitors_sla
+
+short_description: "This module reports the availability of many monitors on Better Uptime in one table."
+
+version_added: "1.1.0"
+
+description:
+  - "This module pulls the SLA (availability, downtime and incidents) of a filtered set of monitors concurrently."
+  - "The SLAs are aggregated per group (count, sum, mean, min and max), vectorized with NumPy when it is available, into one compact table."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  from:
+    description: "The first day of the period (YYYY-MM-DD)."
+    required: False
+    type: str
+  to:
+    description: "The last day of the period (YYYY-MM-DD)."
+    required: False
+    type: str
+  monitor_ids:
+    description: "Only report these monitors."
+    required: False
+    type: list
+  monitor_group_id:
+    description: "Only report the monitors of these monitor groups."
+    required: False
+    type: list
+  url_pattern:
+    description: "Only report the monitors of which the url matches this regular expression."
+    required: False
+    type: str
+  tags:
+    description:
+      - "A dict of tags with the ids or urls of their monitors, to group by tag."
+      - "A monitor can have more than one tag; it is counted in all of them."
+    required: False
+    type: dict
+  group_by:
+    description:
+      - "The monitor attributes to group by, and/or tag."
+      - "A monitor with a list attribute (like regions) is counted in the group of every value."
+    required: False
+    type: list
+    default: monitor_group_id
+  dest:
+    description:
+      - "Path of the file to write the table to (atomically)."
+      - "The task reports changed when it writes dest; in check mode dest isn't written."
+    required: False
+    type: path
+  format:
+    description: "The format of the table in dest (choices: csv (default) and json)."
+    required: False
+    type: str
+    default: csv
+  workers:
+    description: "The maximum number of concurrent requests."
+    required: False
+    type: int
+    default: 8
+    env:
+      - name: BU_WORKERS
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Write the availability of last month per monitor group and region.
+- name: Write the availability of last month per monitor group and region.
+  betteruptime.betteruptime.monitors_sla:
+    api_token: <api_token>
+    from: "2021-09-01"
+    to: "2021-09-30"
+    group_by:
+      - monitor_group_id
+      - regions
+    dest: "/tmp/sla-2021-09.csv"
+  register: resp
+
+# Print the table.
+- name: Print the table.
+  debug:
+    var: resp.result
+'''
+
+RETURN = r'''
+'''
+
+import itertools
+import os
+import tempfile
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.aggregate import group_stats, write_table
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.progress import PROGRESS
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.selector import select_monitors
+
+try:
+  from urllib.parse import urlencode
+except ImportError:
+  from urllib import urlencode
+
+SLA_COLUMNS = [ 'availability', 'total_downtime', 'number_of_incidents' ]
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  def sla(self, monitor):
+    """
+    Pull the SLA of one monitor.
+
+    :param dict monitor: The monitor.
+    """
+
+    query = urlencode(dict((option, self.params[option]) for option in [ 'from', 'to' ] if self.params[option]))
+
+    code, body = self.BURequest('monitors/{}/sla'.format(monitor['id']) + ('?' + query if query else ''))
+
+    if code >= 400 or 'errors' in body:
+      return (monitor, None)
+
+    return (monitor, body['data']['attributes'])
+
+  def groups(self, monitor):
+    """
+    Return all the groups a monitor counts in.
+
+    :param dict monitor: The monitor.
+    """
+
+    values = []
+
+    for option in self.params['group_by']:
+      if option == 'tag':
+        value = [ tag for tag, members in self.tags.items() if str(monitor['id']) in members or monitor['attributes'].get('url') in members ]
+      else:
+        value = monitor['attributes'].get(option)
+
+      if not isinstance(value, list):
+        value = [ value ]
+
+      values.append(value or [ None ])
+
+    return list(itertools.product(*values))
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result=[],
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+      self.tags=dict((tag, [ str(member) for member in members ]) for tag, members in (self.params['tags'] or {}).items())
+
+      ret, resp = self.BUGet('monitors')
+
+      if not ret:
+        self.fail_json(msg=resp, **result)
+
+      monitors = select_monitors(resp, self.params['monitor_ids'], self.params['monitor_group_id'], self.params['url_pattern'])
+
+      groups = []
+      columns = dict((column, []) for column in SLA_COLUMNS)
+      failed = []
+
+      PROGRESS.add(len(monitors))
+
+      for monitor, sla in run_concurrent(PROGRESS.track(self.sla, lambda ret: ret[1] is None), monitors, self.params['workers']):
+        if sla is None:
+          failed.append(monitor['id'])
+          continue
+
+        for group in self.groups(monitor):
+          groups.append(group)
+
+          for column in SLA_COLUMNS:
+            columns[column].append(sla.get(column) or 0)
+
+      rows = [ dict(zip(self.params['group_by'], row.pop('group')), **row) for row in group_stats(groups, columns) ]
+
+      dest = self.params['dest']
+
+      # In check mode the table is only returned; dest is left as it is.
+      if dest and not self.check_mode:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dest)), prefix='.monitors_sla.')
+        os.close(fd)
+
+        try:
+          write_table(tmp, rows, self.params['format'])
+        except:
+          os.remove(tmp)
+          raise
+
+        self.atomic_move(tmp, dest)
+
+      if dest:
+        result['dest'] = dest
+        result['changed'] = True
+
+      result['result'] = rows
+      result['monitors'] = len(monitors)
+      result['failed'] = failed
+
+      if failed:
+        result['msg'] = 'The SLA of {} monitor(s) could not be pulled.'.format(len(failed))
+        run_failed = True
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec={
+      'api_token': dict(
+        type='str',
+        required=True,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      'from': dict(
+        type='str',
+        required=False
+      ),
+      'to': dict(
+        type='str',
+        required=False
+      ),
+      'monitor_ids': dict(
+        type='list',
+        required=False
+      ),
+      'monitor_group_id': dict(
+        type='list',
+        required=False
+      ),
+      'url_pattern': dict(
+        type='str',
+        required=False
+      ),
+      'tags': dict(
+        type='dict',
+        required=False
+      ),
+      'group_by': dict(
+        type='list',
+        required=False,
+        default=['monitor_group_id']
+      ),
+      'dest': dict(
+        type='path',
+        required=False
+      ),
+      'format': dict(
+        type='str',
+        required=False,
+        choices=['csv', 'json'],
+        default='csv'
+      ),
+      'workers': dict(
+        type='int',
+        required=False,
+        default=8,
+        fallback=(env_fallback, ['BU_WORKERS'])
+      ),
+      'validate_certs': dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      'https_proxy': dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    },
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
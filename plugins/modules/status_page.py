@@ -108,6 +108,15 @@ options:
     type: bool
     env:
       - name: BU_HIDE_FROM_SEARCH_ENGINES
+  state_store:
+    description:
+      - "Directory of a local store of the last applied desired state of every status page (matched on check_for)."
+      - "When the desired state is unchanged and a GET of the stored status page shows it is untouched (same updated_at), the module returns without listing all the status pages."
+      - "The records are kept per account (under a hash of the api_token), so accounts never share them."
+    required: False
+    type: path
+    env:
+      - name: BU_STATE_STORE
   validate_certs:
     description: "Require HTTPS-webrequest certificate validation."
     required: False
@@ -149,18 +158,15 @@ RETURN = r'''
 '''
 
 from ansible.module_utils.basic import AnsibleModule, env_fallback
-from ansible.module_utils.urls import open_url
 from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
-
-import json
-
-try:
-  from urllib.parse import urlencode
-except ImportError:
-  from urllib import urlencode
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_loads
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import PROFILER, profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.reconcile import fingerprint, identity
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.statestore import StateStore
 
 class CustomAnsibleModule(AnsibleModule, BURestApi):
 
+  @profile_run
   def run(self):
     """
     Execute the module logic.
@@ -183,9 +189,21 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
       data = {}
 
       for option in self.params:
-        if self.params[option] and option not in data and option not in [ 'api_token', 'validate_certs', 'check_for', 'state' ]:
+        if self.params[option] and option not in data and option not in [ 'api_token', 'validate_certs', 'check_for', 'state', 'state_store' ]:
           data[option] = self.params[option]
 
+      store = StateStore(self.params['state_store'], 'status-pages', self.api_token) if self.params['state_store'] and not self.params['id'] else None
+
+      if store:
+        key = identity(data, check_for)
+        desired = fingerprint([ self.params['state'], data ])
+
+        converged, entry = store.lookup(self, key, desired, data)
+
+        if converged:
+          result['result'] = entry['attributes'] if entry else {}
+          self.exit_json(**result)
+
       ret, resp = self.BUGet(
                     'status-pages',
                     self.params['id'] if self.params['id'] else None
@@ -201,18 +219,19 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
 
       update = {}
 
-      for entry in resp:
-        for option in check_for:
-          if data[option] == entry['attributes'][option]:
-            matches_found.update({ option: entry['attributes'][option] })
+      with PROFILER.phase('matching'):
+        for entry in resp:
+          for option in check_for:
+            if data[option] == entry['attributes'][option]:
+              matches_found.update({ option: entry['attributes'][option] })
 
-        if len(matches_found) == len(check_for):
-          id = entry['id']
-          result['result'] = entry['attributes']
-          for option in data.keys():
-            if data[option] != entry['attributes'][option]:
-              update[option] = data[option]
-          break
+          if len(matches_found) == len(check_for):
+            id = entry['id']
+            result['result'] = entry['attributes']
+            for option in data.keys():
+              if data[option] != entry['attributes'][option]:
+                update[option] = data[option]
+            break
 
       if 'id' in locals() and len(update) == 0 and not state:
 
@@ -247,7 +266,7 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
           'PATCH'
         )
 
-        result['result'] = json.loads(resp.read())
+        result['result'] = json_loads(resp.read())
 
         result['return_code'] = resp.code
 
@@ -266,7 +285,7 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
           'POST'
         )
 
-        result['result'] = json.loads(resp.read())
+        result['result'] = json_loads(resp.read())
 
         result['return_code'] = resp.code
 
@@ -278,6 +297,14 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
         run_failed = True
         result['changed'] = False
 
+      if store and not run_failed and not self.check_mode:
+        if not state and result['changed']:
+          store.put(key, dict(fingerprint=desired, id=id, absent=True))
+        elif state and 'data' in result['result']:
+          store.put(key, dict(fingerprint=desired, id=result['result']['data']['id'], updated_at=result['result']['data']['attributes'].get('updated_at')))
+        elif state and 'id' in locals():
+          store.put(key, dict(fingerprint=desired, id=id, updated_at=result['result'].get('updated_at')))
+
     except:
       raise
 
@@ -289,6 +316,7 @@ class CustomAnsibleModule(AnsibleModule, BURestApi):
     else:
       self.exit_json(**result)
 
+@profile_main
 def main():
 
   CustomAnsibleModule(
@@ -361,6 +389,11 @@ def main():
         required=False,
         fallback=(env_fallback, ['BU_HIDE_FROM_SEARCH_ENGINES'])
       ),
+      state_store=dict(
+        type='path',
+        required=False,
+        fallback=(env_fallback, ['BU_STATE_STORE'])
+      ),
       validate_certs=dict(
         type='bool',
         required=False,
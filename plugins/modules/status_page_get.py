@@ -13,7 +13,9 @@ short_description: "This module pulls all the available status pages from Better
 
 version_added: "1.0.0"
 
-description: "This module pulls all the available status pages from Better Uptime."
+description:
+  - "This module pulls all the available status pages from Better Uptime."
+  - "With deep, all the pages of the listing are pulled and the sections and resources of every status page are fetched concurrently; the resources are nested in their sections."
 
 options:
   api_token:
@@ -23,6 +25,25 @@ options:
     no_log: True
     env:
       - name: BU_API_TOKEN
+  deep:
+    description: "Pull all the status pages with their sections and resources."
+    required: False
+    type: bool
+    default: False
+  dest:
+    description:
+      - "Path of the JSON lines file to stream the status pages of a deep fetch to (one status page per line) instead of returning them."
+      - "The lines are written in the order the status pages are fetched."
+      - "Requires deep. The task reports changed when it writes dest; in check mode dest isn't written and the status pages are only counted."
+    required: False
+    type: path
+  workers:
+    description: "The maximum number of status pages fetched concurrently."
+    required: False
+    type: int
+    default: 8
+    env:
+      - name: BU_WORKERS
   validate_certs:
     description: "Require HTTPS-webrequest certificate validation."
     required: False
@@ -54,93 +75,158 @@ EXAMPLES = r'''
 - name: Print all the available status pages.
   debug:
     var: resp
+
+# Audit all the status pages with their sections and resources.
+- name: Audit all the status pages with their sections and resources.
+  betteruptime.betteruptime.status_page_get:
+    api_token: <api_token>
+    deep: True
+    dest: "/tmp/status-pages.jsonl"
 '''
 
 RETURN = r'''
 '''
 
-from ansible.module_utils.basic import AnsibleModule, env_fallback
-from ansible.module_utils.urls import open_url
-from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+import os
+import tempfile
+import threading
 
-import json
+from ansible.module_utils.basic import env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.jsoncodec import json_dumps
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.listing import ListingModule, argument_spec
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_main
 
-try:
-  from urllib.parse import urlencode
-except ImportError:
-  from urllib import urlencode
+class CustomAnsibleModule(ListingModule):
 
-class CustomAnsibleModule(AnsibleModule, BURestApi):
+  resource = 'status-pages'
 
-  def run(self):
+  def fetch(self, page):
     """
-    Execute the module logic.
+    Fetch the sections and resources of one status page and nest the resources in their sections.
+
+    :param dict page: The status page.
     """
 
-    result = dict(
-        changed=False,
-        result={},
-    )
+    base = 'status-pages/{}/'.format(page['id'])
 
-    run_failed = False
+    ret, sections = self.BUGet(base + 'sections')
 
-    try:
+    if not ret:
+      page['errors'] = sections
+      return page
 
-      self.api_token=self.params['api_token']
-      self.validate_certs=self.params['validate_certs'] or True
+    ret, resources = self.BUGet(base + 'resources')
 
-      resp = self.httpRequest(
-        'https://betteruptime.com/api/v2/status-pages',
-        {
-          'Authorization': 'Bearer {}'.format( self.api_token ),
-          'Content-Type': 'application/json'
-        }
-      )
+    if not ret:
+      page['errors'] = resources
+      return page
+
+    nested = dict((str(section['id']), dict(section, resources=[])) for section in sections or [])
+
+    page['sections'] = list(nested.values())
+    page['resources'] = []
+
+    for resource in resources or []:
+      section = nested.get(str(resource['attributes'].get('status_page_section_id')))
+      (section['resources'] if section else page['resources']).append(resource)
 
-      result['result'] = json.loads(resp.read())
+    with self.lock:
+      if self.stream:
+        self.stream.write(json_dumps(page) + b'\n')
 
-      result['return_code'] = resp.code
+    # The status pages of dest aren't kept (in check mode they are only counted).
+    if self.params['dest']:
+      page = dict(id=page['id'])
+
+    return page
+
+  def deep(self, result):
+    """
+    Pull all the status pages with their sections and resources.
+
+    :param dict result: The result of the module.
+    """
 
-      if result['return_code'] == 201:
-        result['changed'] = True
+    ret, pages = self.BUGet('status-pages')
 
-      if 'errors' in result['result']:
-        result['msg'] = 'Task failed.'
-        run_failed = True
-        result['changed'] = False
-      else:
-        result['result'] = result['result']['data']
+    if not ret:
+      self.fail_json(msg=pages, **result)
 
-    except:
-      raise
+    self.lock = threading.Lock()
+    self.stream = None
 
-    if self.check_mode:
-      self.exit_json(**result)
+    dest = self.params['dest']
+
+    # In check mode dest is left as it is.
+    if dest and not self.check_mode:
+      fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dest)), prefix='.status_page_get.')
+      self.stream = os.fdopen(fd, 'wb')
+
+    try:
+      pages = run_concurrent(self.fetch, pages or [], self.params['workers'])
+    finally:
+      if self.stream:
+        self.stream.close()
+
+    failed = [ page for page in pages if 'errors' in page ]
+
+    result['count'] = len(pages)
+
+    if failed:
+      result['result'] = failed
+      result['msg'] = 'Task failed.'
+
+      if self.stream:
+        os.remove(tmp)
 
-    if run_failed:
       self.fail_json(**result)
+
+    if dest:
+      if self.stream:
+        self.atomic_move(tmp, dest)
+
+      result['dest'] = dest
+      result['changed'] = True
     else:
-      self.exit_json(**result)
+      result['result'] = pages
+
+    self.exit_json(**result)
 
+  def pull(self, result):
+    """
+    Pull the status pages; with deep, all of them with their sections and resources.
+
+    :param dict result: The result of the module.
+    """
+
+    if self.params['dest'] and not self.params['deep']:
+      self.fail_json(msg='dest requires deep.', **result)
+
+    if self.params['deep']:
+      self.deep(result)
+
+    return ListingModule.pull(self, result)
+
+@profile_main
 def main():
 
   CustomAnsibleModule(
-    argument_spec=dict(
-      api_token=dict(
-        type='str',
-        required=True,
-        fallback=(env_fallback, ['BU_API_TOKEN'])
-      ),
-      validate_certs=dict(
+    argument_spec=argument_spec(
+      deep=dict(
         type='bool',
         required=False,
-        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+        default=False
+      ),
+      dest=dict(
+        type='path',
+        required=False
       ),
-      https_proxy=dict(
-        type='str',
+      workers=dict(
+        type='int',
         required=False,
-        default=None,
-        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+        default=8,
+        fallback=(env_fallback, ['BU_WORKERS'])
       )
     ),
     supports_check_mode=True
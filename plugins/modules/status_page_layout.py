@@ -0,0 +1,401 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: status_page_layout
+
+short_description: "This module reconciles the sections and resources of a status page on Better Uptime."
+
+version_added: "1.1.0"
+
+description:
+  - "This module reconciles the sections and the ordered resources of a status page on Better Uptime."
+  - "Only the sections and resources which are out of order are moved; the ones that are already in the right order relative to each other stay in place."
+  - "Moves are applied in sequence, because Better Uptime shifts the other items when a position is set. Deletes and content updates are applied concurrently."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  status_page_id:
+    description: "The ID of the status page you want to reconcile."
+    required: False
+    type: int
+    env:
+      - name: BU_STATUS_PAGE_ID
+  subdomain:
+    description: "The subdomain of the status page you want to reconcile (used when status_page_id is not set)."
+    required: False
+    type: str
+    env:
+      - name: BU_SUBDOMAIN
+  resolver_cache:
+    description: "Directory of the cache of the subdomain -> id index of the status pages (default: ~/.ansible/tmp/betteruptime-resolver; it must be private to the user)."
+    required: False
+    type: path
+    env:
+      - name: BU_RESOLVER_CACHE
+  resolver_ttl:
+    description: "How many seconds the cached subdomain -> id index is used (0 disables the cache)."
+    required: False
+    type: int
+    default: 300
+    env:
+      - name: BU_RESOLVER_TTL
+  sections:
+    description:
+      - "The desired sections in the desired order."
+      - "Every section is a dict with a name and an ordered list of resources."
+      - "A resource is a dict with a resource_id, a resource_type (default: Monitor) and optionally a public_name, explanation and widget_type."
+      - "The resources of a section that couldn't be created are skipped; they are listed under skipped in the operation of the section."
+    required: True
+    type: list
+    elements: dict
+  prune:
+    description: "Remove the sections and resources which are not in sections."
+    required: False
+    type: bool
+    default: False
+  workers:
+    description: "The maximum number of concurrent requests."
+    required: False
+    type: int
+    default: 8
+    env:
+      - name: BU_WORKERS
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - "Yorick Gruijthuijzen (@yorick1989)"
+'''
+
+EXAMPLES = r'''
+# Reconcile the sections and resources of a status page.
+- name: Reconcile the sections and resources of a status page.
+  betteruptime.betteruptime.status_page_layout:
+    api_token: <api_token>
+    subdomain: "status"
+    sections:
+      - name: "Websites"
+        resources:
+          - resource_id: 123
+            public_name: "Website"
+          - resource_id: 456
+            public_name: "Webshop"
+      - name: "API"
+        resources:
+          - resource_id: 789
+            public_name: "Public API"
+    prune: True
+  register: resp
+
+# Print the changes.
+- name: Print the changes.
+  debug:
+    var: resp
+'''
+
+RETURN = r'''
+'''
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.ordering import minimal_moves
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.resolver import ResolveError, Resolver, default_cache
+
+RESOURCE_KEYS = [ 'resource_id', 'resource_type', 'status_page_section_id', 'position' ]
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  def write(self, operation):
+    """
+    Execute one write operation and return the operation with its outcome.
+
+    :param dict operation: The operation (method, resource and data).
+    """
+
+    if self.check_mode:
+      return operation
+
+    code, body = self.BURequest(operation['resource'], operation.get('data'), operation['method'])
+
+    operation['return_code'] = code
+
+    if code >= 400 or 'errors' in body:
+      operation['errors'] = body.get('errors', body)
+    elif 'data' in body:
+      operation['id'] = body['data']['id']
+
+    return operation
+
+  def write_sequence(self, operations):
+    """
+    Execute a list of write operations in sequence.
+
+    :param list operations: The operations to execute in order.
+    """
+
+    return [ self.write(operation) for operation in operations ]
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result={},
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+      workers=self.params['workers']
+      prune=self.params['prune']
+
+      page_id = self.params['status_page_id']
+
+      if not page_id:
+        try:
+          page_id = Resolver(self, self.params['resolver_cache'] or default_cache(), self.params['resolver_ttl']).lookup('status_page_subdomain', self.params['subdomain'])
+        except ResolveError as e:
+          self.fail_json(msg=str(e), **result)
+
+      base = 'status-pages/{}/'.format(page_id)
+
+      ret, sections = self.BUGet(base + 'sections')
+
+      if not ret:
+        self.fail_json(msg=sections, **result)
+
+      ret, resources = self.BUGet(base + 'resources')
+
+      if not ret:
+        self.fail_json(msg=resources, **result)
+
+      sections = sorted(sections, key=lambda entry: entry['attributes']['position'])
+      resources = sorted(resources, key=lambda entry: entry['attributes']['position'])
+
+      desired_sections = [ section['name'] for section in self.params['sections'] ]
+
+      desired_resources = {}
+
+      for section in self.params['sections']:
+        for resource in section.get('resources') or []:
+          resource.setdefault('resource_type', 'Monitor')
+          desired_resources[(resource['resource_type'], str(resource['resource_id']))] = resource
+
+      section_ids = {}
+
+      for entry in sections:
+        section_ids.setdefault(entry['attributes']['name'], entry['id'])
+
+      current = {}
+
+      for entry in resources:
+        current[(entry['attributes']['resource_type'], str(entry['attributes']['resource_id']))] = entry
+
+      operations = []
+
+      # Deletes don't depend on each other; resources go first and the sections last, so no
+      # resource that moves to another section is removed together with its old section.
+      section_deletes = []
+      resource_deletes = []
+
+      if prune:
+        for entry in sections:
+          if entry['attributes']['name'] not in desired_sections or section_ids[entry['attributes']['name']] != entry['id']:
+            section_deletes.append(dict(method='DELETE', resource=base + 'sections/' + str(entry['id'])))
+
+        for key, entry in list(current.items()):
+          if key not in desired_resources:
+            resource_deletes.append(dict(method='DELETE', resource=base + 'resources/' + str(entry['id'])))
+            resources.remove(entry)
+            del current[key]
+
+      operations += run_concurrent(self.write, resource_deletes, workers)
+
+      # Sections.
+      sections_posted = {}
+
+      for name, position in minimal_moves([ entry['attributes']['name'] for entry in sections ], desired_sections):
+        if name in section_ids:
+          operation = self.write(dict(method='PATCH', resource=base + 'sections/' + str(section_ids[name]), data=dict(position=position)))
+        else:
+          operation = self.write(dict(method='POST', resource=base + 'sections', data=dict(name=name, position=position)))
+
+          # A section that doesn't exist yet in check mode gets a placeholder; one that couldn't be
+          # created gets no id, so its resources are skipped.
+          section_ids[name] = 'new:' + name if self.check_mode else operation.get('id')
+          sections_posted[name] = operation
+
+        operations.append(operation)
+
+      # Resources, per section in the desired order.
+      live = {}
+
+      for entry in resources:
+        live.setdefault(str(entry['attributes']['status_page_section_id']), []).append((entry['attributes']['resource_type'], str(entry['attributes']['resource_id'])))
+
+      sequences = []
+      updates = []
+      crossing = False
+
+      for section in self.params['sections']:
+        section_id = section_ids[section['name']]
+        desired = [ (resource['resource_type'], str(resource['resource_id'])) for resource in section.get('resources') or [] ]
+
+        if section_id is None:
+          sections_posted[section['name']]['skipped'] = [ '{}/{}'.format(*key) for key in desired ]
+          continue
+        moves = dict(minimal_moves(live.get(str(section_id), []), desired))
+        sequence = []
+
+        # The moves of a section are applied in the order of the desired resources.
+        for key in desired:
+          resource = desired_resources[key]
+          data = dict((option, value) for option, value in resource.items() if option not in RESOURCE_KEYS)
+
+          if key in current:
+            attributes = current[key]['attributes']
+            data = dict((option, value) for option, value in data.items() if attributes.get(option) != value)
+            source_id = str(attributes['status_page_section_id'])
+
+            if key in moves:
+              data.update(status_page_section_id=section_id, position=moves[key])
+              sequence.append(dict(method='PATCH', resource=base + 'resources/' + str(current[key]['id']), data=data))
+
+              if source_id != str(section_id):
+                crossing = True
+                live[source_id].remove(key)
+            elif data:
+              updates.append(dict(method='PATCH', resource=base + 'resources/' + str(current[key]['id']), data=data))
+          else:
+            data.update(resource_id=resource['resource_id'], resource_type=resource['resource_type'], status_page_section_id=section_id, position=moves[key])
+            sequence.append(dict(method='POST', resource=base + 'resources', data=data))
+
+        if sequence:
+          sequences.append(sequence)
+
+      # Sections are independent of each other unless a resource moves between them.
+      for sequence in run_concurrent(self.write_sequence, sequences, 1 if crossing else workers):
+        operations += sequence
+
+      operations += run_concurrent(self.write, updates + section_deletes, workers)
+
+      result['result'] = dict(
+        status_page_id=page_id,
+        operations=operations,
+        requests=len(operations)
+      )
+
+      result['changed'] = len(operations) > 0
+
+      if any('errors' in operation for operation in operations):
+        result['msg'] = 'Task failed.'
+        run_failed = True
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec=dict(
+      api_token=dict(
+        type='str',
+        required=True,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      status_page_id=dict(
+        type='int',
+        required=False,
+        fallback=(env_fallback, ['BU_STATUS_PAGE_ID'])
+      ),
+      subdomain=dict(
+        type='str',
+        required=False,
+        fallback=(env_fallback, ['BU_SUBDOMAIN'])
+      ),
+      resolver_cache=dict(
+        type='path',
+        required=False,
+        fallback=(env_fallback, ['BU_RESOLVER_CACHE'])
+      ),
+      resolver_ttl=dict(
+        type='int',
+        required=False,
+        default=300,
+        fallback=(env_fallback, ['BU_RESOLVER_TTL'])
+      ),
+      sections=dict(
+        type='list',
+        elements='dict',
+        required=True
+      ),
+      prune=dict(
+        type='bool',
+        required=False,
+        default=False
+      ),
+      workers=dict(
+        type='int',
+        required=False,
+        default=8,
+        fallback=(env_fallback, ['BU_WORKERS'])
+      ),
+      validate_certs=dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      https_proxy=dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    ),
+    required_one_of=[
+      ('status_page_id', 'subdomain'),
+    ],
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
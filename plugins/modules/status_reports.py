@@ -0,0 +1,420 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: status_reports
+
+short_description: "This module publishes the same status report on many status pages on Better Uptime."
+
+version_added: "1.1.0"
+
+description:
+  - "This module publishes the same status report (or an update of it) on many status pages concurrently, e.g. during the outage of a provider."
+  - "The status pages are selected by id, subdomain and/or company name from one listing of the status pages."
+  - "The result has the report_ids of the status pages, which can be passed to a next run to post status updates on the same reports."
+  - "The report is published on all the status pages that are found; the module fails afterwards when a selected status page doesn't exist."
+  - "A status page without a report_id which has an open (not resolved) status report with the same title and report_type gets a status update on that report instead of a second report."
+  - "Nothing is posted on a status page when the last status update of its report already has the message (and the affected_status of all its resources), so a run can be repeated."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  ids:
+    description: "Publish on the status pages with these ids."
+    required: False
+    type: list
+  subdomains:
+    description: "Publish on the status pages with these subdomains."
+    required: False
+    type: list
+  company_names:
+    description: "Publish on the status pages of these companies."
+    required: False
+    type: list
+  title:
+    description: "The title of the status report."
+    required: False
+    type: str
+  message:
+    description: "The message of the status report, or of the status update when the status page has a report_id."
+    required: True
+    type: str
+  report_type:
+    description: "The type of the status report (choices: manual (default) and maintenance)."
+    required: False
+    type: str
+    default: manual
+  affected_status:
+    description:
+      - "Set all the resources of every status page to this status (choices: resolved, degraded, downtime and maintenance)."
+      - "The resources of the status pages are fetched concurrently."
+      - "Without it a status update keeps the statuses of the resources of the last status update of the report."
+    required: False
+    type: str
+  published_at:
+    description: "When the status report (or update) is published (ISO 8601); now when omitted."
+    required: False
+    type: str
+  starts_at:
+    description: "The start of a maintenance (ISO 8601)."
+    required: False
+    type: str
+  ends_at:
+    description: "The end of a maintenance (ISO 8601)."
+    required: False
+    type: str
+  report_ids:
+    description:
+      - "The report id by status page id, as returned by an earlier run."
+      - "A status update is posted on the report of every status page that has one; a new report is created on the others."
+    required: False
+    type: dict
+  workers:
+    description: "The maximum number of concurrent requests."
+    required: False
+    type: int
+    default: 8
+    env:
+      - name: BU_WORKERS
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Report the outage on the status pages of the shops.
+- name: Report the outage on the status pages of the shops.
+  betteruptime.betteruptime.status_reports:
+    api_token: <api_token>
+    subdomains: "{{ shop_subdomains }}"
+    title: "Payment provider outage"
+    message: "Payments are failing because of an outage of our payment provider."
+    affected_status: degraded
+  register: outage
+
+# Post the resolution on the same reports.
+- name: Post the resolution on the same reports.
+  betteruptime.betteruptime.status_reports:
+    api_token: <api_token>
+    subdomains: "{{ shop_subdomains }}"
+    message: "Payments are processed again."
+    affected_status: resolved
+    report_ids: "{{ outage.report_ids }}"
+'''
+
+RETURN = r'''
+'''
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_concurrent
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.progress import PROGRESS
+
+def statuses(resources):
+  """
+  Return the statuses of affected resources by resource id.
+
+  :param list resources: The affected resources (dicts with a status_page_resource_id and status).
+  """
+
+  return dict((str(resource['status_page_resource_id']), resource['status']) for resource in resources or [])
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  def select(self, pages):
+    """
+    Return the status pages which match the selectors, and the selectors which match no status page.
+
+    :param list pages: The listing of the status pages.
+    """
+
+    selectors = [
+      ('ids', lambda page: str(page['id'])),
+      ('subdomains', lambda page: page['attributes'].get('subdomain')),
+      ('company_names', lambda page: page['attributes'].get('company_name')),
+    ]
+
+    selected = {}
+    missing = []
+
+    for option, value in selectors:
+      wanted = [ str(item) for item in self.params[option] or [] ]
+      found = set()
+
+      for page in pages:
+        if value(page) in wanted:
+          selected[str(page['id'])] = page
+          found.add(value(page))
+
+      missing.extend('{} {}'.format(option[:-1], item) for item in wanted if item not in found)
+
+    return sorted(selected.values(), key=lambda page: str(page['id'])), missing
+
+  def open_report(self, base):
+    """
+    Return the id of the open (not resolved) status report of a status page with the title and report_type
+    of the task, or None.
+
+    :param str base: The path of the status reports of the status page.
+    """
+
+    ret, reports = self.BUGet(base)
+
+    if not ret:
+      return (False, reports)
+
+    for report in reports or []:
+      attributes = report['attributes']
+
+      if attributes.get('title') == self.params['title'] and attributes.get('report_type') == self.params['report_type'] and attributes.get('aggregate_state') != 'resolved':
+        return (True, str(report['id']))
+
+    return (True, None)
+
+  def last_update(self, base, report_id):
+    """
+    Return the attributes of the last status update of a status report, or None when it has none.
+
+    :param str base: The path of the status reports of the status page.
+    :param str report_id: The id of the status report.
+    """
+
+    ret, updates = self.BUGet('{}/{}/status-updates'.format(base, report_id))
+
+    if not ret:
+      return (False, updates)
+
+    updates = sorted(updates or [], key=lambda update: update['attributes'].get('published_at') or '')
+
+    return (True, updates[-1]['attributes'] if updates else None)
+
+  def publish(self, page):
+    """
+    Create the status report on one status page, or post a status update on its report; nothing when the
+    last status update of the report is the same.
+
+    :param dict page: The status page.
+    """
+
+    item = dict(id=str(page['id']), subdomain=page['attributes'].get('subdomain'), report_id=self.report_ids.get(str(page['id'])))
+    base = 'status-pages/{}/status-reports'.format(page['id'])
+
+    if not item['report_id']:
+      ret, item['report_id'] = self.open_report(base)
+
+      if not ret:
+        item['errors'] = item.pop('report_id')
+        return item
+
+    last = None
+
+    if item['report_id']:
+      ret, last = self.last_update(base, item['report_id'])
+
+      if not ret:
+        item['errors'] = last
+        return item
+
+    data = dict(message=self.params['message'])
+
+    for option in [ 'published_at' ] if item['report_id'] else [ 'title', 'report_type', 'published_at', 'starts_at', 'ends_at' ]:
+      if self.params[option] is not None:
+        data[option] = self.params[option]
+
+    if self.params['affected_status']:
+      ret, resources = self.BUGet('status-pages/{}/resources'.format(page['id']))
+
+      if not ret:
+        item['errors'] = resources
+        return item
+
+      data['affected_resources'] = [ dict(status_page_resource_id=resource['id'], status=self.params['affected_status']) for resource in resources or [] ]
+    elif last:
+      data['affected_resources'] = [ dict(status_page_resource_id=resource['status_page_resource_id'], status=resource['status']) for resource in last.get('affected_resources') or [] ]
+
+    if last and last.get('message') == data['message'] and statuses(last.get('affected_resources')) == statuses(data.get('affected_resources')):
+      item['action'] = 'unchanged'
+      return item
+
+    item['action'] = 'updated' if item['report_id'] else 'created'
+
+    if self.check_mode:
+      return item
+
+    if item['report_id']:
+      code, body = self.BURequest('{}/{}/status-updates'.format(base, item['report_id']), data, 'POST')
+    else:
+      code, body = self.BURequest(base, data, 'POST')
+
+    item['return_code'] = code
+
+    if code >= 400 or 'errors' in body:
+      item['errors'] = body.get('errors', body)
+    elif item['report_id']:
+      item['status_update_id'] = body['data']['id']
+    else:
+      item['report_id'] = body['data']['id']
+
+    return item
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result=[],
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+      self.report_ids=dict((str(page_id), str(report_id)) for page_id, report_id in (self.params['report_ids'] or {}).items())
+
+      ret, resp = self.BUGet('status-pages')
+
+      if not ret:
+        self.fail_json(msg=resp, **result)
+
+      pages, missing = self.select(resp or [])
+
+      if not self.params['title'] and any(str(page['id']) not in self.report_ids for page in pages):
+        self.fail_json(msg='A title is required to create a status report.', **result)
+
+      PROGRESS.add(len(pages))
+
+      items = run_concurrent(PROGRESS.track(self.publish), pages, self.params['workers'])
+
+      failed = [ item for item in items if 'errors' in item ]
+
+      result['result'] = items
+      result['report_ids'] = dict((item['id'], item['report_id']) for item in items if item.get('report_id'))
+      result['changed'] = any(item.get('action') in [ 'created', 'updated' ] and 'errors' not in item for item in items)
+
+      if missing:
+        result['missing'] = missing
+
+      if failed or missing:
+        result['msg'] = 'Task failed.' if failed else 'No status page found for {}.'.format(', '.join(missing))
+        run_failed = True
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec=dict(
+      api_token=dict(
+        type='str',
+        required=True,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      ids=dict(
+        type='list',
+        required=False
+      ),
+      subdomains=dict(
+        type='list',
+        required=False
+      ),
+      company_names=dict(
+        type='list',
+        required=False
+      ),
+      title=dict(
+        type='str',
+        required=False
+      ),
+      message=dict(
+        type='str',
+        required=True
+      ),
+      report_type=dict(
+        type='str',
+        required=False,
+        choices=['manual','maintenance'],
+        default='manual'
+      ),
+      affected_status=dict(
+        type='str',
+        required=False,
+        choices=['resolved','degraded','downtime','maintenance']
+      ),
+      published_at=dict(
+        type='str',
+        required=False
+      ),
+      starts_at=dict(
+        type='str',
+        required=False
+      ),
+      ends_at=dict(
+        type='str',
+        required=False
+      ),
+      report_ids=dict(
+        type='dict',
+        required=False
+      ),
+      workers=dict(
+        type='int',
+        required=False,
+        default=8,
+        fallback=(env_fallback, ['BU_WORKERS'])
+      ),
+      validate_certs=dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      https_proxy=dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    ),
+    required_one_of=[['ids', 'subdomains', 'company_names']],
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,312 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: wait_for_monitors
+
+short_description: "This module waits until many monitors on Better Uptime report a status."
+
+version_added: "1.1.0"
+
+description:
+  - "This module waits until many monitors on Better Uptime report a status (up by default)."
+  - "All the monitors are polled together with one listing per poll; a filtered listing (or a GET by id) when only one monitor is left."
+  - "The poll interval starts at interval and grows up to max_interval while none of the monitors changes; it is reset as soon as one does."
+  - "The module returns as soon as all the monitors report the status and fails after the timeout with the monitors which don't."
+
+options:
+  api_token:
+    description: "API Bearer token."
+    required: True
+    type: str
+    no_log: True
+    env:
+      - name: BU_API_TOKEN
+  monitor_ids:
+    description: "The ids of the monitors to wait for."
+    required: False
+    type: list
+  monitors:
+    description: "The monitors to wait for, as a list of dicts with (at least) the check_for options of every monitor."
+    required: False
+    type: list
+  check_for:
+    description:
+      - "Provide a str or list of options to identify the monitors with."
+      - "default: url"
+    required: False
+    type: list
+    default: url
+    env:
+      - name: RF_CHECK_FOR
+  status:
+    description: "The status to wait for."
+    required: False
+    type: str
+    default: up
+  timeout:
+    description: "The maximum number of seconds to wait for all the monitors."
+    required: False
+    type: int
+    default: 300
+  interval:
+    description: "The initial number of seconds between polls."
+    required: False
+    type: float
+    default: 5
+  max_interval:
+    description: "The maximum number of seconds between polls."
+    required: False
+    type: float
+    default: 30
+  validate_certs:
+    description: "Require HTTPS-webrequest certificate validation."
+    required: False
+    type: bool
+    default: False
+    env:
+      - name: RF_VALIDATE_CERTS
+  https_proxy:
+    description: "Use a proxy for https requests during this module (will set the https_proxy ENV var)."
+    required: False
+    type: str
+    default: None
+    env:
+      - name: https_proxy
+      - name: HTTPS_PROXY
+
+author:
+  - Yorick Gruijthuijzen (@yorick1989)
+'''
+
+EXAMPLES = r'''
+# Wait until the new monitors are up.
+- name: Wait until the new monitors are up.
+  betteruptime.betteruptime.wait_for_monitors:
+    api_token: <api_token>
+    monitors:
+      - url: "https://www.example.com"
+      - url: "https://shop.example.com"
+    timeout: 600
+
+# Wait until two monitors are up, by id.
+- name: Wait until two monitors are up, by id.
+  betteruptime.betteruptime.wait_for_monitors:
+    api_token: <api_token>
+    monitor_ids:
+      - 1234
+      - 5678
+'''
+
+RETURN = r'''
+'''
+
+import time
+
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.burestapi import BURestApi
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.profiling import profile_main, profile_run
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.reconcile import identity, index_entries
+
+try:
+  from urllib.parse import urlencode
+except ImportError:
+  from urllib import urlencode
+
+# The monitor attributes the listing can be filtered on.
+LISTING_FILTERS = [ 'url', 'pronounceable_name' ]
+
+class CustomAnsibleModule(AnsibleModule, BURestApi):
+
+  def poll(self, pending):
+    """
+    Pull the current state of the pending monitors; returns the entries by key (None when missing).
+
+    :param list pending: The pending monitors.
+    """
+
+    if len(pending) == 1 and pending[0].get('id'):
+      code, body = self.BURequest('monitors/' + pending[0]['id'])
+
+      # A monitor that doesn't exist (anymore) is reported as missing, it's not a failed poll.
+      ret = code == 404 or (code == 200 and 'data' in body)
+      entries = [ body['data'] ] if code == 200 and ret else []
+    elif len(pending) == 1 and all(option in LISTING_FILTERS for option in self.check_for):
+      ret, resp = self.BUGet('monitors?' + urlencode(dict((option, pending[0]['data'][option]) for option in self.check_for)))
+      entries = resp if ret else []
+    else:
+      ret, resp = self.BUGet('monitors')
+      entries = resp if ret else []
+
+    if not ret:
+      return None
+
+    ids = dict((str(entry['id']), entry) for entry in entries)
+    index = index_entries(entries, self.check_for)
+
+    return dict((monitor['key'], ids.get(str(monitor['id'])) if monitor.get('id') else index.get(monitor['key'])) for monitor in pending)
+
+  @profile_run
+  def run(self):
+    """
+    Execute the module logic.
+    """
+
+    result = dict(
+        changed=False,
+        result=[],
+    )
+
+    run_failed = False
+
+    try:
+
+      self.api_token=self.params['api_token']
+      self.validate_certs=self.params['validate_certs'] or True
+      self.check_for=self.params['check_for']
+
+      monitors = [ dict(key=str(id), id=str(id)) for id in self.params['monitor_ids'] or [] ]
+
+      for data in self.params['monitors'] or []:
+        missing = [ option for option in self.check_for if option not in data ]
+
+        if missing:
+          self.fail_json(msg='Monitor {} is missing the check_for option(s) {}.'.format(data, ', '.join(missing)), **result)
+
+        monitors.append(dict(key=identity(data, self.check_for), data=data))
+
+      if not monitors:
+        self.fail_json(msg='One of monitor_ids or monitors is required.', **result)
+
+      start = time.time()
+      deadline = start + self.params['timeout']
+      interval = self.params['interval']
+      pending = list(monitors)
+      polls = 0
+      errors = 0
+
+      while True:
+        entries = self.poll(pending)
+        polls += 1
+
+        if entries is None:
+          errors += 1
+          entries = {}
+
+        progress = False
+
+        for monitor in pending:
+          if monitor['key'] not in entries:
+            continue
+
+          entry = entries[monitor['key']]
+          status = entry['attributes'].get('status') if entry else 'missing'
+
+          if entry:
+            monitor['id'] = str(entry['id'])
+
+          if status != monitor.get('status'):
+            monitor['status'] = status
+            progress = True
+
+          if monitor['status'] == self.params['status']:
+            monitor['after'] = round(time.time() - start, 1)
+
+        pending = [ monitor for monitor in pending if monitor.get('status') != self.params['status'] ]
+
+        if not pending or time.time() >= deadline:
+          break
+
+        # Poll again soon while the monitors change, back off while they don't.
+        interval = self.params['interval'] if progress else min(interval * 1.5, self.params['max_interval'])
+
+        time.sleep(max(0, min(interval, deadline - time.time())))
+
+      result['result'] = [ dict((option, monitor.get(option)) for option in [ 'key', 'id', 'status', 'after' ] if monitor.get(option) is not None) for monitor in monitors ]
+      result['polls'] = polls
+      result['elapsed'] = round(time.time() - start, 1)
+
+      if errors:
+        result['poll_errors'] = errors
+
+      if pending:
+        result['pending'] = [ monitor['key'] for monitor in pending ]
+        result['msg'] = 'Timed out after {}s waiting for {} of {} monitors to be {}: {}.'.format(self.params['timeout'], len(pending), len(monitors), self.params['status'], ', '.join('{} ({})'.format(monitor['key'], monitor.get('status') or 'unknown') for monitor in pending))
+        run_failed = True
+
+    except:
+      raise
+
+    if run_failed:
+      self.fail_json(**result)
+    else:
+      self.exit_json(**result)
+
+@profile_main
+def main():
+
+  CustomAnsibleModule(
+    argument_spec=dict(
+      api_token=dict(
+        type='str',
+        required=True,
+        fallback=(env_fallback, ['BU_API_TOKEN'])
+      ),
+      monitor_ids=dict(
+        type='list',
+        required=False
+      ),
+      monitors=dict(
+        type='list',
+        elements='dict',
+        required=False
+      ),
+      check_for=dict(
+        type='list',
+        required=False,
+        default='url',
+        fallback=(env_fallback, ['BU_CHECK_FOR'])
+      ),
+      status=dict(
+        type='str',
+        required=False,
+        default='up'
+      ),
+      timeout=dict(
+        type='int',
+        required=False,
+        default=300
+      ),
+      interval=dict(
+        type='float',
+        required=False,
+        default=5
+      ),
+      max_interval=dict(
+        type='float',
+        required=False,
+        default=30
+      ),
+      validate_certs=dict(
+        type='bool',
+        required=False,
+        default=False, fallback=(env_fallback, ['BU_VALIDATE_CERTS'])
+      ),
+      https_proxy=dict(
+        type='str',
+        required=False,
+        default=None,
+        fallback=(env_fallback, ['https_proxy','HTTPS_PROXY'])
+      )
+    ),
+    required_one_of=[['monitor_ids', 'monitors']],
+    supports_check_mode=True
+  ).run()
+
+if __name__ == '__main__':
+  main()
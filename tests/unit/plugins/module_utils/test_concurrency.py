@@ -0,0 +1,97 @@
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import threading
+import time
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import CONTROLLERS, AIMDController, report, run_concurrent
+
+def test_starts_at_half_of_the_workers():
+  assert AIMDController(8).limit == 4
+  assert AIMDController(1).limit == 1
+
+def test_halves_on_throttling():
+  controller = AIMDController(16)
+
+  controller.observe(429, 0.1)
+  assert controller.limit == 4
+
+  controller.observe(429, 0.1)
+  assert controller.limit == 2
+
+  controller.observe(503, 0.1)
+  assert controller.limit == 1
+
+  # It never drops below one.
+  controller.observe(429, 0.1)
+  assert controller.limit == 1
+  assert controller.counts['throttled'] == 3
+  assert controller.counts['errors'] == 1
+
+def test_one_burst_halves_once():
+  controller = AIMDController(16)
+  controller.inflight = 8
+
+  # The responses to the calls which were in flight at the first 429 are part of the same burst.
+  for i in range(8):
+    controller.observe(429, 0.1)
+
+  assert controller.limit == 4
+  assert controller.counts['decreases'] == 1
+
+  controller.observe(429, 0.1)
+  assert controller.limit == 2
+
+def test_grows_up_to_the_workers():
+  controller = AIMDController(6)
+
+  for i in range(1000):
+    controller.observe(200, 0.1)
+
+  assert controller.limit == 6
+  assert controller.peak == 6
+  assert controller.counts['increases'] == 3
+
+def test_latency_shift_becomes_the_baseline():
+  controller = AIMDController(8)
+
+  for i in range(20):
+    controller.observe(200, 0.1)
+
+  for i in range(2000):
+    controller.observe(200, 0.5)
+
+  # Only the first responses at the new latency are spikes; the limit grows back to the workers.
+  assert controller.counts['spikes'] < 5
+  assert abs(controller.latency - 0.5) < 0.01
+  assert controller.limit == 8
+
+def test_run_concurrent_backs_off_on_throttling():
+  lock = threading.Lock()
+  state = dict(inflight=0, peak=0)
+
+  def call(item):
+    with lock:
+      state['inflight'] += 1
+      state['peak'] = max(state['peak'], state['inflight'])
+
+    time.sleep(0.002)
+
+    with lock:
+      throttled = state['inflight'] > 3
+      state['inflight'] -= 1
+
+    report(429 if throttled else 200, 0.002)
+
+    return item * 2
+
+  assert run_concurrent(call, range(200), 8) == [ item * 2 for item in range(200) ]
+
+  controller = CONTROLLERS[-1]
+
+  # More than 3 calls in flight get a 429, so the limit is halved from 4 and settles around 3.
+  assert controller.counts['throttled'] > 0
+  assert controller.counts['decreases'] > 0
+  assert min(limit for at, limit, reason in controller.adjustments) < 4
@@ -0,0 +1,64 @@
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import threading
+
+import pytest
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.concurrency import run_graph
+
+def graph():
+  # group -> monitor -> resource <- page -> section -> resource, and an independent group.
+  parents = dict(
+    group=[],
+    monitor=[ 'group' ],
+    page=[],
+    section=[ 'page' ],
+    resource=[ 'monitor', 'page', 'section' ],
+    other=[],
+  )
+
+  return dict((key, dict(name=key, parents=keys)) for key, keys in parents.items())
+
+@pytest.mark.parametrize('workers', [ 1, 4 ])
+def test_parents_run_first(workers):
+  lock = threading.Lock()
+  order = []
+
+  def func(node):
+    with lock:
+      order.append(node['name'])
+
+  nodes = run_graph(func, graph(), workers)
+
+  assert sorted(order) == sorted(nodes)
+
+  for key, node in nodes.items():
+    assert all(order.index(parent) < order.index(key) for parent in node['parents'])
+    assert 'errors' not in node
+
+@pytest.mark.parametrize('workers', [ 1, 4 ])
+def test_failed_parent_skips_the_descendants(workers):
+  lock = threading.Lock()
+  called = []
+
+  def func(node):
+    with lock:
+      called.append(node['name'])
+
+    if node['name'] == 'page':
+      node['errors'] = 'boom'
+
+  nodes = run_graph(func, graph(), workers)
+
+  assert sorted(called) == [ 'group', 'monitor', 'other', 'page' ]
+  assert nodes['page']['errors'] == 'boom'
+
+  for key in [ 'section', 'resource' ]:
+    assert nodes[key]['action'] == 'skipped'
+    assert nodes[key]['errors'].startswith('The parent ')
+
+  for key in [ 'group', 'monitor', 'other' ]:
+    assert 'errors' not in nodes[key]
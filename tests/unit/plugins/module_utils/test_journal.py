@@ -0,0 +1,92 @@
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.journal import Journal
+
+def test_intent_without_done_is_uncertain(tmp_path):
+  path = str(tmp_path / 'journal')
+
+  journal = Journal(path)
+  journal.record('https://a', 'f1', 'intent', 'POST')
+  journal.record('https://b', 'f1', 'intent', 'PATCH', '2')
+  journal.record('https://b', 'f1', 'done', 'PATCH', '2')
+  journal.record('https://c', 'f1', 'intent', 'PATCH', '3')
+  # The run dies here: the journal is left behind.
+  journal.handle.close()
+
+  journal = Journal(path)
+
+  assert journal.state('https://a', 'f1') == dict(key='https://a', fingerprint='f1', state='intent', method='POST', id=None)
+  assert journal.state('https://b', 'f1')['state'] == 'done'
+  assert journal.state('https://c', 'f1') == dict(key='https://c', fingerprint='f1', state='intent', method='PATCH', id='3')
+  assert journal.state('https://d', 'f1') is None
+
+  journal.close()
+
+def test_changed_or_failed_items_start_over(tmp_path):
+  path = str(tmp_path / 'journal')
+
+  journal = Journal(path)
+  journal.record('https://a', 'f1', 'intent', 'POST')
+  journal.record('https://b', 'f1', 'intent', 'PATCH', '2')
+  journal.record('https://b', 'f1', 'failed', 'PATCH', '2')
+  journal.close()
+
+  journal = Journal(path)
+
+  # Another desired state of the item, or a write that failed for sure, is processed from scratch.
+  assert journal.state('https://a', 'f2') is None
+  assert journal.state('https://b', 'f1') is None
+
+  journal.close()
+
+def test_cut_off_record_is_ignored(tmp_path):
+  path = str(tmp_path / 'journal')
+
+  journal = Journal(path)
+  journal.record('https://a', 'f1', 'intent', 'POST')
+  journal.close()
+
+  with open(path, 'ab') as handle:
+    handle.write(b'{"key": "https://b", "fingerprint": "f1", "sta')
+
+  journal = Journal(path)
+
+  assert journal.state('https://a', 'f1')['state'] == 'intent'
+  assert journal.state('https://b', 'f1') is None
+  assert oct(os.stat(path).st_mode & 0o777) == oct(0o600)
+
+  # The records after the cut off one are replayed as well.
+  journal.record('https://b', 'f1', 'intent', 'POST')
+  journal.record('https://a', 'f1', 'done', 'POST', '1')
+  journal.close()
+
+  journal = Journal(path)
+
+  assert journal.state('https://a', 'f1')['state'] == 'done'
+  assert journal.state('https://b', 'f1')['state'] == 'intent'
+
+  journal.close(remove=True)
+
+  assert not os.path.exists(path)
+
+def test_record_without_line_end_is_kept(tmp_path):
+  path = str(tmp_path / 'journal')
+
+  with open(path, 'wb') as handle:
+    handle.write(b'{"key": "https://a", "fingerprint": "f1", "state": "intent", "method": "POST", "id": null}')
+
+  journal = Journal(path)
+  journal.record('https://b', 'f1', 'intent', 'POST')
+  journal.close()
+
+  journal = Journal(path)
+
+  assert journal.state('https://a', 'f1')['state'] == 'intent'
+  assert journal.state('https://b', 'f1')['state'] == 'intent'
+
+  journal.close()
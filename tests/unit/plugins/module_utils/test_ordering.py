@@ -0,0 +1,75 @@
+# Copyright: (c) 2021, Yorick Gruijthuijzen <yorick@gruijthuijzen.nl>
+# GNU General Public License v3.0+ (see https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import itertools
+import random
+
+import pytest
+
+from ansible_collections.betteruptime.betteruptime.plugins.module_utils.ordering import apply_moves, longest_increasing, minimal_moves
+
+def fewest_moves(current, desired):
+  """
+  Return the fewest moves (an item moved or inserted anywhere) that put the desired keys of current in
+  the desired order, by a breadth-first search over all the orders.
+  """
+
+  goal = tuple(desired)
+  seen = set([ tuple(current) ])
+  level = [ tuple(current) ]
+  moves = 0
+
+  while level:
+    if any(tuple(key for key in items if key in desired) == goal for items in level):
+      return moves
+
+    following = []
+
+    for items in level:
+      for key in desired:
+        rest = [ item for item in items if item != key ]
+
+        for target in range(len(rest) + 1):
+          moved = tuple(rest[:target] + [ key ] + rest[target:])
+
+          if moved not in seen:
+            seen.add(moved)
+            following.append(moved)
+
+    level = following
+    moves += 1
+
+def test_longest_increasing():
+  assert [ [ 3, 1, 2, None, 4 ][i] for i in longest_increasing([ 3, 1, 2, None, 4 ]) ] == [ 1, 2, 4 ]
+  assert longest_increasing([]) == []
+  assert longest_increasing([ None, None ]) == []
+
+@pytest.mark.parametrize('current, desired', [
+  ([], []),
+  ([ 'a', 'b', 'c' ], [ 'a', 'b', 'c' ]),
+  ([ 'c', 'b', 'a' ], [ 'a', 'b', 'c' ]),
+  ([ 'b', 'c', 'd', 'a' ], [ 'a', 'b', 'c', 'd' ]),
+  ([ 'a', 'x', 'b' ], [ 'b', 'a' ]),
+  ([ 'a', 'c' ], [ 'a', 'b', 'c', 'd' ]),
+])
+def test_minimal_moves(current, desired):
+  moves = minimal_moves(current, desired)
+
+  assert [ key for key in apply_moves(list(current), moves) if key in desired ] == desired
+  assert len(moves) == fewest_moves(current, desired)
+
+def test_minimal_moves_against_brute_force():
+  rand = random.Random(27)
+
+  for n in range(1, 6):
+    for order in itertools.permutations('abcde'[:n]):
+      # Some of the keys don't exist yet and some of the existing ones aren't desired.
+      current = [ key for key in order if rand.random() > 0.2 ] + [ 'x' ] * rand.randint(0, 1)
+      desired = sorted(key for key in 'abcde'[:n] if rand.random() > 0.1)
+
+      moves = minimal_moves(current, desired)
+
+      assert [ key for key in apply_moves(list(current), moves) if key in desired ] == desired
+      assert len(moves) == fewest_moves(current, desired)